@@ -9,8 +9,13 @@ reach them directly.
 The expected key is loaded from Azure Key Vault at startup (see main.py
 lifespan).  In local development the key can be supplied via the
 ``SUPPORT_API_KEY`` environment variable.
+
+Azure DevOps service hooks authenticate with a shared secret instead (see
+``require_devops_hook_auth``).
 """
 
+import base64
+import binascii
 import hmac
 import logging
 
@@ -54,3 +59,38 @@ async def require_api_key(
         raise HTTPException(status_code=401, detail="Invalid API key.")
 
     return provided
+
+
+async def require_devops_hook_auth(
+    authorization: str | None = Header(None),
+    x_hook_secret: str | None = Header(None),
+) -> None:
+    """FastAPI dependency that authenticates Azure DevOps service hook calls.
+
+    DevOps web hook subscriptions can send either HTTP Basic credentials or
+    a custom header; the secret is accepted as the Basic password (any user
+    name) or in ``X-Hook-Secret``.
+
+    Unlike ``require_api_key`` this fails closed: if ``DEVOPS_HOOK_SECRET``
+    is not configured every call is rejected with 401.
+    """
+    expected = get_settings().devops_hook_secret
+    if not expected:
+        logger.warning("DEVOPS_HOOK_SECRET not configured — rejecting service hook call")
+        raise HTTPException(status_code=401, detail="Service hook receiver is not configured.")
+
+    provided = x_hook_secret
+    if provided is None and authorization and authorization[:6].lower() == "basic ":
+        try:
+            decoded = base64.b64decode(authorization[6:], validate=True).decode("utf-8")
+        except (binascii.Error, UnicodeDecodeError):
+            decoded = ""
+        provided = decoded.partition(":")[2]
+
+    if not provided or not hmac.compare_digest(provided.encode(), expected.encode()):
+        logger.warning("Invalid service hook credentials")
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid service hook credentials.",
+            headers={"WWW-Authenticate": 'Basic realm="devops-hooks"'},
+        )
@@ -23,6 +23,116 @@ class Settings(BaseSettings):
     # Azure DevOps
     devops_org_url: str = "https://dev.azure.com/acidni"
     devops_pat: str = ""  # Loaded from Key Vault at startup
+    devops_batch_enabled: bool = False  # Coalesce concurrent creates into $batch calls
+    devops_batch_window_ms: float = 5.0
+    devops_batch_max_size: int = 50
+    # Priority lanes — share outbound DevOps concurrency by license tier / ticket priority
+    devops_priority_lanes_enabled: bool = False
+    devops_max_concurrency: int = 16
+    devops_priority_reserved: int = 4  # slots the standard lane can never take
+    devops_priority_weight: int = 3  # priority grants per standard grant under contention
+    # Resilience — retries (429/503 honour Retry-After), pre-throttle and circuit breaker
+    devops_timeout_seconds: float = 30.0
+    devops_max_attempts: int = 4
+    devops_retry_deadline_seconds: float = 20.0  # total budget for one call including retries
+    devops_rate_limit_per_second: float = 0.0  # token-bucket pre-throttle; 0 disables
+    devops_rate_limit_burst: int = 20
+    devops_circuit_failure_threshold: int = 5  # consecutive failures that open the circuit
+    devops_circuit_reset_seconds: float = 30.0
+    # Metadata cache — area paths / work item types per project, validated locally on submit
+    devops_metadata_enabled: bool = False
+    devops_metadata_refresh_seconds: float = 900.0
+
+    # Shared outbound HTTP pools — one per upstream, opened at startup, closed on shutdown
+    http2_enabled: bool = False  # needs the "http2" extra (h2)
+    http_warmup_enabled: bool = True
+    http_keepalive_expiry_seconds: float = 30.0
+    devops_pool_max_connections: int = 32
+    devops_pool_max_keepalive: int = 16
+    apim_pool_max_connections: int = 16
+    apim_pool_max_keepalive: int = 8
+
+    # Asynchronous submit — accept with 202 and drain a local outbox in the background
+    async_submit_enabled: bool = False
+    outbox_path: str = "data/outbox.db"
+    outbox_workers: int = 4
+    outbox_max_attempts: int = 8
+    outbox_poll_interval_seconds: float = 1.0
+    outbox_lease_seconds: int = 120
+    outbox_priority_boost_seconds: float = 300.0  # priority-lane rows are claimed as if queued this much earlier
+    outbox_retention_seconds: int = 7 * 86_400  # created/failed rows are purged after this long
+
+    # Status sync — mirror DevOps work item state onto tickets (WIQL on ChangedDate watermark)
+    status_sync_enabled: bool = False
+    status_sync_interval_seconds: float = 60.0
+    status_sync_initial_lookback_hours: float = 168.0  # first pass when no watermark is stored
+
+    # Ticket audit trail — "created" entry written atomically with the ticket (same partition)
+    ticket_audit_enabled: bool = False
+
+    # Buffered audit log writer — queue entries in memory, flush partition-grouped batches
+    audit_log_enabled: bool = False
+    audit_log_flush_seconds: float = 1.0
+    audit_log_batch_size: int = 100  # capped at 100 (Cosmos DB transactional batch limit)
+    audit_log_max_queue: int = 10_000
+    # Entries written before the audit trail moved into the tickets container are still read from here;
+    # set empty once they no longer need to be shown
+    audit_legacy_container: str = "audit_log"
+
+    # Ticket cache — per-replica read-through LRU of ticket documents (write-through on save/status)
+    ticket_cache_enabled: bool = False
+    ticket_cache_max_entries: int = 10_000
+    ticket_cache_ttl_seconds: float = 60.0
+    ticket_cache_negative_ttl_seconds: float = 10.0
+
+    # Email index — tickets_by_email container (partition /_partition_key = lowercased email).
+    # Enable writes, run `python -m api.tools.backfill_email_index`, then enable reads.
+    email_index_enabled: bool = False
+    email_index_reads_enabled: bool = False
+
+    # DevOps service hook receiver — POST /api/hooks/devops (workitem.updated)
+    devops_hook_secret: str = ""  # Basic-auth password or X-Hook-Secret configured on the subscription
+    devops_hook_coalesce_seconds: float = 2.0
+
+    # Batch ingestion — POST /api/submit/batch (NDJSON in, NDJSON out)
+    batch_submit_concurrency: int = 8
+    batch_max_line_bytes: int = 256 * 1024
+
+    # Near-duplicate detection — comment on an open work item instead of creating a new one
+    duplicate_detection_enabled: bool = False
+    duplicate_window_seconds: int = 3600
+    duplicate_max_distance: int = 6  # SimHash bit distance (of 64)
+
+    # Screenshot uploads — normalized in a process pool when Pillow is installed
+    screenshot_max_bytes: int = 10 * 1024 * 1024
+    screenshot_processing_enabled: bool = True
+    screenshot_workers: int = 2
+    screenshot_max_dimension: int = 1920
+    screenshot_thumbnail_dimension: int = 320
+    screenshot_format: str = "webp"  # webp | jpeg
+    screenshot_quality: int = 80
+
+    # Ticket IDs — worker ID = replica ID (25 bits; random per process when unset) + a
+    # per-process slot leased from lock files shared by the replica's workers
+    ticket_replica_id: int | None = None
+    ticket_worker_lease_dir: str = "data/ticket-workers"
+
+    # Idempotency-Key handling on POST /api/submit
+    idempotency_cache_size: int = 10_000
+    idempotency_ttl_seconds: int = 86_400
+    idempotency_store: str = "memory"  # memory | cosmos (shared across workers, in the ticket store)
+    idempotency_wait_seconds: float = 30.0
+
+    # Admission control — adaptive (AIMD) limit on in-flight synchronous submits; excess gets 429
+    admission_control_enabled: bool = False
+    admission_initial_limit: int = 20
+    admission_min_limit: int = 2
+    admission_max_limit: int = 200
+    admission_latency_target_seconds: float = 3.0  # slower submits shrink the limit
+
+    # Ticket storage backend — cosmos, or sqlite for local dev, tests and benchmarks
+    ticket_store: str = "cosmos"  # cosmos | sqlite
+    ticket_store_path: str = "data/tickets.db"
 
     # Cosmos DB
     cosmos_endpoint: str = "https://cosmos-acidni-dev.documents.azure.com:443/"
@@ -36,8 +146,9 @@ class Settings(BaseSettings):
     apim_subscription_key: str = ""  # Ocp-Apim-Subscription-Key for marketplace API calls
 
     # Notifications
-    notifications_enabled: bool = True
+    notifications_enabled: bool = False  # confirmation email to the reporter once a ticket is stored
     notification_email: str = "jamieson@acidni.net"
+    notifications_from_email: str = "support@acidni.net"
 
     # Application Insights
     applicationinsights_connection_string: str = ""
@@ -32,12 +32,13 @@ import logging
 import sys
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from api.config import get_settings
 from api.problem_details import register_problem_handlers
+from api.services import cosmos_metrics
 
 __version__ = "1.0.0"
 
@@ -55,7 +56,7 @@ settings = get_settings()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Load secrets from Key Vault at startup."""
+    """Load secrets from Key Vault at startup and run background workers."""
     try:
         from azure.identity import DefaultAzureCredential
         from azure.keyvault.secrets import SecretClient
@@ -82,8 +83,96 @@ async def lifespan(app: FastAPI):
 
     except Exception as e:
         logger.warning("Could not load secrets from Key Vault: %s", e)
+
+    # Shared outbound connection pools (DevOps, licensing, notifications) —
+    # connect before the first request needs them
+    from api.routes.support import _get_http_clients
+
+    http_clients = _get_http_clients()
+    await http_clients.warm()
+
+    # Buffered audit log writer
+    from api.routes.support import _get_audit_log
+
+    audit_log = _get_audit_log()
+    if audit_log is not None:
+        await audit_log.start()
+
+    # Area paths / work item types for local validation of routed submits
+    from api.routes.support import _get_devops_metadata
+
+    devops_metadata = _get_devops_metadata()
+    if devops_metadata is not None:
+        await devops_metadata.start()
+
+    # Background outbox workers for asynchronous submit
+    outbox_workers = None
+    if settings.async_submit_enabled:
+        from api.routes.support import _get_outbox, process_outbox_entry
+        from api.services.outbox import OutboxWorkerPool
+
+        outbox_workers = OutboxWorkerPool(
+            _get_outbox(),
+            process_outbox_entry,
+            concurrency=settings.outbox_workers,
+            max_attempts=settings.outbox_max_attempts,
+            poll_interval=settings.outbox_poll_interval_seconds,
+            retention_seconds=settings.outbox_retention_seconds,
+        )
+        await outbox_workers.start()
+
+    # Mirror DevOps work item state onto stored tickets
+    status_sync = None
+    if settings.status_sync_enabled:
+        from api.routes.support import _get_status_sync
+
+        status_sync = _get_status_sync()
+        await status_sync.start()
+
     yield
 
+    if status_sync is not None:
+        await status_sync.stop()
+
+    from api.routes.support import _status_hooks
+
+    if _status_hooks is not None:
+        await _status_hooks.stop()
+
+    if outbox_workers is not None:
+        await outbox_workers.stop()
+
+    from api.routes.support import _outbox
+
+    if _outbox is not None:
+        _outbox.close()
+
+    if devops_metadata is not None:
+        await devops_metadata.stop()
+
+    # Flush queued audit entries once nothing else can add to them
+    if audit_log is not None:
+        await audit_log.stop()
+
+    from api.routes.support import _screenshots
+
+    if _screenshots is not None:
+        _screenshots.shutdown()
+
+    # Last: the audit flush and background workers above still write to it
+    from api.routes.support import _cosmos
+
+    if _cosmos is not None:
+        await _cosmos.close()
+
+    # Confirmation emails still being sent use the shared APIM pool
+    from api.routes.support import _notifications
+
+    if _notifications is not None:
+        await _notifications.close()
+
+    await http_clients.aclose()
+
 
 app = FastAPI(
     title="Acidni Support API",
@@ -127,19 +216,49 @@ app.add_middleware(
     allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["GET", "POST", "OPTIONS"],
-    allow_headers=["Content-Type", "Ocp-Apim-Subscription-Key", "X-Api-Key", "X-User-Email", "X-App-Id"],
+    allow_headers=[
+        "Content-Type",
+        "Ocp-Apim-Subscription-Key",
+        "X-Api-Key",
+        "X-User-Email",
+        "X-App-Id",
+        "Idempotency-Key",
+    ],
+    expose_headers=["Idempotent-Replayed", "Retry-After", "X-Next-Cursor"],
 )
 
+
+def _route_template(request: Request) -> str:
+    """Path template of the matched route, e.g. ``/api/tickets/{ticket_id}/audit``."""
+    # Newer FastAPI releases resolve included routers lazily: the route's own
+    # path then lacks the include prefix, which the effective route carries
+    effective = (request.scope.get("fastapi") or {}).get("effective_route_context")
+    route = request.scope.get("route")
+    return getattr(effective, "path", None) or getattr(route, "path", None) or "unmatched"
+
+
+@app.middleware("http")
+async def cosmos_usage_by_route(request: Request, call_next):
+    """Add the Cosmos DB request units a request spent to its route's total."""
+    with cosmos_metrics.request_usage() as usage:
+        try:
+            return await call_next(request)
+        finally:
+            # Label by template, not raw path, so ticket IDs do not explode the series
+            cosmos_metrics.record_route(f"{request.method} {_route_template(request)}", usage)
+
 # RFC 7807 Problem Details error handlers
 register_problem_handlers(app, app_name="acidni-support")
 
 # -------------------------------------------------------------------
 # Routes
 # -------------------------------------------------------------------
-from api.routes import health, support, widget, landing
+from api.routes import health, hooks, metrics, support, widget, landing
 
 app.include_router(health.router)
 app.include_router(landing.router)  # Root landing page
 app.include_router(support.router, prefix="/api")
 app.include_router(widget.router, prefix="/api")
+app.include_router(metrics.router, prefix="/api")
+app.include_router(hooks.router, prefix="/api")
 
@@ -0,0 +1,177 @@
+"""
+In-process metrics registry for acidni-support.
+
+A small set of counters, gauges and fixed-bucket histograms that services
+update on the hot path and ``GET /api/metrics`` renders as JSON.  Values are
+per worker process; Application Insights remains the fleet-wide view.
+"""
+
+import bisect
+import threading
+from collections.abc import Callable
+from typing import Any
+
+# Default latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(labels: dict[str, str]) -> LabelKey:
+    return tuple(sorted(labels.items()))
+
+
+def _label_name(key: LabelKey) -> str:
+    return ",".join(f"{k}={v}" for k, v in key)
+
+
+class Counter:
+    """Monotonically increasing value, optionally split by labels."""
+
+    def __init__(self, name: str, description: str) -> None:
+        self.name = name
+        self.description = description
+        self._values: dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"type": "counter", "description": self.description,
+                "values": {_label_name(k): v for k, v in self._values.items()}}
+
+
+class Gauge:
+    """Value that goes up and down, or is read from a callback at render time."""
+
+    def __init__(self, name: str, description: str, callback: Callable[[], float] | None = None) -> None:
+        self.name = name
+        self.description = description
+        self._callback = callback
+        self._values: dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        if self._callback is not None and not labels:
+            return self._callback()
+        return self._values.get(_label_key(labels), 0.0)
+
+    def snapshot(self) -> dict[str, Any]:
+        values = {_label_name(k): v for k, v in self._values.items()}
+        if self._callback is not None:
+            values[""] = self._callback()
+        return {"type": "gauge", "description": self.description, "values": values}
+
+
+class _Series:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self, buckets: int) -> None:
+        self.counts = [0] * (buckets + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class Histogram:
+    """Fixed-bucket histogram of observed values (typically seconds)."""
+
+    def __init__(self, name: str, description: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[LabelKey, _Series] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(len(self.buckets))
+            series.counts[bisect.bisect_left(self.buckets, value)] += 1
+            series.count += 1
+            series.total += value
+            series.max = max(series.max, value)
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(_label_key(labels))
+        return series.count if series else 0
+
+    def quantile(self, q: float, **labels: str) -> float:
+        """Approximate quantile: the upper bound of the bucket holding it."""
+        series = self._series.get(_label_key(labels))
+        if not series or not series.count:
+            return 0.0
+        rank = q * series.count
+        seen = 0
+        for bound, n in zip(self.buckets, series.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return series.max
+
+    def snapshot(self) -> dict[str, Any]:
+        values = {}
+        for key, series in self._series.items():
+            labels = dict(key)
+            values[_label_name(key)] = {
+                "count": series.count,
+                "sum": round(series.total, 6),
+                "max": round(series.max, 6),
+                "p50": self.quantile(0.5, **labels),
+                "p95": self.quantile(0.95, **labels),
+                "p99": self.quantile(0.99, **labels),
+                "buckets": {str(b): n for b, n in zip((*self.buckets, "+Inf"), series.counts)},
+            }
+        return {"type": "histogram", "description": self.description, "values": values}
+
+
+class MetricsRegistry:
+    """Named collection of metrics; creating an existing name returns it."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Gauge | Histogram] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, name: str, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = factory()
+            return metric
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        return self._get_or_create(name, lambda: Counter(name, description))
+
+    def gauge(self, name: str, description: str = "", callback: Callable[[], float] | None = None) -> Gauge:
+        return self._get_or_create(name, lambda: Gauge(name, description, callback))
+
+    def histogram(self, name: str, description: str = "", buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(name, lambda: Histogram(name, description, buckets))
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return every metric's current values, keyed by name."""
+        return {name: metric.snapshot() for name, metric in sorted(self._metrics.items())}
+
+
+# Process-wide registry used by services and the /api/metrics route
+registry = MetricsRegistry()
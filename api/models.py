@@ -4,8 +4,9 @@ Pydantic models for acidni-support API.
 
 from datetime import datetime
 from enum import Enum
+from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class SupportCategory(str, Enum):
@@ -52,7 +53,19 @@ class SupportSubmitRequest(BaseModel):
     user_name: str | None = Field(default=None, description="Submitter name")
     context: SubmitContext | None = Field(default=None, description="Auto-captured context")
     license_info: LicenseInfo | None = Field(default=None, description="License and support plan info")
-    screenshot_base64: str | None = Field(default=None, max_length=7_000_000, description="Optional screenshot")
+    screenshot_base64: None = Field(
+        default=None,
+        description="No longer accepted; upload to /tickets/{ticket_id}/screenshot instead",
+        deprecated=True,
+    )
+
+    @field_validator("screenshot_base64", mode="before")
+    @classmethod
+    def _reject_inline_screenshot(cls, value: Any) -> None:
+        # Checked before any string validation, so an inline image is never copied or measured
+        if value is not None:
+            raise ValueError("inline screenshots are not accepted; upload to /api/tickets/{ticket_id}/screenshot")
+        return None
 
 
 class DevOpsInfo(BaseModel):
@@ -75,6 +88,48 @@ class SupportSubmitResponse(BaseModel):
     message: str = "Your support request has been submitted. We'll review it shortly."
 
 
+class BatchItemResult(BaseModel):
+    """One NDJSON result line from ``POST /api/submit/batch``."""
+
+    line: int = Field(..., description="1-based line number of the item in the request body")
+    ref: str | None = Field(default=None, description="The item's 'ref' field, echoed back")
+    status: str = Field(..., description="created, linked, queued or error")
+    ticket_id: str | None = None
+    devops_work_item_id: int | None = None
+    devops_work_item_url: str | None = None
+    code: str | None = Field(default=None, description="Machine-readable error code")
+    error: str | None = None
+
+
+class SupportAcceptedResponse(BaseModel):
+    """Response when a support request is queued for asynchronous processing."""
+
+    ticket_id: str
+    status: str = "queued"
+    message: str = "Your support request has been received. We'll review it shortly."
+
+
+class SubmissionStatusResponse(BaseModel):
+    """Processing status of an asynchronously submitted support request."""
+
+    ticket_id: str
+    status: str
+    devops_work_item_id: int | None = None
+    devops_work_item_url: str | None = None
+    attempts: int = 0
+
+
+class ScreenshotUploadResponse(BaseModel):
+    """Response after attaching a screenshot to a ticket's work item."""
+
+    ticket_id: str
+    devops_work_item_id: int
+    attachment_url: str
+    thumbnail_url: str | None = None
+    size: int
+    content_type: str
+
+
 class TicketDocument(BaseModel):
     """Cosmos DB ticket document."""
 
@@ -94,6 +149,47 @@ class TicketDocument(BaseModel):
     updated_at: str = Field(default_factory=lambda: datetime.utcnow().isoformat() + "Z")
 
 
+class TicketSummary(BaseModel):
+    """One row of the ticket history list (``GET /api/tickets``)."""
+
+    ticket_id: str
+    app_id: str | None = None
+    category: str | None = None
+    subject: str | None = None
+    status: str | None = "created"
+    priority: int | None = None
+    created_at: str | None = None
+    devops_work_item_id: int | None = None
+
+    @classmethod
+    def from_document(cls, doc: dict) -> "TicketSummary":
+        """Build a summary from a projected (``TICKET_SUMMARY_FIELDS``) or full ticket document."""
+        work_item_id = doc.get("devops_work_item_id")
+        if work_item_id is None and doc.get("devops"):
+            work_item_id = doc["devops"].get("work_item_id")
+        return cls(
+            ticket_id=doc["id"],
+            app_id=doc.get("app_id"),
+            category=doc.get("category"),
+            subject=doc.get("subject"),
+            status=doc.get("status", "created"),
+            priority=doc.get("priority"),
+            created_at=doc.get("created_at"),
+            devops_work_item_id=work_item_id,
+        )
+
+
+class AuditEntry(BaseModel):
+    """One entry of a ticket's audit trail."""
+
+    id: str
+    ticket_id: str
+    app_id: str
+    action: str
+    details: dict[str, Any] = Field(default_factory=dict)
+    timestamp: str
+
+
 class WidgetCategory(BaseModel):
     """Widget category configuration."""
 
@@ -130,3 +226,21 @@ class HealthResponse(BaseModel):
     version: str
     environment: str
     service: str = "acidni-support"
+
+
+class StaleRoute(BaseModel):
+    """A routing entry that points at DevOps metadata that no longer exists."""
+
+    app_id: str
+    category: str
+    project: str
+    field: str = Field(..., description="devops_project, area_path or work_item_type")
+    value: str
+
+
+class RoutingHealthResponse(BaseModel):
+    """Routing configuration checked against cached DevOps metadata."""
+
+    status: str = Field(..., description="ok, degraded, or unknown when metadata is not loaded")
+    projects_loaded: int = 0
+    stale_routes: list[StaleRoute] = Field(default_factory=list)
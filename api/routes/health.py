@@ -1,13 +1,16 @@
 """
 Health check endpoint.
 
-Standard /health endpoint for Container App probes and APIM health checks.
+Standard /health endpoint for Container App probes and APIM health checks,
+plus an authenticated report of routes that point at DevOps area paths or
+work item types that no longer exist.
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
+from api.auth import require_api_key
 from api.config import get_settings
-from api.models import HealthResponse
+from api.models import HealthResponse, RoutingHealthResponse
 
 router = APIRouter(tags=["health"])
 
@@ -22,3 +25,19 @@ async def health_check() -> HealthResponse:
         environment=settings.environment,
         service="acidni-support",
     )
+
+
+@router.get("/health/routing", response_model=RoutingHealthResponse, dependencies=[Depends(require_api_key)])
+async def routing_health() -> RoutingHealthResponse:
+    """Check every route against the cached DevOps metadata."""
+    from api.routes.support import _get_devops_metadata
+
+    metadata = _get_devops_metadata()
+    if metadata is None or not metadata.loaded:
+        return RoutingHealthResponse(status="unknown")
+    stale = metadata.stale_routes()
+    return RoutingHealthResponse(
+        status="degraded" if stale else "ok",
+        projects_loaded=metadata.projects_loaded,
+        stale_routes=stale,
+    )
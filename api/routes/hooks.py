@@ -0,0 +1,78 @@
+"""
+Azure DevOps service hook receiver.
+
+DevOps pushes a ``workitem.updated`` event on every work item save.  Events
+that change ``System.State`` are handed to the status coalescer, which maps
+the work item to its tickets and patches their status in Cosmos DB; the
+route itself never waits on Cosmos, so DevOps gets its 202 immediately.
+Polling via the status sync remains the safety net for missed deliveries.
+"""
+
+import logging
+from datetime import UTC, datetime
+from typing import Any
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse
+
+from api.auth import require_devops_hook_auth
+from api.problem_details import ProblemException
+from api.services.status_sync import ticket_status
+
+logger = logging.getLogger("acidni-support.routes.hooks")
+
+router = APIRouter(tags=["hooks"], dependencies=[Depends(require_devops_hook_auth)])
+
+WORKITEM_UPDATED = "workitem.updated"
+
+
+def parse_state_change(event: dict[str, Any]) -> tuple[int, str, int, str] | None:
+    """Return ``(work_item_id, state, rev, changed_date)`` or None if the state did not change.
+
+    ``resource.fields`` carries only the fields touched by this update as
+    ``{"oldValue", "newValue"}`` pairs; ``resource.revision`` is the full
+    work item after the update.
+    """
+    if event.get("eventType") != WORKITEM_UPDATED:
+        return None
+    resource = event.get("resource") or {}
+    state_change = (resource.get("fields") or {}).get("System.State")
+    if not isinstance(state_change, dict) or not state_change.get("newValue"):
+        return None
+
+    revision = resource.get("revision") or {}
+    work_item_id = resource.get("workItemId") or revision.get("id")
+    if not isinstance(work_item_id, int):
+        return None
+    rev = resource.get("rev") or revision.get("rev") or 0
+    changed = (revision.get("fields") or {}).get("System.ChangedDate") or (
+        (resource.get("fields") or {}).get("System.ChangedDate") or {}
+    ).get("newValue")
+    if not changed:
+        changed = datetime.now(UTC).isoformat().replace("+00:00", "Z")
+    return work_item_id, state_change["newValue"], int(rev), changed
+
+
+@router.post("/hooks/devops", status_code=202)
+async def receive_devops_hook(request: Request) -> JSONResponse:
+    """Accept a DevOps ``workitem.updated`` service hook event."""
+    from api.routes.support import _get_status_hooks
+
+    try:
+        event = await request.json()
+    except ValueError as exc:
+        raise ProblemException(
+            400,
+            code="INVALID_HOOK_PAYLOAD",
+            title="The service hook payload is not valid JSON.",
+            detail=str(exc),
+        ) from exc
+
+    change = parse_state_change(event) if isinstance(event, dict) else None
+    if change is None:
+        return JSONResponse({"status": "ignored"}, status_code=202)
+
+    work_item_id, state, rev, changed = change
+    _get_status_hooks().submit(work_item_id, ticket_status(state), rev, changed)
+    logger.debug("Work item %d state → %s (rev %d)", work_item_id, state, rev)
+    return JSONResponse({"status": "accepted"}, status_code=202)
@@ -0,0 +1,31 @@
+"""
+Metrics endpoint.
+
+Exposes the in-process metrics registry (queue depths, latency histograms,
+counters) as JSON for load tests and on-call debugging.
+"""
+
+from typing import Any
+
+from fastapi import APIRouter, Depends
+
+from api.auth import require_api_key
+from api.metrics import registry
+from api.services import cosmos_metrics
+
+router = APIRouter(tags=["metrics"], dependencies=[Depends(require_api_key)])
+
+
+@router.get("/metrics")
+async def get_metrics() -> dict[str, Any]:
+    """Return a snapshot of every registered metric for this worker."""
+    return registry.snapshot()
+
+
+@router.get("/metrics/cosmos")
+async def get_cosmos_usage() -> dict[str, Any]:
+    """Return cumulative Cosmos DB request units per API route and per operation."""
+    return {
+        "request_units_by_route": cosmos_metrics.route_usage(),
+        "request_units_by_operation": cosmos_metrics.operation_usage(),
+    }
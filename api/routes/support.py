@@ -3,35 +3,91 @@ Support routes — submit requests, get config, list tickets.
 """
 
 import logging
-from datetime import datetime
+import time
+from collections.abc import AsyncIterator
+from urllib.parse import urlsplit
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.datastructures import UploadFile
+from starlette.types import Receive, Scope, Send
 
 from api.auth import require_api_key
 from api.config import get_settings
 from api.models import (
-    SupportCategory,
+    AuditEntry,
+    BatchItemResult,
+    ScreenshotUploadResponse,
+    SubmissionStatusResponse,
+    SupportAcceptedResponse,
     SupportSubmitRequest,
     SupportSubmitResponse,
-    TicketDocument,
+    TicketSummary,
     WidgetBranding,
     WidgetCategory,
     WidgetConfig,
 )
-from api.services.cosmos_service import CosmosService
+from api.problem_details import ProblemException, problem_response
+from api.services.admission import AdaptiveConcurrencyLimiter, AdmissionRejectedError
+from api.services.audit_writer import AuditLogWriter
+from api.services.batch_ingest import encode_result, iter_ndjson_lines, run_batch, split_ref
+from api.services.cosmos_service import TICKET_SUMMARY_FIELDS
+from api.services.devops_batcher import WorkItemBatcher
 from api.services.devops_client import DevOpsClient
+from api.services.devops_metadata import DevOpsMetadataCache
+from api.services.duplicate_index import NearDuplicateIndex
+from api.services.http_clients import HttpClientRegistry, UpstreamConfig
+from api.services.idempotency import (
+    IdempotencyCache,
+    IdempotencyConflictError,
+    IdempotencyInProgressError,
+    fingerprint_payload,
+)
 from api.services.licensing_service import LicensingService
+from api.services.notification_service import NotificationService
+from api.services.outbox import OutboxEntry, OutboxStatus, SubmissionOutbox
+from api.services.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from api.services.priority_scheduler import PriorityScheduler, lane_for
+from api.services.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, TokenBucket
 from api.services.routing_service import RoutingService
+from api.services.screenshot_processor import ProcessedScreenshot, ScreenshotProcessor
+from api.services.screenshot_upload import (
+    BASE64_CONTENT_TYPES,
+    CHUNK_SIZE,
+    ScreenshotTooLargeError,
+    ScreenshotUploadError,
+    iter_file,
+    spool_screenshot,
+)
+from api.services.status_coalescer import StatusUpdateCoalescer
+from api.services.status_sync import StatusSynchronizer
+from api.services.submission_service import SubmissionService, UnknownAppError
+from api.services.ticket_ids import TicketIdGenerator, claim_worker_id
+from api.services.ticket_store import TicketStore, create_ticket_store
+from api.services.work_item_index import WorkItemTicketIndex
 
 logger = logging.getLogger("acidni-support.routes.support")
 
 router = APIRouter(tags=["support"], dependencies=[Depends(require_api_key)])
 
 # Lazy-init singletons
+_http_clients: HttpClientRegistry | None = None
 _routing: RoutingService | None = None
-_devops: DevOpsClient | None = None
-_cosmos: CosmosService | None = None
+_devops: DevOpsClient | WorkItemBatcher | None = None
+_devops_metadata: DevOpsMetadataCache | None = None
+_cosmos: TicketStore | None = None
 _licensing: LicensingService | None = None
+_notifications: NotificationService | None = None
+_submission: SubmissionService | None = None
+_outbox: SubmissionOutbox | None = None
+_status_sync: StatusSynchronizer | None = None
+_work_item_index: WorkItemTicketIndex | None = None
+_status_hooks: StatusUpdateCoalescer | None = None
+_idempotency: IdempotencyCache | None = None
+_screenshots: ScreenshotProcessor | None = None
+_ticket_ids: TicketIdGenerator | None = None
+_admission: AdaptiveConcurrencyLimiter | None = None
+_audit_log: AuditLogWriter | None = None
 
 # Default widget categories
 DEFAULT_CATEGORIES = [
@@ -42,6 +98,37 @@ DEFAULT_CATEGORIES = [
 ]
 
 
+def _get_http_clients() -> HttpClientRegistry:
+    global _http_clients
+    if _http_clients is None:
+        settings = get_settings()
+        devops = urlsplit(settings.devops_org_url)
+        warm_path = "/" if settings.http_warmup_enabled else None
+        _http_clients = HttpClientRegistry([
+            UpstreamConfig(
+                "devops",
+                base_url=f"{devops.scheme}://{devops.netloc}",
+                timeout=settings.devops_timeout_seconds,
+                max_connections=settings.devops_pool_max_connections,
+                max_keepalive_connections=settings.devops_pool_max_keepalive,
+                keepalive_expiry=settings.http_keepalive_expiry_seconds,
+                http2=settings.http2_enabled,
+                warm_path=warm_path,
+            ),
+            UpstreamConfig(
+                "apim",
+                base_url=settings.apim_base_url,
+                timeout=15.0,
+                max_connections=settings.apim_pool_max_connections,
+                max_keepalive_connections=settings.apim_pool_max_keepalive,
+                keepalive_expiry=settings.http_keepalive_expiry_seconds,
+                http2=settings.http2_enabled,
+                warm_path=warm_path,
+            ),
+        ])
+    return _http_clients
+
+
 def _get_routing() -> RoutingService:
     global _routing
     if _routing is None:
@@ -49,187 +136,623 @@ def _get_routing() -> RoutingService:
     return _routing
 
 
-def _get_devops() -> DevOpsClient:
+def _get_devops() -> DevOpsClient | WorkItemBatcher:
     global _devops
     if _devops is None:
         settings = get_settings()
-        _devops = DevOpsClient(org_url=settings.devops_org_url, pat=settings.devops_pat)
+        throttle = None
+        if settings.devops_rate_limit_per_second > 0:
+            throttle = TokenBucket(settings.devops_rate_limit_per_second, settings.devops_rate_limit_burst)
+        _devops = DevOpsClient(
+            org_url=settings.devops_org_url,
+            pat=settings.devops_pat,
+            client=_get_http_clients().get("devops"),
+            timeout=settings.devops_timeout_seconds,
+            retry_policy=RetryPolicy(
+                max_attempts=settings.devops_max_attempts,
+                deadline=settings.devops_retry_deadline_seconds,
+            ),
+            breaker=CircuitBreaker(
+                "devops",
+                failure_threshold=settings.devops_circuit_failure_threshold,
+                reset_timeout=settings.devops_circuit_reset_seconds,
+            ),
+            throttle=throttle,
+        )
+        if settings.devops_batch_enabled:
+            _devops = WorkItemBatcher(
+                _devops,
+                window_ms=settings.devops_batch_window_ms,
+                max_batch_size=settings.devops_batch_max_size,
+            )
     return _devops
 
 
-def _get_cosmos() -> CosmosService:
+def _get_devops_metadata() -> DevOpsMetadataCache | None:
+    """Return the DevOps metadata cache, or None when local validation is off."""
+    global _devops_metadata
+    settings = get_settings()
+    if not settings.devops_metadata_enabled:
+        return None
+    if _devops_metadata is None:
+        _devops_metadata = DevOpsMetadataCache(
+            _get_devops(),
+            _get_routing(),
+            refresh_seconds=settings.devops_metadata_refresh_seconds,
+        )
+    return _devops_metadata
+
+
+def _get_cosmos() -> TicketStore:
+    """Return the ticket store (Cosmos DB, or SQLite when configured)."""
     global _cosmos
     if _cosmos is None:
-        _cosmos = CosmosService()
+        _cosmos = create_ticket_store(get_settings())
     return _cosmos
 
 
 def _get_licensing() -> LicensingService:
     global _licensing
     if _licensing is None:
-        _licensing = LicensingService()
+        _licensing = LicensingService(client=_get_http_clients().get("apim"))
     return _licensing
 
 
+def _get_notification_service() -> NotificationService:
+    global _notifications
+    if _notifications is None:
+        _notifications = NotificationService(client=_get_http_clients().get("apim"))
+    return _notifications
+
+
+def _get_submission() -> SubmissionService:
+    global _submission
+    if _submission is None:
+        settings = get_settings()
+        duplicates = None
+        if settings.duplicate_detection_enabled:
+            duplicates = NearDuplicateIndex(
+                window_seconds=settings.duplicate_window_seconds,
+                max_distance=settings.duplicate_max_distance,
+            )
+        scheduler = None
+        if settings.devops_priority_lanes_enabled:
+            scheduler = PriorityScheduler(
+                max_concurrency=settings.devops_max_concurrency,
+                reserved=settings.devops_priority_reserved,
+                weight=settings.devops_priority_weight,
+            )
+        _submission = SubmissionService(
+            _get_routing(),
+            _get_devops(),
+            _get_cosmos(),
+            duplicates=duplicates,
+            scheduler=scheduler,
+            metadata=_get_devops_metadata(),
+            work_items=_get_work_item_index(),
+            audit=settings.ticket_audit_enabled,
+            audit_log=_get_audit_log(),
+            new_ticket_id=_generate_ticket_id,
+        )
+    return _submission
+
+
+def _get_work_item_index() -> WorkItemTicketIndex:
+    global _work_item_index
+    if _work_item_index is None:
+        _work_item_index = WorkItemTicketIndex(_get_cosmos())
+    return _work_item_index
+
+
+def _get_status_hooks() -> StatusUpdateCoalescer:
+    global _status_hooks
+    if _status_hooks is None:
+        _status_hooks = StatusUpdateCoalescer(
+            _get_cosmos(),
+            _get_work_item_index(),
+            window_seconds=get_settings().devops_hook_coalesce_seconds,
+            on_closed=_get_submission().forget_work_item,
+        )
+    return _status_hooks
+
+
+def _get_status_sync() -> StatusSynchronizer:
+    global _status_sync
+    if _status_sync is None:
+        settings = get_settings()
+        _status_sync = StatusSynchronizer(
+            _get_devops(),
+            _get_cosmos(),
+            interval_seconds=settings.status_sync_interval_seconds,
+            initial_lookback_hours=settings.status_sync_initial_lookback_hours,
+            on_closed=_get_submission().forget_work_item,
+        )
+    return _status_sync
+
+
+def _get_outbox() -> SubmissionOutbox:
+    global _outbox
+    if _outbox is None:
+        settings = get_settings()
+        _outbox = SubmissionOutbox(
+            settings.outbox_path,
+            lease_seconds=settings.outbox_lease_seconds,
+            priority_boost_seconds=settings.outbox_priority_boost_seconds,
+        )
+    return _outbox
+
+
+def _get_screenshot_processor() -> ScreenshotProcessor:
+    global _screenshots
+    if _screenshots is None:
+        settings = get_settings()
+        _screenshots = ScreenshotProcessor(
+            max_workers=settings.screenshot_workers,
+            max_dimension=settings.screenshot_max_dimension,
+            thumbnail_dimension=settings.screenshot_thumbnail_dimension,
+            output_format=settings.screenshot_format,
+            quality=settings.screenshot_quality,
+        )
+    return _screenshots
+
+
+def _get_idempotency() -> IdempotencyCache:
+    global _idempotency
+    if _idempotency is None:
+        settings = get_settings()
+        _idempotency = IdempotencyCache(
+            max_entries=settings.idempotency_cache_size,
+            ttl_seconds=settings.idempotency_ttl_seconds,
+            store=_get_cosmos() if settings.idempotency_store == "cosmos" else None,
+            wait_seconds=settings.idempotency_wait_seconds,
+        )
+    return _idempotency
+
+
+def _get_ticket_ids() -> TicketIdGenerator:
+    global _ticket_ids
+    if _ticket_ids is None:
+        settings = get_settings()
+        worker_id = claim_worker_id(settings.ticket_replica_id, settings.ticket_worker_lease_dir)
+        _ticket_ids = TicketIdGenerator(worker_id=worker_id)
+    return _ticket_ids
+
+
+def _get_audit_log() -> AuditLogWriter | None:
+    """Return the buffered audit log writer, or None when audit logging is off."""
+    global _audit_log
+    settings = get_settings()
+    if not settings.audit_log_enabled:
+        return None
+    if _audit_log is None:
+        _audit_log = AuditLogWriter(
+            _get_cosmos(),
+            batch_size=settings.audit_log_batch_size,
+            flush_interval=settings.audit_log_flush_seconds,
+            max_queue=settings.audit_log_max_queue,
+        )
+    return _audit_log
+
+
+def _get_admission() -> AdaptiveConcurrencyLimiter | None:
+    """Return the submit admission limiter, or None when admission control is off."""
+    global _admission
+    settings = get_settings()
+    if not settings.admission_control_enabled:
+        return None
+    if _admission is None:
+        _admission = AdaptiveConcurrencyLimiter(
+            initial_limit=settings.admission_initial_limit,
+            min_limit=settings.admission_min_limit,
+            max_limit=settings.admission_max_limit,
+            latency_target=settings.admission_latency_target_seconds,
+        )
+    return _admission
+
+
 def _generate_ticket_id() -> str:
-    """Generate a unique ticket ID: SUP-YYYYMMDD-HHMM-XXXX."""
-    now = datetime.utcnow()
-    import random
-    suffix = f"{random.randint(1000, 9999)}"
-    return f"SUP-{now.strftime('%Y%m%d')}-{now.strftime('%H%M')}-{suffix}"
+    """Generate a unique, time-sortable ticket ID: SUP-YYYYMMDD-HHMM-XXXXXXXXXXXX."""
+    return _get_ticket_ids().next_id()
+
+
+async def _process_submission(request: SupportSubmitRequest, admit: bool = True) -> tuple[int, dict]:
+    """Run a submission and return ``(status_code, response body)``.
+
+    ``admit=False`` skips admission control (batch ingestion bounds its own
+    concurrency).
+    """
+    settings = get_settings()
+    submission = _get_submission()
 
+    try:
+        submission.resolve_plan(request)
+    except UnknownAppError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if settings.async_submit_enabled:
+        ticket_id = _generate_ticket_id()
+        outbox = _get_outbox()
+        await outbox.enqueue(
+            ticket_id,
+            request.model_dump_json(exclude={"screenshot_base64"}),
+            lane=lane_for(request).value,
+        )
+        logger.info("Support ticket queued: %s (app_id=%s)", ticket_id, request.app_id)
+        return 202, SupportAcceptedResponse(ticket_id=ticket_id).model_dump()
 
-@router.post("/submit", response_model=SupportSubmitResponse)
-async def submit_support_request(request: SupportSubmitRequest) -> SupportSubmitResponse:
+    ticket_id = _generate_ticket_id()
+    # Raises AdmissionRejectedError when too many synchronous submits are in flight; acquired
+    # last, so nothing between here and the try below can leak the slot
+    limiter = _get_admission() if admit else None
+    if limiter is not None:
+        limiter.acquire()
+    started = time.monotonic()
+    failed = True
+    try:
+        response = await submission.submit(request, ticket_id)
+        failed = False
+    except CircuitOpenError:
+        raise
+    except Exception:
+        logger.exception("Failed to create DevOps work item for app_id=%s", request.app_id)
+        raise HTTPException(status_code=502, detail="Failed to create work item in Azure DevOps")
+    finally:
+        if limiter is not None:
+            limiter.release(time.monotonic() - started, failed=failed)
+    _get_notification_service().notify_created(
+        request.user_email, response.ticket_id, request.subject, request.app_id
+    )
+    return 200, response.model_dump()
+
+
+def _rejection_response(http_request: Request, error: AdmissionRejectedError | CircuitOpenError) -> JSONResponse:
+    if isinstance(error, CircuitOpenError):
+        return problem_response(
+            503,
+            http_request,
+            code="DEVOPS_UNAVAILABLE",
+            title="Azure DevOps is currently unavailable.",
+            detail="Recent calls to Azure DevOps failed, so new work items are not being attempted. "
+            "Retry after the indicated delay.",
+            retry_after=error.retry_after,
+        )
+    return problem_response(
+        429,
+        http_request,
+        code="SUBMIT_OVERLOADED",
+        title="Too many support requests are being processed right now.",
+        detail="The service is shedding load while Azure DevOps is slow. Retry after the indicated delay.",
+        retry_after=error.retry_after,
+    )
+
+
+@router.post(
+    "/submit",
+    response_model=SupportSubmitResponse,
+    responses={202: {"model": SupportAcceptedResponse}},
+)
+async def submit_support_request(
+    request: SupportSubmitRequest,
+    http_request: Request,
+    idempotency_key: str | None = Header(None, max_length=255),
+) -> JSONResponse:
     """
     Submit a support request or feedback.
 
     Resolves the app_id to an Azure DevOps project, creates a work item,
     stores the ticket in Cosmos DB, and returns the work item reference.
-    """
-    routing = _get_routing()
-    devops = _get_devops()
-    cosmos = _get_cosmos()
 
-    # 1. Resolve app_id to DevOps project
-    route = routing.resolve(request.app_id)
-    if route is None:
-        route = routing.resolve("_default")
-    if route is None:
-        raise HTTPException(status_code=400, detail=f"Unknown app_id: {request.app_id}. No routing configured.")
-
-    # 2. Determine work item type based on category
-    category_type_map = {
-        SupportCategory.BUG: "Bug",
-        SupportCategory.FEATURE: "Task",
-        SupportCategory.FEEDBACK: "Task",
-        SupportCategory.QUESTION: "Task",
-    }
-    work_item_type = category_type_map.get(request.category, "Task")
-
-    # 3. Build description HTML
-    context_html = ""
-    if request.context:
-        ctx_items = []
-        if request.context.url:
-            ctx_items.append(f"<li><b>URL:</b> {request.context.url}</li>")
-        if request.context.browser:
-            ctx_items.append(f"<li><b>Browser:</b> {request.context.browser}</li>")
-        if request.context.os:
-            ctx_items.append(f"<li><b>OS:</b> {request.context.os}</li>")
-        if request.context.app_version:
-            ctx_items.append(f"<li><b>App Version:</b> {request.context.app_version}</li>")
-        if request.context.screen_resolution:
-            ctx_items.append(f"<li><b>Resolution:</b> {request.context.screen_resolution}</li>")
-        if ctx_items:
-            context_html = f"<h3>Context</h3><ul>{''.join(ctx_items)}</ul>"
-
-    reporter_html = ""
-    if request.user_email:
-        reporter_html = f"<h3>Reported By</h3><p>{request.user_name or ''} ({request.user_email})</p>"
-
-    license_html = ""
-    if request.license_info:
-        lic = request.license_info
-        lic_items = []
-        if lic.plan_name:
-            lic_items.append(f"<li><b>Plan:</b> {lic.plan_name}</li>")
-        if lic.status:
-            lic_items.append(f"<li><b>Status:</b> {lic.status}</li>")
-        if lic.is_free_trial:
-            end = lic.free_trial_end or "N/A"
-            lic_items.append(f"<li><b>Free Trial:</b> Yes (ends {end})</li>")
-        if lic.support_plan:
-            lic_items.append(f"<li><b>Support Plan:</b> {lic.support_plan}</li>")
-        elif lic.has_priority_support:
-            lic_items.append("<li><b>Support:</b> Priority (included in plan)</li>")
-        else:
-            lic_items.append("<li><b>Support:</b> Standard</li>")
-        if lic_items:
-            license_html = f"<h3>License &amp; Support</h3><ul>{''.join(lic_items)}</ul>"
-
-    description_html = (
-        f"<h3>{'Customer Report' if request.category == SupportCategory.BUG else 'Customer Feedback'}</h3>"
-        f"<p>{request.description}</p>"
-        f"<h3>App</h3><p>{request.app_id} (routed to {route['devops_project']})</p>"
-        f"{context_html}"
-        f"{reporter_html}"
-        f"{license_html}"
-    )
+    When asynchronous submit is enabled the request is validated, written to
+    the local outbox and acknowledged with 202; poll
+    ``GET /submit/{ticket_id}/status`` for the work item reference.
 
-    # 4. Tag prefix based on category
-    tag_prefix = {
-        SupportCategory.BUG: "support-widget; customer-reported",
-        SupportCategory.FEATURE: "support-widget; feature-request",
-        SupportCategory.FEEDBACK: "support-widget; customer-feedback",
-        SupportCategory.QUESTION: "support-widget; customer-question",
-    }
-    tags = f"{tag_prefix.get(request.category, 'support-widget')}; {request.app_id}"
-
-    # 5. Create work item in Azure DevOps
-    title_prefix = {
-        SupportCategory.BUG: "[Support]",
-        SupportCategory.FEATURE: "[Feature Request]",
-        SupportCategory.FEEDBACK: "[Feedback]",
-        SupportCategory.QUESTION: "[Question]",
-    }
-    title = f"{title_prefix.get(request.category, '[Support]')} {request.subject}"
+    An ``Idempotency-Key`` header makes retries safe: a repeated request with
+    the same key and body gets the original response back (with
+    ``Idempotent-Replayed: true``) without creating another work item.
 
+    When admission control is enabled and Azure DevOps is slow, synchronous
+    submits over the adaptive concurrency limit get a 429 problem response
+    with ``Retry-After``; nothing is created, so the retry is safe.  While
+    the DevOps circuit breaker is open, submits get a 503 the same way.
+    """
+    if not idempotency_key:
+        try:
+            status_code, body = await _process_submission(request)
+        except (AdmissionRejectedError, CircuitOpenError) as e:
+            return _rejection_response(http_request, e)
+        return JSONResponse(status_code=status_code, content=body)
+
+    fingerprint = fingerprint_payload(request.model_dump_json())
     try:
-        work_item = await devops.create_work_item(
-            project=route["devops_project"],
-            work_item_type=work_item_type,
-            title=title,
-            description=description_html,
-            area_path=route.get("area_path", route["devops_project"]),
-            priority=request.priority,
-            tags=tags,
+        record, replayed = await _get_idempotency().run(
+            f"{request.app_id}:{idempotency_key}",
+            fingerprint,
+            lambda: _process_submission(request),
+        )
+    except (AdmissionRejectedError, CircuitOpenError) as e:
+        return _rejection_response(http_request, e)
+    except IdempotencyConflictError as e:
+        raise ProblemException(
+            422,
+            code="IDEMPOTENCY_KEY_REUSED",
+            title="This Idempotency-Key was already used for a different request.",
+            detail=str(e),
+        )
+    except IdempotencyInProgressError as e:
+        raise ProblemException(
+            409,
+            code="IDEMPOTENCY_KEY_IN_PROGRESS",
+            title="A request with this Idempotency-Key is still being processed.",
+            detail=str(e),
         )
-    except Exception:
-        logger.exception("Failed to create DevOps work item for app_id=%s", request.app_id)
-        raise HTTPException(status_code=502, detail="Failed to create work item in Azure DevOps")
 
-    # 6. Generate ticket ID and store in Cosmos
-    ticket_id = _generate_ticket_id()
-    ticket = TicketDocument(
-        id=ticket_id,
-        app_id=request.app_id,
-        category=request.category,
-        subject=request.subject,
-        description=request.description,
-        priority=request.priority,
-        user_email=request.user_email,
-        user_name=request.user_name,
-        context=request.context,
-        license_info=request.license_info,
-        devops={
-            "org": "acidni",
-            "project": route["devops_project"],
-            "work_item_id": work_item["id"],
-            "work_item_url": work_item["url"],
-            "work_item_type": work_item_type,
-        },
-    )
+    headers = {"Idempotent-Replayed": "true"} if replayed else None
+    return JSONResponse(status_code=record.status_code, content=record.body, headers=headers)
+
+
+async def _process_batch_item(line: int, raw: bytes) -> BatchItemResult:
+    """Run one NDJSON batch item through the submit pipeline; never raises."""
+    ref = None
+    try:
+        data, ref = split_ref(raw)
+        request = SupportSubmitRequest.model_validate(data)
+    except ValueError as e:
+        return BatchItemResult(line=line, ref=ref, status="error", code="INVALID_ITEM", error=str(e)[:500])
 
     try:
-        await cosmos.save_ticket(ticket)
+        status_code, body = await _process_submission(request, admit=False)
+    except HTTPException as e:
+        code = "UNKNOWN_APP" if e.status_code == 400 else "DEVOPS_ERROR"
+        return BatchItemResult(line=line, ref=ref, status="error", code=code, error=str(e.detail))
+    except CircuitOpenError as e:
+        return BatchItemResult(line=line, ref=ref, status="error", code="DEVOPS_UNAVAILABLE", error=str(e))
     except Exception:
-        logger.exception("Failed to save ticket %s to Cosmos DB", ticket_id)
-        # Don't fail — work item was already created in DevOps
+        logger.exception("Batch item on line %d failed", line)
+        return BatchItemResult(line=line, ref=ref, status="error", code="INTERNAL_ERROR", error="Unexpected error")
+
+    if status_code == 202:
+        return BatchItemResult(line=line, ref=ref, status="queued", ticket_id=body["ticket_id"])
+    return BatchItemResult(
+        line=line,
+        ref=ref,
+        status=body["status"],
+        ticket_id=body["ticket_id"],
+        devops_work_item_id=body["devops_work_item_id"],
+        devops_work_item_url=body["devops_work_item_url"],
+    )
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """Streaming response whose body generator is still reading the request.
+
+    ``StreamingResponse`` normally listens for the disconnect message on
+    ``receive`` while streaming, which would swallow the request body chunks
+    the generator is waiting for.  Here the generator owns ``receive``; a
+    disconnect surfaces as ``ClientDisconnect`` from ``request.stream()``.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+@router.post(
+    "/submit/batch",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}, "description": "One BatchItemResult per line"}},
+)
+async def submit_batch(http_request: Request) -> StreamingResponse:
+    """
+    Bulk-submit support requests as NDJSON (one ``/submit`` body per line).
+
+    Items may carry a ``ref`` field (e.g. the source system's ticket ID),
+    which is echoed in their result.  The body is parsed as it arrives and
+    at most ``BATCH_SUBMIT_CONCURRENCY`` items are processed at once.  The
+    response streams one NDJSON ``BatchItemResult`` per item as it
+    completes, so results are not in input order — match them by ``line``
+    or ``ref``.  A failed item never fails the batch.
+    """
+    settings = get_settings()
+    lines = iter_ndjson_lines(http_request.stream(), settings.batch_max_line_bytes)
+    results = run_batch(lines, _process_batch_item, settings.batch_submit_concurrency)
+
+    async def body() -> AsyncIterator[bytes]:
+        counts: dict[str, int] = {}
+        async for result in results:
+            counts[result.status] = counts.get(result.status, 0) + 1
+            yield encode_result(result)
+        logger.info("Batch submit finished: %s", counts)
+
+    return _DuplexStreamingResponse(body(), media_type="application/x-ndjson")
+
+
+@router.get("/submit/{ticket_id}/status", response_model=SubmissionStatusResponse)
+async def get_submission_status(ticket_id: str) -> SubmissionStatusResponse:
+    """Return the processing status of an asynchronously submitted request."""
+    entry = await _get_outbox().get(ticket_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"No queued submission found for ticket {ticket_id}")
+
+    work_item = entry.work_item or {}
+    return SubmissionStatusResponse(
+        ticket_id=entry.stored_ticket_id or entry.ticket_id,
+        status=entry.status,
+        devops_work_item_id=work_item.get("id"),
+        devops_work_item_url=work_item.get("url"),
+        attempts=entry.attempts,
+    )
 
+
+async def process_outbox_entry(entry: OutboxEntry) -> None:
+    """Outbox handler — create the work item (once) and store the ticket.
+
+    The created work item is checkpointed in the outbox before the Cosmos
+    write, so a retry after a Cosmos failure never creates a second work item.
+    If the accepted ticket ID belongs to another ticket, the new ID is
+    checkpointed too before the ticket is stored under it.
+    """
+    submission = _get_submission()
+    outbox = _get_outbox()
+    request = SupportSubmitRequest.model_validate_json(entry.payload)
+    plan = submission.resolve_plan(request)
+
+    work_item = entry.work_item
+    if work_item is None:
+        work_item, _ = await submission.create_or_link_work_item(request, plan, entry.ticket_id)
+        await outbox.record_work_item(entry.ticket_id, work_item)
+
+    ticket_id = await submission.store_ticket(
+        entry.stored_ticket_id or entry.ticket_id,
+        request,
+        plan,
+        work_item,
+        reassigned=lambda new_id: outbox.record_ticket_id(entry.ticket_id, new_id),
+    )
+    _get_notification_service().notify_created(request.user_email, ticket_id, request.subject, request.app_id)
     logger.info(
         "Support ticket created: %s → %s #%s",
         ticket_id,
-        route["devops_project"],
+        plan.project,
         work_item["id"],
     )
 
-    return SupportSubmitResponse(
+
+async def _iter_upload(upload: UploadFile) -> AsyncIterator[bytes]:
+    while chunk := await upload.read(CHUNK_SIZE):
+        yield chunk
+
+
+@router.post("/tickets/{ticket_id}/screenshot", response_model=ScreenshotUploadResponse)
+async def upload_screenshot(ticket_id: str, app_id: str, http_request: Request) -> ScreenshotUploadResponse:
+    """Attach a screenshot to a ticket's DevOps work item.
+
+    The image can be sent as the raw request body (``image/png``,
+    ``image/jpeg``, ...), as base64 text (``text/plain``, optionally a
+    ``data:`` URL), or as the ``screenshot`` part of a multipart form.  It is
+    spooled to a temp file in chunks (decoding base64 on the fly), downscaled
+    and re-encoded with a thumbnail in the screenshot process pool, and then
+    streamed to the Azure DevOps attachments API, so memory use does not grow
+    with the image size.
+
+    Query params:
+        app_id: Application the ticket belongs to (required)
+    """
+    settings = get_settings()
+    devops = _get_devops()
+
+    ticket = await _get_cosmos().get_ticket(ticket_id, app_id)
+    devops_info = (ticket or {}).get("devops")
+    if not devops_info:
+        if settings.async_submit_enabled:
+            entry = await _get_outbox().get(ticket_id)
+            if entry is not None and entry.status in (OutboxStatus.QUEUED, OutboxStatus.PROCESSING):
+                return problem_response(
+                    409,
+                    http_request,
+                    code="TICKET_NOT_READY",
+                    title="The ticket's work item has not been created yet.",
+                    detail=f"Ticket {ticket_id} is still being processed. Retry shortly.",
+                    retry_after=5,
+                )
+        raise HTTPException(status_code=404, detail=f"Ticket {ticket_id} not found")
+
+    content_type = http_request.headers.get("content-type", "").split(";")[0].strip().lower()
+    # Base64 inflates by 4/3; reject obviously oversized bodies before reading them
+    try:
+        declared = int(http_request.headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Content-Length header") from None
+    if declared > settings.screenshot_max_bytes * 4 // 3 + 64 * 1024:
+        raise HTTPException(status_code=413, detail=f"Screenshot exceeds {settings.screenshot_max_bytes} bytes")
+
+    form = None
+    try:
+        if content_type == "multipart/form-data":
+            form = await http_request.form(max_files=1, max_fields=10)
+            upload = form.get("screenshot")
+            if not isinstance(upload, UploadFile):
+                raise HTTPException(status_code=422, detail="Missing 'screenshot' file part")
+            upload_type = (upload.content_type or "").split(";")[0].strip().lower()
+            chunks = _iter_upload(upload)
+            base64_encoded = upload_type in BASE64_CONTENT_TYPES
+        else:
+            chunks = http_request.stream()
+            base64_encoded = content_type in BASE64_CONTENT_TYPES
+
+        try:
+            spooled = await spool_screenshot(
+                chunks,
+                base64_encoded=base64_encoded,
+                max_bytes=settings.screenshot_max_bytes,
+            )
+        except ScreenshotTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except ScreenshotUploadError as e:
+            raise HTTPException(status_code=415, detail=str(e))
+    finally:
+        if form is not None:
+            await form.close()
+
+    processed: ProcessedScreenshot | None = None
+    processor = _get_screenshot_processor()
+    if settings.screenshot_processing_enabled and processor.available:
+        try:
+            processed = await processor.process(spooled.path)
+        except Exception:
+            # Fall back to attaching the image exactly as uploaded
+            logger.warning("Screenshot processing failed for %s; attaching original", ticket_id, exc_info=True)
+
+    project = devops_info["project"]
+    work_item_id = devops_info["work_item_id"]
+    if processed is not None:
+        path, size = processed.image.path, processed.image.size
+        content_type, extension = processed.image.content_type, processed.image.extension
+    else:
+        path, size = spooled.path, spooled.size
+        content_type, extension = spooled.content_type, spooled.extension
+
+    thumbnail_url = None
+    try:
+        attachment = await devops.upload_attachment(
+            project,
+            f"{ticket_id}-screenshot{extension}",
+            iter_file(path),
+            size,
+        )
+        await devops.link_attachment(project, work_item_id, attachment["url"], comment="Customer screenshot")
+        if processed is not None:
+            thumbnail = await devops.upload_attachment(
+                project,
+                f"{ticket_id}-screenshot-thumb{processed.thumbnail.extension}",
+                iter_file(processed.thumbnail.path),
+                processed.thumbnail.size,
+            )
+            await devops.link_attachment(project, work_item_id, thumbnail["url"], comment="Screenshot thumbnail")
+            thumbnail_url = thumbnail["url"]
+    except Exception:
+        logger.exception("Failed to attach screenshot to work item #%s for %s", work_item_id, ticket_id)
+        raise HTTPException(status_code=502, detail="Failed to attach screenshot in Azure DevOps")
+    finally:
+        spooled.unlink()
+        if processed is not None:
+            processed.unlink()
+
+    audit_log = _get_audit_log()
+    if audit_log is not None:
+        audit_log.log(ticket_id, app_id, "screenshot_attached", {
+            "work_item_id": work_item_id,
+            "attachment_url": attachment["url"],
+            "size": size,
+        })
+
+    return ScreenshotUploadResponse(
         ticket_id=ticket_id,
-        devops_work_item_id=work_item["id"],
-        devops_work_item_url=work_item["url"],
-        status="created",
-        message="Your support request has been submitted. We'll review it shortly.",
+        devops_work_item_id=work_item_id,
+        attachment_url=attachment["url"],
+        thumbnail_url=thumbnail_url,
+        size=size,
+        content_type=content_type,
     )
 
 
@@ -254,35 +777,64 @@ async def get_widget_config(app_id: str) -> WidgetConfig:
     )
 
 
-@router.get("/tickets")
+@router.get("/tickets", response_model=list[TicketSummary])
 async def list_user_tickets(
+    response: Response,
     app_id: str | None = None,
     email: str | None = None,
-    limit: int = 25,
-) -> list[dict]:
+    limit: int = Query(25, ge=1, le=100),
+    cursor: str | None = None,
+) -> list[TicketSummary]:
     """List past support tickets for a user/app, most recent first.
 
     Query params:
-        app_id: Filter by application
+        app_id: Filter by application (reads a single partition)
         email:  Filter by submitter email
-        limit:  Max results (default 25)
+        limit:  Max results (default 25, max 100)
+        cursor: ``X-Next-Cursor`` value from the previous page
+
+    When more tickets exist the response carries an opaque ``X-Next-Cursor``
+    header; pass it back as ``cursor`` with the same filters.  A listing
+    without ``app_id`` that is not served from the email index spans every
+    partition and returns only its first page, with no cursor.
     """
+    continuation = None
+    if cursor:
+        try:
+            continuation = decode_cursor(cursor, app_id, email)
+        except InvalidCursorError as exc:
+            raise ProblemException(
+                400,
+                code="INVALID_CURSOR",
+                title="The page cursor is not valid for this query.",
+                detail=str(exc),
+            ) from exc
+
     cosmos = _get_cosmos()
-    tickets = await cosmos.list_tickets(app_id=app_id, user_email=email, limit=limit)
-    # Return only safe fields (strip internal partition keys etc.)
-    return [
-        {
-            "ticket_id": t["id"],
-            "app_id": t.get("app_id"),
-            "category": t.get("category"),
-            "subject": t.get("subject"),
-            "status": t.get("status", "created"),
-            "priority": t.get("priority"),
-            "created_at": t.get("created_at"),
-            "devops_work_item_id": t.get("devops", {}).get("work_item_id") if t.get("devops") else None,
-        }
-        for t in tickets
-    ]
+    if email and get_settings().email_index_reads_enabled:
+        # Single-partition read of the user's summaries instead of a cross-partition scan
+        tickets, next_continuation = await cosmos.list_tickets_by_email(
+            email, app_id=app_id, limit=limit, continuation=continuation, fields=TICKET_SUMMARY_FIELDS
+        )
+    else:
+        tickets, next_continuation = await cosmos.list_tickets(
+            app_id=app_id, user_email=email, limit=limit, continuation=continuation, fields=TICKET_SUMMARY_FIELDS
+        )
+    if next_continuation:
+        response.headers["X-Next-Cursor"] = encode_cursor(next_continuation, app_id, email)
+    # Cosmos returns only the summary fields, so descriptions and context never leave the database
+    return [TicketSummary.from_document(t) for t in tickets]
+
+
+@router.get("/tickets/{ticket_id}/audit", response_model=list[AuditEntry])
+async def get_ticket_audit(ticket_id: str, app_id: str) -> list[AuditEntry]:
+    """Return a ticket's audit trail, oldest first.
+
+    Query params:
+        app_id: Application the ticket belongs to (required; selects the partition)
+    """
+    entries = await _get_cosmos().list_audit_entries(ticket_id, app_id)
+    return [AuditEntry(**entry) for entry in entries]
 
 
 @router.get("/license-info")
@@ -0,0 +1,111 @@
+"""
+Admission control — adaptive concurrency limit for the synchronous submit path.
+
+Each synchronous submit holds DevOps and Cosmos calls open for its whole
+duration.  When Azure DevOps slows down, unbounded concurrency turns into
+piles of waiting coroutines and sockets.  ``AdaptiveConcurrencyLimiter`` caps
+in-flight submits with an AIMD (additive-increase, multiplicative-decrease)
+limit driven by observed upstream latency:
+
+* a submit that completes within ``latency_target`` while the limiter is at
+  least half used grows the limit by ``1 / limit`` (about +1 per full window);
+* a submit that is slower than the target, or fails, shrinks the limit by
+  ``backoff_ratio`` — at most once per ``latency_target`` so a burst of slow
+  completions from the same window is counted once.
+
+Requests over the limit are rejected immediately rather than queued, with a
+Retry-After hint derived from the smoothed latency.
+"""
+
+import math
+import time
+from collections.abc import Callable
+
+from api.metrics import registry
+
+_limit_gauge = registry.gauge("admission_limit", "Current adaptive submit concurrency limit")
+_in_flight_gauge = registry.gauge("admission_in_flight", "Synchronous submits in flight")
+_rejections = registry.counter("admission_rejections_total", "Submits rejected by admission control")
+_latency = registry.histogram("admission_submit_seconds", "Latency of admitted synchronous submits")
+
+
+class AdmissionRejectedError(Exception):
+    """The submit was rejected because the concurrency limit is reached."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(f"Submit concurrency limit reached; retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limiter driven by request latency and failures."""
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 2,
+        max_limit: int = 200,
+        latency_target: float = 3.0,
+        backoff_ratio: float = 0.9,
+        smoothing: float = 0.2,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._min = min_limit
+        self._max = max_limit
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._target = latency_target
+        self._backoff = backoff_ratio
+        self._smoothing = smoothing
+        self._clock = clock
+        self._in_flight = 0
+        self._smoothed_latency = 0.0
+        self._last_decrease = float("-inf")
+        _limit_gauge.set(self.limit)
+        _in_flight_gauge.set(0)
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def retry_after(self) -> int:
+        """Seconds a rejected client should wait: roughly one submit duration."""
+        return max(1, min(30, math.ceil(self._smoothed_latency or self._target)))
+
+    def try_acquire(self) -> bool:
+        """Admit a request if below the limit; never waits."""
+        if self._in_flight >= self.limit:
+            _rejections.inc()
+            return False
+        self._in_flight += 1
+        _in_flight_gauge.set(self._in_flight)
+        return True
+
+    def acquire(self) -> None:
+        """Admit a request or raise ``AdmissionRejectedError``."""
+        if not self.try_acquire():
+            raise AdmissionRejectedError(self.retry_after())
+
+    def release(self, latency: float, *, failed: bool = False) -> None:
+        """Record a finished request and adapt the limit."""
+        self._in_flight -= 1
+        _in_flight_gauge.set(self._in_flight)
+        _latency.observe(latency)
+        self._smoothed_latency = (
+            latency
+            if self._smoothed_latency == 0.0
+            else self._smoothed_latency + self._smoothing * (latency - self._smoothed_latency)
+        )
+
+        now = self._clock()
+        if failed or latency > self._target:
+            if now - self._last_decrease >= self._target:
+                self._limit = max(self._min, self._limit * self._backoff)
+                self._last_decrease = now
+        elif (self._in_flight + 1) * 2 >= self._limit:
+            # Only grow when the limit is actually being used
+            self._limit = min(self._max, self._limit + 1 / self._limit)
+        _limit_gauge.set(self.limit)
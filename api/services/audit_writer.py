@@ -0,0 +1,124 @@
+"""
+Buffered audit log writer.
+
+``AuditLogWriter.log`` only appends to an in-memory queue, so recording an
+audit entry adds no Cosmos DB round trip to the request that caused it.  A
+background task flushes the queue every ``flush_interval`` seconds, or as
+soon as ``batch_size`` entries are waiting: entries are grouped by
+partition (``app_id``) and written as transactional batches of up to 100,
+so N entries for one app cost one call instead of N.
+
+Entries are best-effort: a failed batch is retried on the next flushes
+(``max_attempts`` in total) and the queue is bounded — when it is full new
+entries are dropped and counted rather than blocking callers.  ``stop``
+flushes whatever is left, so a clean shutdown loses nothing.
+"""
+
+import asyncio
+import logging
+from collections import deque
+
+from api.metrics import registry
+from api.services.cosmos_service import audit_doc
+from api.services.ticket_store import TicketStore
+
+logger = logging.getLogger("acidni-support.services.audit_writer")
+
+_queue_depth = registry.gauge("audit_log_queue_depth", "Audit entries waiting to be written")
+_written = registry.counter("audit_log_entries_written_total", "Audit entries written to Cosmos DB")
+_batches = registry.counter("audit_log_batches_total", "Audit batch writes by outcome")
+_dropped = registry.counter(
+    "audit_log_entries_dropped_total", "Audit entries dropped (queue full or retries exhausted)"
+)
+
+# Cosmos DB transactional batches hold at most 100 operations
+MAX_BATCH_SIZE = 100
+
+
+class AuditLogWriter:
+    """Queue audit entries and write them in partition-grouped batches."""
+
+    def __init__(
+        self,
+        cosmos: TicketStore,
+        batch_size: int = MAX_BATCH_SIZE,
+        flush_interval: float = 1.0,
+        max_queue: int = 10_000,
+        max_attempts: int = 3,
+    ) -> None:
+        self._cosmos = cosmos
+        self._batch_size = min(batch_size, MAX_BATCH_SIZE)
+        self._flush_interval = flush_interval
+        self._max_queue = max_queue
+        self._max_attempts = max_attempts
+        self._queue: deque[tuple[dict, int]] = deque()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: asyncio.Task | None = None
+
+    def log(self, ticket_id: str, app_id: str, action: str, details: dict) -> None:
+        """Queue an audit entry; never blocks or raises."""
+        if len(self._queue) >= self._max_queue:
+            _dropped.inc(reason="queue_full")
+            logger.warning("Audit queue full — dropping %s entry for %s", action, ticket_id)
+            return
+        self._queue.append((audit_doc(ticket_id, app_id, action, details), 0))
+        _queue_depth.set(len(self._queue))
+        if len(self._queue) >= self._batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """Write every queued entry.  Returns the number written."""
+        pending, self._queue = self._queue, deque()
+        by_partition: dict[str, list[tuple[dict, int]]] = {}
+        for entry, attempts in pending:
+            by_partition.setdefault(entry["app_id"], []).append((entry, attempts))
+
+        written = 0
+        for app_id, entries in by_partition.items():
+            for start in range(0, len(entries), self._batch_size):
+                chunk = entries[start:start + self._batch_size]
+                try:
+                    await self._cosmos.save_audit_logs(app_id, [entry for entry, _ in chunk])
+                except Exception:
+                    _batches.inc(outcome="failed")
+                    logger.exception("Failed to write %d audit entries for %s", len(chunk), app_id)
+                    self._requeue(chunk)
+                    continue
+                _batches.inc(outcome="ok")
+                written += len(chunk)
+        _written.inc(written)
+        _queue_depth.set(len(self._queue))
+        return written
+
+    def _requeue(self, chunk: list[tuple[dict, int]]) -> None:
+        for entry, attempts in chunk:
+            if attempts + 1 >= self._max_attempts:
+                _dropped.inc(reason="retries_exhausted")
+            else:
+                self._queue.append((entry, attempts + 1))
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._flush_interval)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._queue:
+                await self.flush()
+
+    async def start(self) -> None:
+        """Start flushing in the background."""
+        self._task = asyncio.create_task(self._run(), name="audit-log-writer")
+
+    async def stop(self) -> None:
+        """Stop the background task and flush what is left."""
+        if self._task is not None:
+            # Let a flush in progress finish rather than cancelling it mid-batch
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        if self._queue:
+            await self.flush()
@@ -0,0 +1,119 @@
+"""
+Batch ingestion — NDJSON in, NDJSON out, with bounded concurrency.
+
+``POST /api/submit/batch`` migrates historical tickets through the same
+routing, DevOps and Cosmos pipeline as ``/api/submit``.  The request body is
+split into lines as it arrives; at most ``concurrency`` items are in flight,
+and the next line is only read once a slot frees, so a slow DevOps
+back-pressures the upload instead of buffering it.  One result line is
+written per item as soon as it completes (not in input order — each result
+carries its 1-based ``line`` number and the item's optional ``ref``).
+
+Memory stays bounded by ``concurrency × max_line_bytes`` whatever the size
+of the upload.
+"""
+
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable
+
+from api.models import BatchItemResult
+
+logger = logging.getLogger("acidni-support.services.batch_ingest")
+
+
+class LineTooLongError(ValueError):
+    """An NDJSON line exceeded the configured maximum size."""
+
+
+async def iter_ndjson_lines(
+    chunks: AsyncIterable[bytes],
+    max_line_bytes: int,
+) -> AsyncIterator[tuple[int, bytes | LineTooLongError]]:
+    """Split a byte stream into ``(line_number, line)`` pairs.
+
+    Blank lines are skipped (but counted).  A line longer than
+    ``max_line_bytes`` is discarded as it streams past and reported as a
+    ``LineTooLongError`` in place of its content.
+    """
+    buffer = bytearray()
+    line_number = 0
+    discarding = False
+    async for chunk in chunks:
+        start = 0
+        while (end := chunk.find(b"\n", start)) != -1:
+            line_number += 1
+            if discarding:
+                discarding = False
+                yield line_number, LineTooLongError(f"Line exceeds {max_line_bytes} bytes")
+            else:
+                buffer += chunk[start:end]
+                if len(buffer) > max_line_bytes:
+                    yield line_number, LineTooLongError(f"Line exceeds {max_line_bytes} bytes")
+                elif buffer.strip():
+                    yield line_number, bytes(buffer)
+            buffer.clear()
+            start = end + 1
+        if not discarding:
+            buffer += chunk[start:]
+            if len(buffer) > max_line_bytes:
+                discarding = True
+                buffer.clear()
+    if discarding:
+        yield line_number + 1, LineTooLongError(f"Line exceeds {max_line_bytes} bytes")
+    elif buffer.strip():
+        yield line_number + 1, bytes(buffer)
+
+
+ItemHandler = Callable[[int, bytes], Awaitable[BatchItemResult]]
+
+
+async def run_batch(
+    lines: AsyncIterator[tuple[int, bytes | LineTooLongError]],
+    handler: ItemHandler,
+    concurrency: int,
+) -> AsyncIterator[BatchItemResult]:
+    """Run ``handler`` over ``lines`` with at most ``concurrency`` in flight.
+
+    Yields results in completion order.  If the consumer stops early (e.g.
+    the client disconnected), in-flight items are cancelled.
+    """
+    pending: set[asyncio.Task[BatchItemResult]] = set()
+    exhausted = False
+    try:
+        while pending or not exhausted:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    line_number, line = await anext(lines)
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                if isinstance(line, LineTooLongError):
+                    yield BatchItemResult(line=line_number, status="error", code="LINE_TOO_LONG", error=str(line))
+                    continue
+                pending.add(asyncio.create_task(handler(line_number, line)))
+            if not pending:
+                continue
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+def encode_result(result: BatchItemResult) -> bytes:
+    """Serialise one result as an NDJSON line."""
+    return result.model_dump_json(exclude_none=True).encode() + b"\n"
+
+
+def split_ref(line: bytes) -> tuple[dict, str | None]:
+    """Parse an item line and pop its optional caller reference (``ref``)."""
+    data = json.loads(line)
+    if not isinstance(data, dict):
+        raise ValueError("Each line must be a JSON object")
+    ref = data.pop("ref", None)
+    return data, None if ref is None else str(ref)
@@ -0,0 +1,198 @@
+"""
+Cosmos DB request-unit and latency accounting.
+
+``CosmosService`` installs ``response_hook`` on its client, so every HTTP
+response — query pages, batch calls, 404s and throttled retries included —
+reports its ``x-ms-request-charge``, ``x-ms-request-duration-ms`` and
+``x-ms-retry-after-ms`` headers here.  Responses are attributed to:
+
+* the **operation** in progress (``@tracked("get_ticket")`` on the service
+  method).  Each completed operation observes its total charge, server
+  duration and wall-clock latency in per-operation histograms and tags the
+  current OpenTelemetry span with the same figures;
+* the **route** of the API request that caused them (``request_usage`` in
+  the HTTP middleware).  Cumulative RU per route is exported on
+  ``GET /api/metrics/cosmos``, so a change that makes an endpoint more
+  expensive shows up as a jump in its counter.
+
+Work done outside a request (status sync, audit flushes) is counted under
+the ``background`` route; responses outside a tracked operation under the
+``other`` operation.
+"""
+
+import functools
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from api.metrics import registry
+
+logger = logging.getLogger("acidni-support.services.cosmos_metrics")
+
+# Request charge buckets in RU: point reads cost ~1, queries and batches more
+RU_BUCKETS = (1.0, 2.0, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0)
+
+_request_units = registry.counter("cosmos_request_units_total", "Request units consumed, per operation")
+_route_units = registry.counter("cosmos_request_units_by_route_total", "Request units consumed, per API route")
+_responses = registry.counter("cosmos_responses_total", "Cosmos DB responses, per operation and status code")
+_throttled = registry.counter("cosmos_throttled_responses_total", "429 responses from Cosmos DB, per operation")
+_charge = registry.histogram(
+    "cosmos_operation_request_charge", "Request units consumed by one operation", buckets=RU_BUCKETS
+)
+_server_duration = registry.histogram(
+    "cosmos_operation_server_seconds", "Server-side duration reported by Cosmos DB for one operation"
+)
+_latency = registry.histogram("cosmos_operation_seconds", "Wall-clock duration of one operation, retries included")
+_retry_after = registry.histogram("cosmos_retry_after_seconds", "Back-off requested by throttled responses")
+
+AsyncMethod = Callable[..., Awaitable[Any]]
+
+BACKGROUND_ROUTE = "background"
+UNTRACKED_OPERATION = "other"
+
+
+class CosmosUsage:
+    """Totals of the Cosmos DB responses seen in one scope."""
+
+    __slots__ = ("request_charge", "server_duration_ms", "retry_after_ms", "responses", "throttled", "closed")
+
+    def __init__(self) -> None:
+        self.request_charge = 0.0
+        self.server_duration_ms = 0.0
+        self.retry_after_ms = 0.0
+        self.responses = 0
+        self.throttled = 0
+        self.closed = False
+
+
+_operation: ContextVar[tuple[str, CosmosUsage] | None] = ContextVar("cosmos_operation", default=None)
+_request: ContextVar[CosmosUsage | None] = ContextVar("cosmos_request", default=None)
+
+
+def _header(headers: Mapping[str, str] | None, name: str) -> float:
+    try:
+        return float((headers or {}).get(name) or 0)
+    except ValueError:
+        return 0.0
+
+
+def record_response(headers: Mapping[str, str] | None, status_code: int | None = None) -> None:
+    """Account one Cosmos DB response to the current operation and request."""
+    charge = _header(headers, "x-ms-request-charge")
+    duration_ms = _header(headers, "x-ms-request-duration-ms")
+    retry_after_ms = _header(headers, "x-ms-retry-after-ms")
+    throttled = status_code == 429
+
+    current = _operation.get()
+    name = current[0] if current else UNTRACKED_OPERATION
+    _request_units.inc(charge, operation=name)
+    _responses.inc(operation=name, status=str(status_code or 0))
+    if throttled:
+        _throttled.inc(operation=name)
+    if retry_after_ms:
+        _retry_after.observe(retry_after_ms / 1000, operation=name)
+
+    request = _request.get()
+    if request is not None and request.closed:
+        request = None  # a task the request left behind, e.g. a deferred flush
+    if request is None:
+        _route_units.inc(charge, route=BACKGROUND_ROUTE)
+    for usage in (current[1] if current else None, request):
+        if usage is not None:
+            usage.request_charge += charge
+            usage.server_duration_ms += duration_ms
+            usage.retry_after_ms += retry_after_ms
+            usage.responses += 1
+            usage.throttled += throttled
+
+
+def response_hook(pipeline_response) -> None:
+    """``raw_response_hook`` for the Cosmos client; never raises."""
+    try:
+        response = pipeline_response.http_response
+        record_response(response.headers, response.status_code)
+    except Exception:
+        logger.debug("Could not record Cosmos DB response metrics", exc_info=True)
+
+
+def _tag_span(name: str, usage: CosmosUsage) -> None:
+    """Add an operation's totals to the current OpenTelemetry span, if recording."""
+    try:
+        from opentelemetry import trace
+
+        span = trace.get_current_span()
+        if not span.is_recording():
+            return
+        existing = getattr(span, "attributes", None) or {}
+        for field in ("request_charge", "server_duration_ms", "retry_after_ms"):
+            key = f"cosmos.{name}.{field}"
+            span.set_attribute(key, float(existing.get(key, 0.0)) + getattr(usage, field))
+    except Exception:
+        pass
+
+
+@contextmanager
+def operation(name: str) -> Iterator[CosmosUsage]:
+    """Attribute the Cosmos DB responses inside the block to operation ``name``.
+
+    An inner operation takes its own responses; they are not counted again
+    by the enclosing one.
+    """
+    usage = CosmosUsage()
+    token = _operation.set((name, usage))
+    started = time.perf_counter()
+    try:
+        yield usage
+    finally:
+        _operation.reset(token)
+        _latency.observe(time.perf_counter() - started, operation=name)
+        if usage.responses:
+            _charge.observe(usage.request_charge, operation=name)
+            _server_duration.observe(usage.server_duration_ms / 1000, operation=name)
+            _tag_span(name, usage)
+
+
+def tracked(name: str) -> Callable[[AsyncMethod], AsyncMethod]:
+    """Decorate an async ``CosmosService`` method as operation ``name``."""
+    def decorator(func: AsyncMethod) -> AsyncMethod:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with operation(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def request_usage() -> Iterator[CosmosUsage]:
+    """Collect the Cosmos DB usage of one API request (see ``record_route``)."""
+    usage = CosmosUsage()
+    token = _request.set(usage)
+    try:
+        yield usage
+    finally:
+        usage.closed = True
+        _request.reset(token)
+
+
+def record_route(route: str, usage: CosmosUsage) -> None:
+    """Add a finished request's usage to its route's cumulative RU counter."""
+    if usage.responses:
+        _route_units.inc(usage.request_charge, route=route)
+
+
+def route_usage() -> dict[str, float]:
+    """Cumulative RU per route, most expensive first."""
+    values = _route_units.snapshot()["values"]
+    by_route = {label.removeprefix("route="): units for label, units in values.items()}
+    return dict(sorted(by_route.items(), key=lambda item: item[1], reverse=True))
+
+
+def operation_usage() -> dict[str, float]:
+    """Cumulative RU per operation, most expensive first."""
+    values = _request_units.snapshot()["values"]
+    by_operation = {label.removeprefix("operation="): units for label, units in values.items()}
+    return dict(sorted(by_operation.items(), key=lambda item: item[1], reverse=True))
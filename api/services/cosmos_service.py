@@ -3,16 +3,139 @@ Cosmos DB service — ticket storage and retrieval.
 """
 
 import logging
+import re
+import uuid
+from collections.abc import AsyncIterator, Sequence
 from datetime import datetime
+from typing import NamedTuple
 
 from azure.cosmos.aio import CosmosClient
+from azure.cosmos.exceptions import (
+    CosmosBatchOperationError,
+    CosmosResourceExistsError,
+    CosmosResourceNotFoundError,
+)
 from azure.identity.aio import DefaultAzureCredential
 
 from api.config import get_settings
 from api.models import TicketDocument
+from api.services.cosmos_metrics import response_hook, tracked
+from api.services.ticket_cache import TicketCache
+from api.services.ticket_store import TicketIdConflictError, is_same_submission
 
 logger = logging.getLogger("acidni-support.services.cosmos")
 
+# Cosmos DB transactional batches hold at most 100 operations
+_MAX_BATCH_OPERATIONS = 100
+
+# Keep continuation tokens (and so the page cursors built from them) small
+_CONTINUATION_TOKEN_LIMIT_KB = 2
+
+
+class TicketPage(NamedTuple):
+    """One page of ``list_tickets`` results."""
+
+    items: list[dict]
+    continuation: str | None
+
+
+# Document paths behind TicketSummary — the only fields the ticket list returns
+TICKET_SUMMARY_FIELDS = (
+    "id", "app_id", "category", "subject", "status", "priority", "created_at", "devops.work_item_id",
+)
+
+_FIELD_PATH = re.compile(r"^[A-Za-z_]\w*(\.[A-Za-z_]\w*)*$")
+
+
+def projection(fields: Sequence[str]) -> list[tuple[str, str]]:
+    """Validate dotted document paths and pair each with its result alias.
+
+    Nested paths are aliased with underscores, e.g. ``devops.work_item_id``
+    comes back as ``devops_work_item_id``.
+    """
+    columns = []
+    for field in fields:
+        if not _FIELD_PATH.match(field):
+            raise ValueError(f"Invalid projection field: {field!r}")
+        columns.append((field, field.replace(".", "_")))
+    return columns
+
+
+def select_list(fields: Sequence[str] | None) -> str:
+    """Return a query SELECT list projecting dotted document paths (``*`` for all fields)."""
+    if not fields:
+        return "*"
+    return ", ".join(
+        f"c.{field}" if alias == field else f"c.{field} AS {alias}" for field, alias in projection(fields)
+    )
+
+
+# Ticket fields copied into the email index — what the "My Tickets" view shows
+_EMAIL_INDEX_FIELDS = ("id", "app_id", "category", "subject", "status", "priority", "created_at", "updated_at")
+
+
+def normalize_email(email: str) -> str:
+    """Return the email index partition key for an address."""
+    return email.strip().lower()
+
+
+def email_index_doc(ticket: dict) -> dict:
+    """Build the ``tickets_by_email`` summary for a stored ticket document."""
+    email = normalize_email(ticket["user_email"])
+    doc = {field: ticket.get(field) for field in _EMAIL_INDEX_FIELDS}
+    devops = ticket.get("devops") or {}
+    doc["devops"] = {"work_item_id": devops.get("work_item_id")}
+    doc["user_email"] = email
+    doc["_partition_key"] = email
+    return doc
+
+
+# Audit entries live in the tickets container, in their ticket's partition, so a
+# ticket and its audit trail can be written in one transactional batch.  Ticket
+# documents have no doc_type.
+AUDIT_DOC_TYPE = "audit"
+_TICKETS_ONLY = "NOT IS_DEFINED(c.doc_type)"
+_AUDIT_FIELDS = "c.id, c.ticket_id, c.app_id, c.action, c.details, c.timestamp"
+
+
+def audit_doc(
+    ticket_id: str,
+    app_id: str,
+    action: str,
+    details: dict,
+    timestamp: str | None = None,
+    entry_id: str | None = None,
+) -> dict:
+    """Build an audit entry document for the tickets container.
+
+    Ids are random unless ``entry_id`` is given for an entry that must be
+    written at most once (e.g. a ticket's ``created`` entry).
+    """
+    return {
+        "id": entry_id or uuid.uuid4().hex,
+        "doc_type": AUDIT_DOC_TYPE,
+        "ticket_id": ticket_id,
+        "app_id": app_id,
+        "action": action,
+        "details": details,
+        "timestamp": timestamp or datetime.utcnow().isoformat(),
+        "_partition_key": app_id,
+    }
+
+
+def _request_charge(headers) -> float:
+    try:
+        return float((headers or {}).get("x-ms-request-charge", 0))
+    except ValueError:
+        return 0.0
+
+
+def _status_patch(status: str, updated_at: str) -> list[dict]:
+    return [
+        {"op": "set", "path": "/status", "value": status},
+        {"op": "set", "path": "/updated_at", "value": updated_at},
+    ]
+
 
 class CosmosService:
     """Cosmos DB operations for support tickets."""
@@ -23,43 +146,171 @@ class CosmosService:
         self._database_name = settings.cosmos_database
         self._credential = DefaultAzureCredential()
         self._client: CosmosClient | None = None
+        self._email_index = settings.email_index_enabled
+        self._legacy_audit_container = settings.audit_legacy_container
+        self._tickets: TicketCache | None = None
+        if settings.ticket_cache_enabled:
+            self._tickets = TicketCache(
+                max_entries=settings.ticket_cache_max_entries,
+                ttl_seconds=settings.ticket_cache_ttl_seconds,
+                negative_ttl_seconds=settings.ticket_cache_negative_ttl_seconds,
+            )
 
     async def _get_container(self, container_name: str = "tickets"):
         """Get a Cosmos container client (lazy init)."""
         if self._client is None:
-            self._client = CosmosClient(self._endpoint, credential=self._credential)
+            # Every response reports its RU charge, server duration and retry-after
+            self._client = CosmosClient(self._endpoint, credential=self._credential, raw_response_hook=response_hook)
         db = self._client.get_database_client(self._database_name)
         return db.get_container_client(container_name)
 
+    @tracked("save_ticket")
     async def save_ticket(self, ticket: TicketDocument) -> dict:
-        """Save a ticket document to the tickets container."""
+        """Create a ticket document in the tickets container.
+
+        Raises ``TicketIdConflictError`` if another ticket already has this
+        ID; a retried save of the same ticket returns the stored document.
+        """
         container = await self._get_container("tickets")
         doc = ticket.model_dump(mode="json")
         doc["_partition_key"] = ticket.app_id
-        result = await container.upsert_item(doc)
+        try:
+            result = await container.create_item(doc)
+        except CosmosResourceExistsError:
+            result = await self._stored_retry(container, doc)
         logger.info("Saved ticket %s to Cosmos DB", ticket.id)
+        await self._ticket_saved(result if isinstance(result, dict) and result.get("id") else doc)
         return result
 
-    async def get_ticket(self, ticket_id: str, app_id: str) -> dict | None:
-        """Retrieve a ticket by ID."""
+    @tracked("save_ticket")
+    async def save_ticket_with_audit(self, ticket: TicketDocument, details: dict) -> dict:
+        """Save a ticket and its ``created`` audit entry atomically, in one request.
+
+        Both documents are written by a single transactional batch in the
+        ticket's partition: either both are stored or neither is.  The ticket
+        is created, not upserted, so ``TicketIdConflictError`` is raised if
+        another ticket already has its ID.  The audit entry's id derives from
+        the ticket id, so a retried save does not record a second ``created``
+        entry.
+        """
         container = await self._get_container("tickets")
+        doc = ticket.model_dump(mode="json")
+        doc["_partition_key"] = ticket.app_id
+        entry = audit_doc(
+            ticket.id, ticket.app_id, "created", details, timestamp=ticket.created_at, entry_id=f"{ticket.id}-created"
+        )
+        try:
+            results = await container.execute_item_batch(
+                batch_operations=[("create", (doc,)), ("upsert", (entry,))],
+                partition_key=ticket.app_id,
+            )
+            stored = results[0].get("resourceBody") or doc
+        except CosmosBatchOperationError as exc:
+            if exc.error_index != 0 or exc.status_code != 409:
+                raise
+            stored = await self._stored_retry(container, doc)
+            try:
+                await container.create_item(entry)
+            except CosmosResourceExistsError:
+                pass  # written with the ticket by the earlier attempt
+        logger.info("Saved ticket %s with audit entry to Cosmos DB", ticket.id)
+        await self._ticket_saved(stored)
+        return stored
+
+    @staticmethod
+    async def _stored_retry(container, doc: dict) -> dict:
+        """Return the stored ticket ``doc`` collided with if it is the same ticket, else raise."""
+        stored = await container.read_item(item=doc["id"], partition_key=doc["app_id"])
+        if not is_same_submission(stored, doc):
+            raise TicketIdConflictError(f"Ticket ID {doc['id']} is already used by another ticket")
+        logger.info("Ticket %s was already stored; treating the save as a retry", doc["id"])
+        return stored
+
+    async def _ticket_saved(self, doc: dict) -> None:
+        """Propagate a stored ticket to the cache and the email index."""
+        self._cache_tickets([doc])
+        if self._email_index:
+            await self._update_email_index([doc])
+
+    @tracked("email_index")
+    async def index_ticket_emails(self, tickets: list[dict]) -> int:
+        """Upsert ``tickets_by_email`` summaries for stored tickets that have an email.
+
+        Returns the number of summaries written.
+        """
+        container = await self._get_container("tickets_by_email")
+        written = 0
+        for ticket in tickets:
+            if ticket.get("user_email"):
+                await container.upsert_item(email_index_doc(ticket))
+                written += 1
+        return written
+
+    async def _update_email_index(self, tickets: list[dict]) -> None:
+        """Refresh email index summaries; failures are logged (the backfill repairs them)."""
         try:
-            item = await container.read_item(item=ticket_id, partition_key=app_id)
-            return item
+            await self.index_ticket_emails(tickets)
         except Exception:
+            logger.exception("Failed to update the email index for %d tickets", len(tickets))
+
+    async def get_ticket(self, ticket_id: str, app_id: str) -> dict | None:
+        """Retrieve a ticket by ID, or None if it does not exist.
+
+        Served from the ticket cache when enabled.  Errors other than a 404
+        propagate instead of being reported as a missing ticket.
+        """
+        if self._tickets is None:
+            ticket, _ = await self._read_ticket(ticket_id, app_id)
+            return ticket
+        return await self._tickets.get(app_id, ticket_id, lambda: self._read_ticket(ticket_id, app_id))
+
+    @tracked("get_ticket")
+    async def _read_ticket(self, ticket_id: str, app_id: str) -> tuple[dict | None, float]:
+        """Point-read a ticket; returns ``(document or None, request charge)``."""
+        container = await self._get_container("tickets")
+        headers: dict = {}
+        try:
+            item = await container.read_item(
+                item=ticket_id,
+                partition_key=app_id,
+                response_hook=lambda response_headers, _: headers.update(response_headers),
+            )
+        except CosmosResourceNotFoundError as exc:
             logger.warning("Ticket %s not found", ticket_id)
-            return None
+            return None, _request_charge(exc.headers)
+        return item, _request_charge(headers)
+
+    def _cache_tickets(self, tickets: list[dict]) -> None:
+        """Write stored ticket documents through to the ticket cache."""
+        if self._tickets is not None:
+            for ticket in tickets:
+                if ticket.get("id") and ticket.get("app_id"):
+                    self._tickets.put(ticket)
 
+    @tracked("list_tickets")
     async def list_tickets(
         self,
         app_id: str | None = None,
         user_email: str | None = None,
         limit: int = 50,
-    ) -> list[dict]:
-        """List tickets with optional filters."""
+        continuation: str | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> TicketPage:
+        """List one page of tickets, newest first, with optional filters.
+
+        With ``app_id`` the query is scoped to that partition instead of
+        fanning out across all of them.  Pass the returned ``continuation``
+        back to read the next page; it is None on the last page.  Each page
+        costs RUs for ``limit`` items, however deep into the history it is.
+        ``fields`` projects the documents server-side (see ``select_list``).
+
+        Without ``app_id`` only the newest ``limit`` tickets are returned and
+        ``continuation`` is always None: the SDK cannot resume a
+        cross-partition ``ORDER BY`` query from a continuation token.
+        """
         container = await self._get_container("tickets")
 
-        conditions = []
+        conditions = [_TICKETS_ONLY]
         params = []
         if app_id:
             conditions.append("c.app_id = @app_id")
@@ -68,28 +319,244 @@ class CosmosService:
             conditions.append("c.user_email = @email")
             params.append({"name": "@email", "value": user_email})
 
-        where_clause = f" WHERE {' AND '.join(conditions)}" if conditions else ""
-        query = f"SELECT TOP {limit} * FROM c{where_clause} ORDER BY c.created_at DESC"
+        where_clause = f" WHERE {' AND '.join(conditions)}"
+        # Ticket IDs sort by creation time, so ordering on id avoids a created_at range index
+        order_by = " ORDER BY c.id DESC"
+
+        if not app_id:
+            params.append({"name": "@limit", "value": limit})
+            query = f"SELECT TOP @limit {select_list(fields)} FROM c{where_clause}{order_by}"
+            items = [item async for item in container.query_items(query=query, parameters=params)]
+            return TicketPage(items, None)
 
+        pages = container.query_items(
+            query=f"SELECT {select_list(fields)} FROM c{where_clause}{order_by}",
+            parameters=params,
+            partition_key=app_id,
+            max_item_count=limit,
+            continuation_token_limit=_CONTINUATION_TOKEN_LIMIT_KB,
+        ).by_page(continuation)
         items = []
-        async for item in container.query_items(query=query, parameters=params or None):
+        async for page in pages:
+            items = [item async for item in page]
+            break
+        return TicketPage(items, pages.continuation_token)
+
+    @tracked("list_tickets")
+    async def list_tickets_by_email(
+        self,
+        user_email: str,
+        app_id: str | None = None,
+        limit: int = 50,
+        continuation: str | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> TicketPage:
+        """List one page of a user's ticket summaries from the email index.
+
+        A single-partition query on ``tickets_by_email``; same paging and
+        projection contract as ``list_tickets``.
+        """
+        container = await self._get_container("tickets_by_email")
+        query = f"SELECT {select_list(fields)} FROM c"
+        params = []
+        if app_id:
+            query += " WHERE c.app_id = @app_id"
+            params.append({"name": "@app_id", "value": app_id})
+        query += " ORDER BY c.id DESC"
+
+        pages = container.query_items(
+            query=query,
+            parameters=params or None,
+            partition_key=normalize_email(user_email),
+            max_item_count=limit,
+            continuation_token_limit=_CONTINUATION_TOKEN_LIMIT_KB,
+        ).by_page(continuation)
+        items = []
+        async for page in pages:
+            async for item in page:
+                items.append(item)
+            break
+        return TicketPage(items, pages.continuation_token)
+
+    async def scan_tickets(self, page_size: int = 100, continuation: str | None = None) -> AsyncIterator[TicketPage]:
+        """Yield every ticket with an email, page by page (cross-partition).
+
+        Each page's ``continuation`` resumes the scan after that page.
+        """
+        container = await self._get_container("tickets")
+        pages = container.query_items(
+            query="SELECT * FROM c WHERE IS_STRING(c.user_email)",
+            max_item_count=page_size,
+            continuation_token_limit=_CONTINUATION_TOKEN_LIMIT_KB,
+        ).by_page(continuation)
+        async for page in pages:
+            yield TicketPage([item async for item in page], pages.continuation_token)
+
+    @tracked("find_work_items")
+    async def find_tickets_by_work_items(self, work_item_ids: list[int]) -> list[dict]:
+        """Return ``id``, ``app_id`` and ``status`` of tickets linked to any of the work items."""
+        container = await self._get_container("tickets")
+        query = (
+            "SELECT c.id, c.app_id, c.status, c.devops.work_item_id AS work_item_id FROM c "
+            "WHERE ARRAY_CONTAINS(@ids, c.devops.work_item_id)"
+        )
+        items = []
+        async for item in container.query_items(query=query, parameters=[{"name": "@ids", "value": work_item_ids}]):
             items.append(item)
         return items
 
+    @tracked("patch_status")
+    async def patch_ticket_statuses(self, app_id: str, updates: list[tuple[str, str, str]]) -> int:
+        """Set ``status`` and ``updated_at`` on tickets in one partition.
+
+        ``updates`` holds ``(ticket_id, status, updated_at)`` tuples.  They are
+        sent as transactional batches of up to 100 patches; if a batch fails
+        (e.g. a ticket was deleted) its patches are retried one by one.  The
+        email index summaries of the patched tickets are refreshed too.
+        Returns the number of tickets patched.
+        """
+        container = await self._get_container("tickets")
+        patched = 0
+        for start in range(0, len(updates), _MAX_BATCH_OPERATIONS):
+            chunk = updates[start:start + _MAX_BATCH_OPERATIONS]
+            operations = [
+                ("patch", (ticket_id, _status_patch(status, updated_at)))
+                for ticket_id, status, updated_at in chunk
+            ]
+            updated: list[dict] = []
+            try:
+                results = await container.execute_item_batch(batch_operations=operations, partition_key=app_id)
+                patched += len(chunk)
+                updated.extend(result.get("resourceBody") or {} for result in results)
+            except CosmosBatchOperationError:
+                logger.warning("Status batch for %s failed — patching %d tickets individually", app_id, len(chunk))
+                for ticket_id, status, updated_at in chunk:
+                    try:
+                        updated.append(await container.patch_item(
+                            item=ticket_id,
+                            partition_key=app_id,
+                            patch_operations=_status_patch(status, updated_at),
+                        ))
+                        patched += 1
+                    except CosmosResourceNotFoundError:
+                        logger.warning("Ticket %s disappeared before its status could be updated", ticket_id)
+            # Patch responses carry the whole ticket, so the cache and summaries need no extra reads
+            self._cache_tickets(updated)
+            if self._email_index:
+                await self._update_email_index(updated)
+        return patched
+
+    @tracked("sync_state")
+    async def get_sync_state(self, name: str) -> dict | None:
+        """Read a background sync checkpoint (e.g. a watermark)."""
+        container = await self._get_container("sync_state")
+        try:
+            return await container.read_item(item=name, partition_key=name)
+        except CosmosResourceNotFoundError:
+            return None
+
+    @tracked("sync_state")
+    async def save_sync_state(self, name: str, state: dict) -> None:
+        """Store a background sync checkpoint."""
+        container = await self._get_container("sync_state")
+        await container.upsert_item({**state, "id": name, "_partition_key": name})
+
+    @tracked("audit")
     async def save_audit_log(self, ticket_id: str, app_id: str, action: str, details: dict) -> None:
-        """Write an entry to the audit_log container."""
-        container = await self._get_container("audit_log")
+        """Write an audit entry into its ticket's partition."""
+        container = await self._get_container("tickets")
+        await container.upsert_item(audit_doc(ticket_id, app_id, action, details))
+        logger.info("Audit log: %s %s", action, ticket_id)
+
+    @tracked("audit")
+    async def save_audit_logs(self, app_id: str, entries: list[dict]) -> None:
+        """Write up to 100 audit entries of one partition in a single transactional batch."""
+        container = await self._get_container("tickets")
+        await container.execute_item_batch(
+            batch_operations=[("upsert", (entry,)) for entry in entries],
+            partition_key=app_id,
+        )
+
+    @tracked("audit")
+    async def list_audit_entries(self, ticket_id: str, app_id: str) -> list[dict]:
+        """Return a ticket's audit entries, oldest first (single-partition query)."""
+        container = await self._get_container("tickets")
+        query = (
+            f"SELECT {_AUDIT_FIELDS} FROM c "
+            "WHERE c.doc_type = @doc_type AND c.ticket_id = @ticket_id ORDER BY c.timestamp ASC"
+        )
+        params = [{"name": "@doc_type", "value": AUDIT_DOC_TYPE}, {"name": "@ticket_id", "value": ticket_id}]
+        items = []
+        async for item in container.query_items(query=query, parameters=params, partition_key=app_id):
+            items.append(item)
+        if not self._legacy_audit_container:
+            return items
+
+        legacy = await self._list_legacy_audit_entries(ticket_id, app_id)
+        if not legacy:
+            return items
+        seen = {item["id"] for item in items}
+        items += (item for item in legacy if item["id"] not in seen)
+        return sorted(items, key=lambda item: item.get("timestamp") or "")
+
+    async def _list_legacy_audit_entries(self, ticket_id: str, app_id: str) -> list[dict]:
+        """Return entries written to the old audit_log container (also partitioned by app_id)."""
+        container = await self._get_container(self._legacy_audit_container)
+        query = f"SELECT {_AUDIT_FIELDS} FROM c WHERE c.ticket_id = @ticket_id"
+        params = [{"name": "@ticket_id", "value": ticket_id}]
+        items = []
+        try:
+            async for item in container.query_items(query=query, parameters=params, partition_key=app_id):
+                items.append(item)
+        except CosmosResourceNotFoundError:
+            return []  # deployment that never had the old container
+        return items
+
+    @tracked("idempotency")
+    async def reserve_idempotency_key(self, key: str, fingerprint: str, ttl_seconds: int) -> dict | None:
+        """Reserve an idempotency key in the shared idempotency container.
+
+        Returns None if this caller now owns the key, or the existing record
+        (pending or completed) if another request got there first.
+        """
+        container = await self._get_container("idempotency")
         doc = {
-            "id": f"{ticket_id}-{action}-{datetime.utcnow().isoformat()}",
-            "ticket_id": ticket_id,
-            "app_id": app_id,
-            "action": action,
-            "details": details,
-            "timestamp": datetime.utcnow().isoformat(),
-            "_partition_key": app_id,
+            "id": key,
+            "_partition_key": key,
+            "fingerprint": fingerprint,
+            "state": "pending",
+            "ttl": ttl_seconds,
         }
+        try:
+            await container.create_item(doc)
+            return None
+        except CosmosResourceExistsError:
+            return await self.get_idempotency_record(key) or {"state": "pending", "fingerprint": fingerprint}
+
+    @tracked("idempotency")
+    async def complete_idempotency_key(self, key: str, record: dict, ttl_seconds: int) -> None:
+        """Store the completed response for an idempotency key."""
+        container = await self._get_container("idempotency")
+        doc = {**record, "id": key, "_partition_key": key, "state": "completed", "ttl": ttl_seconds}
         await container.upsert_item(doc)
-        logger.info("Audit log: %s %s", action, ticket_id)
+
+    @tracked("idempotency")
+    async def get_idempotency_record(self, key: str) -> dict | None:
+        """Read an idempotency record, or None if it does not exist."""
+        container = await self._get_container("idempotency")
+        try:
+            return await container.read_item(item=key, partition_key=key)
+        except CosmosResourceNotFoundError:
+            return None
+
+    @tracked("idempotency")
+    async def release_idempotency_key(self, key: str) -> None:
+        """Drop a pending reservation so the request can be retried."""
+        container = await self._get_container("idempotency")
+        try:
+            await container.delete_item(item=key, partition_key=key)
+        except CosmosResourceNotFoundError:
+            pass
 
     async def close(self) -> None:
         """Close the Cosmos client."""
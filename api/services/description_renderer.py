@@ -0,0 +1,106 @@
+"""
+Description renderer — builds the HTML body of a support work item.
+
+The static markup for every section (Customer Report, App, Context, Reported
+By, License & Support) is laid out once at import time as constant fragments
+and field tables.  Rendering a request only escapes its values and appends
+them between those fragments, then joins everything with a single
+``str.join``.
+
+All user-supplied values are HTML-escaped so that a description such as
+``<img src=x onerror=...>`` is shown as text in Azure DevOps rather than
+interpreted as markup.
+"""
+
+import html
+from typing import Any
+
+from api.models import SupportCategory, SupportSubmitRequest
+
+# Section fragments
+_REPORT_OPEN = {True: "<h3>Customer Report</h3><p>", False: "<h3>Customer Feedback</h3><p>"}
+_APP_OPEN = "</p><h3>App</h3><p>"
+_ROUTED_TO = " (routed to "
+_APP_CLOSE = ")</p>"
+_CONTEXT_OPEN = "<h3>Context</h3><ul>"
+_LICENSE_OPEN = "<h3>License &amp; Support</h3><ul>"
+_LIST_CLOSE = "</ul>"
+_REPORTER_OPEN = "<h3>Reported By</h3><p>"
+_REPORTER_CLOSE = ")</p>"
+_ITEM_CLOSE = "</li>"
+
+# (SubmitContext attribute, list item prefix) in display order
+_CONTEXT_FIELDS = (
+    ("url", "<li><b>URL:</b> "),
+    ("browser", "<li><b>Browser:</b> "),
+    ("os", "<li><b>OS:</b> "),
+    ("app_version", "<li><b>App Version:</b> "),
+    ("screen_resolution", "<li><b>Resolution:</b> "),
+)
+
+_PLAN_ITEM = "<li><b>Plan:</b> "
+_STATUS_ITEM = "<li><b>Status:</b> "
+_TRIAL_ITEM = "<li><b>Free Trial:</b> Yes (ends "
+_TRIAL_CLOSE = ")</li>"
+_SUPPORT_PLAN_ITEM = "<li><b>Support Plan:</b> "
+_PRIORITY_SUPPORT_ITEM = "<li><b>Support:</b> Priority (included in plan)</li>"
+_STANDARD_SUPPORT_ITEM = "<li><b>Support:</b> Standard</li>"
+
+
+def escape(value: Any) -> str:
+    """HTML-escape a value for element content or a quoted attribute."""
+    return html.escape(value if isinstance(value, str) else str(value))
+
+
+def render_description(request: SupportSubmitRequest, project: str) -> str:
+    """Render the work item description HTML for a request routed to ``project``."""
+    parts = [
+        _REPORT_OPEN[request.category == SupportCategory.BUG],
+        escape(request.description),
+        _APP_OPEN,
+        escape(request.app_id),
+        _ROUTED_TO,
+        escape(project),
+        _APP_CLOSE,
+    ]
+
+    ctx = request.context
+    if ctx is not None:
+        start = len(parts)
+        parts.append(_CONTEXT_OPEN)
+        for attr, prefix in _CONTEXT_FIELDS:
+            value = getattr(ctx, attr)
+            if value:
+                parts += (prefix, escape(value), _ITEM_CLOSE)
+        if len(parts) == start + 1:
+            parts.pop()  # no context values — omit the section
+        else:
+            parts.append(_LIST_CLOSE)
+
+    if request.user_email:
+        parts += (
+            _REPORTER_OPEN,
+            escape(request.user_name or ""),
+            " (",
+            escape(request.user_email),
+            _REPORTER_CLOSE,
+        )
+
+    lic = request.license_info
+    if lic is not None:
+        parts.append(_LICENSE_OPEN)
+        if lic.plan_name:
+            parts += (_PLAN_ITEM, escape(lic.plan_name), _ITEM_CLOSE)
+        if lic.status:
+            parts += (_STATUS_ITEM, escape(lic.status), _ITEM_CLOSE)
+        if lic.is_free_trial:
+            parts += (_TRIAL_ITEM, escape(lic.free_trial_end or "N/A"), _TRIAL_CLOSE)
+        if lic.support_plan:
+            parts += (_SUPPORT_PLAN_ITEM, escape(lic.support_plan), _ITEM_CLOSE)
+        elif lic.has_priority_support:
+            parts.append(_PRIORITY_SUPPORT_ITEM)
+        else:
+            parts.append(_STANDARD_SUPPORT_ITEM)
+        parts.append(_LIST_CLOSE)
+
+    return "".join(parts)
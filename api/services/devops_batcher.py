@@ -0,0 +1,109 @@
+"""
+Work item batcher — coalesces concurrent creates into Azure DevOps $batch calls.
+
+During incident spikes many near-simultaneous submits target the same
+organisation.  ``WorkItemBatcher`` collects ``create_work_item`` calls that
+arrive within a short window and sends them as one ``_apis/wit/$batch``
+request, then fans the per-item results (or errors) back out to the waiting
+coroutines.  A bad area path on one item only fails that item.
+"""
+
+import asyncio
+import logging
+from typing import Any
+
+from api.services.devops_client import DevOpsClient
+
+logger = logging.getLogger("acidni-support.services.devops_batcher")
+
+
+class WorkItemBatcher:
+    """Drop-in wrapper around ``DevOpsClient`` that micro-batches work item creates.
+
+    Any other attribute is delegated to the wrapped client.
+    """
+
+    def __init__(self, client: DevOpsClient, window_ms: float = 5.0, max_batch_size: int = 50) -> None:
+        self._client = client
+        self._window = window_ms / 1000.0
+        self._max_batch_size = min(max_batch_size, DevOpsClient.MAX_BATCH_SIZE)
+        self._pending: list[tuple[dict[str, Any], asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._inflight: set[asyncio.Task] = set()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+    async def create_work_item(
+        self,
+        project: str,
+        work_item_type: str,
+        title: str,
+        description: str,
+        area_path: str | None = None,
+        priority: int = 3,
+        tags: str = "",
+    ) -> dict[str, Any]:
+        """Queue a work item create and wait for its batch to complete.
+
+        Same contract as ``DevOpsClient.create_work_item``.
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        item = {
+            "project": project,
+            "work_item_type": work_item_type,
+            "title": title,
+            "description": description,
+            "area_path": area_path,
+            "priority": priority,
+            "tags": tags,
+        }
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Send everything collected so far as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._send(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _send(self, batch: list[tuple[dict[str, Any], asyncio.Future]]) -> None:
+        items = [item for item, _ in batch]
+        futures = [future for _, future in batch]
+        try:
+            if len(items) == 1:
+                # Nothing to coalesce — skip the $batch envelope
+                results: list[Any] = [await self._client.create_work_item(**items[0])]
+            else:
+                results = await self._client.create_work_items_batch(items)
+                logger.info("Created %d work items in one DevOps batch call", len(items))
+        except Exception as exc:
+            results = [exc] * len(items)
+
+        for future, result in zip(futures, results):
+            if future.done():
+                continue  # caller was cancelled
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def close(self) -> None:
+        """Send any pending batch, wait for in-flight batches, then close the client."""
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        await self._client.close()
@@ -1,25 +1,74 @@
 """
 Azure DevOps REST API client — creates work items for support tickets.
+
+Every request goes through ``_send``, which:
+
+* fails fast with ``CircuitOpenError`` while DevOps is known to be down;
+* waits for the optional token-bucket pre-throttle;
+* retries 429 and 503 responses (and connection failures, which never
+  reached DevOps) within the retry policy's attempts and total deadline,
+  honouring ``Retry-After``;
+* paces later calls from the ``X-RateLimit-*`` headers DevOps sends as a
+  caller approaches its rate limit.
+
+Other 5xx responses and timeouts are only retried for idempotent requests,
+since a work item create that timed out may still have succeeded.
 """
 
+import asyncio
+import json
 import logging
+import time
 from base64 import b64encode
+from collections.abc import AsyncIterator
 from typing import Any
+from urllib.parse import quote
 
 import httpx
 
+from api.metrics import registry
+from api.services.resilience import CircuitBreaker, RetryPolicy, TokenBucket, parse_retry_after
+
 logger = logging.getLogger("acidni-support.services.devops_client")
 
+_retries = registry.counter("devops_retries_total", "DevOps requests retried, by reason")
+
+# Always safe to retry: DevOps rejected the request without processing it
+_THROTTLED = frozenset({429, 503})
+# Only safe to retry for idempotent requests
+_TRANSIENT = frozenset({500, 502, 504})
+# Start pacing calls once less than this share of the rate-limit window remains
+_RATE_LIMIT_LOW_WATER = 0.1
+
 
 class DevOpsClient:
     """Azure DevOps REST API client for work item creation."""
 
     API_VERSION = "7.1"
 
-    def __init__(self, org_url: str, pat: str) -> None:
+    # Azure DevOps accepts at most 200 requests per $batch call
+    MAX_BATCH_SIZE = 200
+    # ... and at most 200 IDs per workitemsbatch read
+    MAX_READ_BATCH_SIZE = 200
+
+    def __init__(
+        self,
+        org_url: str,
+        pat: str,
+        client: httpx.AsyncClient | None = None,
+        *,
+        timeout: float = 30.0,
+        retry_policy: RetryPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+        throttle: TokenBucket | None = None,
+    ) -> None:
         self._org_url = org_url.rstrip("/")
         self._auth_header = self._build_auth_header(pat)
-        self._client = httpx.AsyncClient(timeout=30.0)
+        self._timeout = timeout
+        self._client = client or httpx.AsyncClient(timeout=timeout)
+        self._retry = retry_policy or RetryPolicy()
+        self._breaker = breaker or CircuitBreaker("devops")
+        self._throttle = throttle
 
     @staticmethod
     def _build_auth_header(pat: str) -> str:
@@ -27,6 +76,140 @@ class DevOpsClient:
         encoded = b64encode(f":{pat}".encode()).decode()
         return f"Basic {encoded}"
 
+    def _observe_rate_limit(self, response: httpx.Response) -> None:
+        """Slow the pre-throttle down when DevOps says we are near its limit."""
+        if self._throttle is None:
+            return
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after:
+            self._throttle.pause(min(retry_after, self._retry.deadline))
+            return
+        try:
+            remaining = float(response.headers["X-RateLimit-Remaining"])
+            limit = float(response.headers["X-RateLimit-Limit"])
+            reset = float(response.headers["X-RateLimit-Reset"])
+        except (KeyError, ValueError):
+            return
+        if remaining < limit * _RATE_LIMIT_LOW_WATER:
+            # Spread what is left of the window evenly over the time until it resets
+            delay = max(0.0, reset - time.time()) / max(remaining, 1.0)
+            self._throttle.pause(min(delay, self._retry.max_delay))
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        *,
+        retryable: bool = True,
+        idempotent: bool = False,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Send a request through the circuit breaker, throttle and retry policy.
+
+        ``retryable=False`` sends at most once (e.g. for streamed bodies).
+        Returns the final response, whatever its status; raises
+        ``CircuitOpenError`` or the last transport error.
+        """
+        policy = self._retry
+        deadline = time.monotonic() + policy.deadline
+        attempt = 0
+        while True:
+            attempt += 1
+            self._breaker.before_call()
+            if self._throttle is not None:
+                await self._throttle.acquire()
+            remaining = deadline - time.monotonic()
+            try:
+                response = await self._client.request(
+                    method, url, timeout=max(1.0, min(self._timeout, remaining)), **kwargs
+                )
+            except httpx.TransportError as exc:
+                self._breaker.record_failure()
+                # Connection failures never reached DevOps, so even a create may be retried
+                safe = idempotent or isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout))
+                delay = policy.backoff(attempt)
+                if not (retryable and safe and self._may_retry(attempt, delay, deadline)):
+                    raise
+                reason = type(exc).__name__
+            else:
+                if response.status_code >= 500:
+                    self._breaker.record_failure()
+                else:
+                    self._breaker.record_success()
+                self._observe_rate_limit(response)
+                if response.status_code not in _THROTTLED and not (
+                    idempotent and response.status_code in _TRANSIENT
+                ):
+                    return response
+                delay = parse_retry_after(response.headers.get("Retry-After")) or policy.backoff(attempt)
+                if not (retryable and self._may_retry(attempt, delay, deadline)):
+                    return response
+                reason = str(response.status_code)
+
+            _retries.inc(reason=reason)
+            logger.warning(
+                "DevOps %s %s failed (%s) — retry %d/%d in %.1fs",
+                method,
+                url.split("?")[0],
+                reason,
+                attempt,
+                policy.max_attempts - 1,
+                delay,
+            )
+            await asyncio.sleep(delay)
+
+    def _may_retry(self, attempt: int, delay: float, deadline: float) -> bool:
+        return attempt < self._retry.max_attempts and time.monotonic() + delay < deadline
+
+    @staticmethod
+    def _build_operations(
+        title: str,
+        description: str,
+        area_path: str | None,
+        priority: int,
+        tags: str,
+    ) -> list[dict[str, Any]]:
+        """Build the JSON Patch document for a new work item."""
+        operations: list[dict[str, Any]] = [
+            {"op": "add", "path": "/fields/System.Title", "value": title},
+            {"op": "add", "path": "/fields/System.Description", "value": description},
+            {"op": "add", "path": "/fields/Microsoft.VSTS.Common.Priority", "value": priority},
+        ]
+
+        if area_path:
+            operations.append(
+                {"op": "add", "path": "/fields/System.AreaPath", "value": area_path}
+            )
+
+        if tags:
+            operations.append(
+                {"op": "add", "path": "/fields/System.Tags", "value": tags}
+            )
+
+        return operations
+
+    @staticmethod
+    def _parse_created(data: dict[str, Any], work_item_type: str, project: str, title: str) -> dict[str, Any]:
+        """Convert a DevOps work item response into the client's result dict."""
+        work_item_id = data["id"]
+        web_url = data.get("_links", {}).get("html", {}).get("href", "")
+
+        logger.info(
+            "Created %s #%s in %s — %s",
+            work_item_type,
+            work_item_id,
+            project,
+            title[:80],
+        )
+
+        return {
+            "id": work_item_id,
+            "url": web_url,
+            "rev": data.get("rev", 1),
+            "type": work_item_type,
+            "project": project,
+        }
+
     async def create_work_item(
         self,
         project: str,
@@ -45,34 +228,153 @@ class DevOpsClient:
             f"{self._org_url}/{project}/_apis/wit/workitems"
             f"/${work_item_type}?api-version={self.API_VERSION}"
         )
+        operations = self._build_operations(title, description, area_path, priority, tags)
 
-        # Build JSON Patch document
-        operations: list[dict[str, Any]] = [
-            {"op": "add", "path": "/fields/System.Title", "value": title},
-            {"op": "add", "path": "/fields/System.Description", "value": description},
-            {"op": "add", "path": "/fields/Microsoft.VSTS.Common.Priority", "value": priority},
+        headers = {
+            "Authorization": self._auth_header,
+            "Content-Type": "application/json-patch+json",
+        }
+
+        response = await self._send("POST", url, json=operations, headers=headers)
+
+        if response.status_code not in (200, 201):
+            logger.error(
+                "DevOps API error: %s %s — %s",
+                response.status_code,
+                response.reason_phrase,
+                response.text[:500],
+            )
+            raise RuntimeError(
+                f"Azure DevOps API returned {response.status_code}: {response.text[:200]}"
+            )
+
+        return self._parse_created(response.json(), work_item_type, project, title)
+
+    async def create_work_items_batch(self, items: list[dict[str, Any]]) -> list[dict[str, Any] | Exception]:
+        """Create several work items with a single ``_apis/wit/$batch`` call.
+
+        Each item is a dict of ``create_work_item`` keyword arguments.  Returns
+        one entry per item, in order: the result dict on success, or a
+        ``RuntimeError`` describing that item's failure.  Raises if the batch
+        call itself fails.
+        """
+        if len(items) > self.MAX_BATCH_SIZE:
+            raise ValueError(f"At most {self.MAX_BATCH_SIZE} work items per batch")
+
+        requests = [
+            {
+                "method": "PATCH",
+                "uri": (
+                    f"/{item['project']}/_apis/wit/workitems"
+                    f"/${item['work_item_type']}?api-version={self.API_VERSION}"
+                ),
+                "headers": {"Content-Type": "application/json-patch+json"},
+                "body": self._build_operations(
+                    item["title"],
+                    item["description"],
+                    item.get("area_path"),
+                    item.get("priority", 3),
+                    item.get("tags", ""),
+                ),
+            }
+            for item in items
         ]
 
-        if area_path:
-            operations.append(
-                {"op": "add", "path": "/fields/System.AreaPath", "value": area_path}
+        response = await self._send(
+            "POST",
+            f"{self._org_url}/_apis/wit/$batch?api-version={self.API_VERSION}",
+            json=requests,
+            headers={"Authorization": self._auth_header, "Content-Type": "application/json"},
+        )
+
+        if response.status_code != 200:
+            logger.error(
+                "DevOps batch API error: %s %s — %s",
+                response.status_code,
+                response.reason_phrase,
+                response.text[:500],
+            )
+            raise RuntimeError(
+                f"Azure DevOps batch API returned {response.status_code}: {response.text[:200]}"
             )
 
-        if tags:
-            operations.append(
-                {"op": "add", "path": "/fields/System.Tags", "value": tags}
+        values = response.json().get("value", [])
+        if len(values) != len(items):
+            raise RuntimeError(f"Azure DevOps batch API returned {len(values)} results for {len(items)} requests")
+
+        results: list[dict[str, Any] | Exception] = []
+        for item, value in zip(items, values):
+            code = value.get("code")
+            body = value.get("body") or "{}"
+            if code not in (200, 201):
+                logger.error(
+                    "DevOps batch item error: %s for %s in %s — %s",
+                    code,
+                    item["work_item_type"],
+                    item["project"],
+                    str(body)[:500],
+                )
+                results.append(RuntimeError(f"Azure DevOps API returned {code}: {str(body)[:200]}"))
+                continue
+            data = json.loads(body) if isinstance(body, str) else body
+            results.append(self._parse_created(data, item["work_item_type"], item["project"], item["title"]))
+        return results
+
+    async def add_comment(self, project: str, work_item_id: int, text: str) -> dict[str, Any]:
+        """Add an HTML comment to an existing work item's discussion."""
+        url = (
+            f"{self._org_url}/{project}/_apis/wit/workItems/{work_item_id}/comments"
+            f"?api-version={self.API_VERSION}-preview.4"
+        )
+        headers = {
+            "Authorization": self._auth_header,
+            "Content-Type": "application/json",
+        }
+
+        response = await self._send("POST", url, json={"text": text}, headers=headers)
+
+        if response.status_code not in (200, 201):
+            logger.error(
+                "DevOps comment API error: %s %s — %s",
+                response.status_code,
+                response.reason_phrase,
+                response.text[:500],
+            )
+            raise RuntimeError(
+                f"Azure DevOps API returned {response.status_code}: {response.text[:200]}"
             )
 
+        logger.info("Added comment to work item #%s in %s", work_item_id, project)
+        return response.json()
+
+    async def upload_attachment(
+        self,
+        project: str,
+        file_name: str,
+        content: AsyncIterator[bytes],
+        size: int,
+    ) -> dict[str, Any]:
+        """Stream a file to the work item attachments store.
+
+        ``content`` is sent as it is produced, with an explicit Content-Length
+        so the body is not buffered.  Returns dict with 'id' and 'url' keys.
+        """
+        url = (
+            f"{self._org_url}/{project}/_apis/wit/attachments"
+            f"?fileName={quote(file_name)}&api-version={self.API_VERSION}"
+        )
         headers = {
             "Authorization": self._auth_header,
-            "Content-Type": "application/json-patch+json",
+            "Content-Type": "application/octet-stream",
+            "Content-Length": str(size),
         }
 
-        response = await self._client.post(url, json=operations, headers=headers)
+        # The body is a one-shot stream, so it cannot be replayed
+        response = await self._send("POST", url, retryable=False, content=content, headers=headers)
 
         if response.status_code not in (200, 201):
             logger.error(
-                "DevOps API error: %s %s — %s",
+                "DevOps attachment API error: %s %s — %s",
                 response.status_code,
                 response.reason_phrase,
                 response.text[:500],
@@ -82,25 +384,155 @@ class DevOpsClient:
             )
 
         data = response.json()
-        work_item_id = data["id"]
-        web_url = data.get("_links", {}).get("html", {}).get("href", "")
+        logger.info("Uploaded attachment %s (%d bytes) to %s", file_name, size, project)
+        return {"id": data.get("id"), "url": data["url"]}
 
-        logger.info(
-            "Created %s #%s in %s — %s",
-            work_item_type,
-            work_item_id,
-            project,
-            title[:80],
+    async def link_attachment(
+        self,
+        project: str,
+        work_item_id: int,
+        attachment_url: str,
+        comment: str = "",
+    ) -> None:
+        """Attach an uploaded file to a work item."""
+        url = (
+            f"{self._org_url}/{project}/_apis/wit/workitems/{work_item_id}"
+            f"?api-version={self.API_VERSION}"
         )
-
-        return {
-            "id": work_item_id,
-            "url": web_url,
-            "rev": data.get("rev", 1),
-            "type": work_item_type,
-            "project": project,
+        operations = [
+            {
+                "op": "add",
+                "path": "/relations/-",
+                "value": {
+                    "rel": "AttachedFile",
+                    "url": attachment_url,
+                    "attributes": {"comment": comment},
+                },
+            }
+        ]
+        headers = {
+            "Authorization": self._auth_header,
+            "Content-Type": "application/json-patch+json",
         }
 
+        response = await self._send("PATCH", url, json=operations, headers=headers)
+
+        if response.status_code not in (200, 201):
+            logger.error(
+                "DevOps API error linking attachment: %s %s — %s",
+                response.status_code,
+                response.reason_phrase,
+                response.text[:500],
+            )
+            raise RuntimeError(
+                f"Azure DevOps API returned {response.status_code}: {response.text[:200]}"
+            )
+
+        logger.info("Linked attachment to work item #%s in %s", work_item_id, project)
+
+    async def _get_metadata(self, url: str, etag: str | None) -> tuple[dict[str, Any] | None, str | None]:
+        """GET a metadata document, revalidating with ``If-None-Match``.
+
+        Returns ``(None, etag)`` when the server answers 304 Not Modified.
+        """
+        headers = {"Authorization": self._auth_header}
+        if etag:
+            headers["If-None-Match"] = etag
+        response = await self._send("GET", url, idempotent=True, headers=headers)
+        if response.status_code == 304:
+            return None, etag
+        if response.status_code != 200:
+            logger.error(
+                "DevOps metadata API error: %s %s — %s",
+                response.status_code,
+                response.reason_phrase,
+                response.text[:500],
+            )
+            raise RuntimeError(
+                f"Azure DevOps API returned {response.status_code}: {response.text[:200]}"
+            )
+        return response.json(), response.headers.get("ETag")
+
+    async def get_area_paths(self, project: str, etag: str | None = None) -> tuple[list[str] | None, str | None]:
+        """List every area path in a project (``Project\\Team\\...`` form).
+
+        Returns ``(area_paths, etag)``, or ``(None, etag)`` if unchanged since ``etag``.
+        """
+        url = (
+            f"{self._org_url}/{project}/_apis/wit/classificationnodes/Areas"
+            f"?$depth=20&api-version={self.API_VERSION}"
+        )
+        data, etag = await self._get_metadata(url, etag)
+        if data is None:
+            return None, etag
+
+        paths: list[str] = []
+        stack = [(data, project)]
+        while stack:
+            node, path = stack.pop()
+            paths.append(path)
+            for child in node.get("children") or []:
+                stack.append((child, f"{path}\\{child['name']}"))
+        return paths, etag
+
+    async def get_work_item_types(self, project: str, etag: str | None = None) -> tuple[list[str] | None, str | None]:
+        """List the work item type names available in a project.
+
+        Returns ``(names, etag)``, or ``(None, etag)`` if unchanged since ``etag``.
+        """
+        url = f"{self._org_url}/{project}/_apis/wit/workitemtypes?api-version={self.API_VERSION}"
+        data, etag = await self._get_metadata(url, etag)
+        if data is None:
+            return None, etag
+        return [item["name"] for item in data.get("value", [])], etag
+
+    async def query_work_item_ids(self, wiql: str, top: int = 20_000) -> list[int]:
+        """Run an organisation-wide WIQL query and return the matching IDs, in query order."""
+        url = f"{self._org_url}/_apis/wit/wiql?$top={top}&timePrecision=true&api-version={self.API_VERSION}"
+        headers = {"Authorization": self._auth_header, "Content-Type": "application/json"}
+
+        # A WIQL query only reads, so it is safe to retry on any transient failure
+        response = await self._send("POST", url, idempotent=True, json={"query": wiql}, headers=headers)
+
+        if response.status_code != 200:
+            logger.error(
+                "DevOps WIQL API error: %s %s — %s",
+                response.status_code,
+                response.reason_phrase,
+                response.text[:500],
+            )
+            raise RuntimeError(
+                f"Azure DevOps API returned {response.status_code}: {response.text[:200]}"
+            )
+        return [item["id"] for item in response.json().get("workItems", [])]
+
+    async def get_work_items(self, ids: list[int], fields: list[str]) -> list[dict[str, Any]]:
+        """Read up to ``MAX_READ_BATCH_SIZE`` work items with one ``workitemsbatch`` call.
+
+        Returns the raw work item dicts (``id`` plus ``fields``); deleted
+        items are omitted.
+        """
+        if len(ids) > self.MAX_READ_BATCH_SIZE:
+            raise ValueError(f"At most {self.MAX_READ_BATCH_SIZE} work items per read")
+        url = f"{self._org_url}/_apis/wit/workitemsbatch?api-version={self.API_VERSION}"
+        headers = {"Authorization": self._auth_header, "Content-Type": "application/json"}
+        body = {"ids": ids, "fields": fields, "errorPolicy": "Omit"}
+
+        response = await self._send("POST", url, idempotent=True, json=body, headers=headers)
+
+        if response.status_code != 200:
+            logger.error(
+                "DevOps workitemsbatch API error: %s %s — %s",
+                response.status_code,
+                response.reason_phrase,
+                response.text[:500],
+            )
+            raise RuntimeError(
+                f"Azure DevOps API returned {response.status_code}: {response.text[:200]}"
+            )
+        # errorPolicy=Omit returns null in place of deleted or inaccessible items
+        return [item for item in response.json().get("value", []) if item]
+
     async def close(self) -> None:
         """Close the HTTP client."""
         await self._client.aclose()
@@ -0,0 +1,162 @@
+"""
+DevOps metadata cache — area paths and work item types per project.
+
+A stale ``area_path`` in ``support-routing.yaml`` used to surface only when
+DevOps rejected the create with a 400.  ``DevOpsMetadataCache`` loads the
+area path tree and work item types of every routed project at startup and
+revalidates them in the background with ETags, so a submit can be checked
+locally:
+
+* an area path that no longer exists falls back to the project root;
+* a work item type the project does not have falls back to the category's
+  default type.
+
+Projects whose metadata could not be loaded are passed through unchanged.
+"""
+
+import asyncio
+import logging
+import time
+
+from pydantic import BaseModel
+
+from api.metrics import registry
+from api.models import StaleRoute
+from api.services.devops_client import DevOpsClient
+from api.services.routing_service import CATEGORY_TYPE_MAP, RoutingService, SubmissionPlan
+
+logger = logging.getLogger("acidni-support.services.devops_metadata")
+
+_fallbacks = registry.counter("devops_metadata_fallbacks_total", "Plans corrected from cached metadata, by field")
+_refreshes = registry.counter("devops_metadata_refresh_total", "Metadata refreshes per project, by result")
+
+
+class ProjectMetadata(BaseModel):
+    """Cached metadata for one DevOps project."""
+
+    project: str
+    area_paths: frozenset[str]
+    work_item_types: frozenset[str]
+    areas_etag: str | None = None
+    types_etag: str | None = None
+    refreshed_at: float
+
+
+def _fold(values) -> frozenset[str]:
+    return frozenset(value.casefold() for value in values)
+
+
+class DevOpsMetadataCache:
+    """Per-project area paths and work item types, refreshed in the background."""
+
+    def __init__(self, devops: DevOpsClient, routing: RoutingService, refresh_seconds: float = 900.0) -> None:
+        self._devops = devops
+        self._routing = routing
+        self._refresh_seconds = refresh_seconds
+        self._projects: dict[str, ProjectMetadata] = {}
+        self._task: asyncio.Task | None = None
+        # (project, field, value) corrections already logged, to warn once rather than per submit
+        self._warned: set[tuple[str, str, str]] = set()
+
+    def get(self, project: str) -> ProjectMetadata | None:
+        return self._projects.get(project.casefold())
+
+    async def _refresh_project(self, project: str) -> None:
+        current = self.get(project)
+        areas, areas_etag = await self._devops.get_area_paths(project, current.areas_etag if current else None)
+        types, types_etag = await self._devops.get_work_item_types(project, current.types_etag if current else None)
+        if current is None and (areas is None or types is None):
+            raise RuntimeError(f"No metadata returned for project {project}")
+        self._projects[project.casefold()] = ProjectMetadata(
+            project=project,
+            area_paths=_fold(areas) if areas is not None else current.area_paths,
+            work_item_types=_fold(types) if types is not None else current.work_item_types,
+            areas_etag=areas_etag,
+            types_etag=types_etag,
+            refreshed_at=time.time(),
+        )
+        _refreshes.inc(result="unchanged" if areas is None and types is None else "updated")
+
+    async def refresh(self) -> None:
+        """Reload (or revalidate) metadata for every routed project.
+
+        A project that fails keeps its previous metadata.
+        """
+        projects = self._routing.list_projects()
+        results = await asyncio.gather(*(self._refresh_project(p) for p in projects), return_exceptions=True)
+        for project, result in zip(projects, results):
+            if isinstance(result, Exception):
+                _refreshes.inc(result="failed")
+                logger.warning("Failed to refresh DevOps metadata for %s: %s", project, result)
+        logger.info("DevOps metadata cached for %d/%d projects", len(self._projects), len(projects))
+
+    def _warn_once(self, project: str, field: str, value: str, replacement: str) -> None:
+        key = (project, field, value)
+        if key not in self._warned:
+            self._warned.add(key)
+            logger.warning("%s '%s' does not exist in %s — using '%s'", field, value, project, replacement)
+
+    def validate(self, plan: SubmissionPlan) -> SubmissionPlan:
+        """Return ``plan``, corrected against the cached project metadata."""
+        meta = self.get(plan.project)
+        if meta is None:
+            return plan
+        updates: dict[str, str] = {}
+        if plan.area_path.casefold() not in meta.area_paths:
+            self._warn_once(plan.project, "area_path", plan.area_path, plan.project)
+            updates["area_path"] = plan.project
+            _fallbacks.inc(field="area_path")
+        if plan.work_item_type.casefold() not in meta.work_item_types:
+            default_type = CATEGORY_TYPE_MAP[plan.category]
+            if default_type.casefold() in meta.work_item_types and default_type != plan.work_item_type:
+                self._warn_once(plan.project, "work_item_type", plan.work_item_type, default_type)
+                updates["work_item_type"] = default_type
+                _fallbacks.inc(field="work_item_type")
+        return plan.model_copy(update=updates) if updates else plan
+
+    def stale_routes(self) -> list[StaleRoute]:
+        """List routed (app_id, category) plans whose project, area path or type is unknown."""
+        stale: list[StaleRoute] = []
+        for plan in self._routing.list_plans():
+            meta = self.get(plan.project)
+            category = plan.category.value
+            if meta is None:
+                stale.append(StaleRoute(app_id=plan.app_id, category=category, project=plan.project,
+                                        field="devops_project", value=plan.project))
+                continue
+            if plan.area_path.casefold() not in meta.area_paths:
+                stale.append(StaleRoute(app_id=plan.app_id, category=category, project=plan.project,
+                                        field="area_path", value=plan.area_path))
+            if plan.work_item_type.casefold() not in meta.work_item_types:
+                stale.append(StaleRoute(app_id=plan.app_id, category=category, project=plan.project,
+                                        field="work_item_type", value=plan.work_item_type))
+        return stale
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self._projects)
+
+    @property
+    def projects_loaded(self) -> int:
+        return len(self._projects)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._refresh_seconds)
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("DevOps metadata refresh failed")
+
+    async def start(self) -> None:
+        """Load metadata now and keep refreshing it in the background."""
+        await self.refresh()
+        self._task = asyncio.create_task(self._run(), name="devops-metadata-refresh")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -0,0 +1,192 @@
+"""
+Near-duplicate ticket index — detects bursts of near-identical reports per app.
+
+Each submission's subject and description are reduced to a 64-bit SimHash.
+Reports whose fingerprints differ in at most ``max_distance`` bits are treated
+as the same issue.  Fingerprints are split into ``max_distance + 1`` bands and
+indexed per band: by the pigeonhole principle any fingerprint within the
+distance shares at least one band exactly, so a lookup only compares against a
+handful of candidates instead of every recent ticket.
+
+Entries live in memory for a rolling time window; ``discard_work_item`` drops
+one early once its work item is no longer open.
+"""
+
+import hashlib
+import re
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+from pydantic import BaseModel
+
+_TOKEN_RE = re.compile(r"\w+")
+_FINGERPRINT_BITS = 64
+# Long descriptions add little signal beyond their opening and cost hashing time
+_MAX_TEXT_CHARS = 2000
+
+
+def simhash(text: str) -> int:
+    """Return the 64-bit SimHash of ``text`` over word unigrams and bigrams."""
+    words = _TOKEN_RE.findall(text[:_MAX_TEXT_CHARS].lower())
+    features = set(words)
+    features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    if not features:
+        return 0
+
+    bits = [
+        format(int.from_bytes(hashlib.blake2b(f.encode(), digest_size=8).digest(), "big"), "064b")
+        for f in features
+    ]
+    threshold = len(bits) / 2
+    fingerprint = 0
+    # zip(*bits) walks the bit columns; column 0 is the most significant bit
+    for column in zip(*bits):
+        fingerprint = (fingerprint << 1) | (column.count("1") > threshold)
+    return fingerprint
+
+
+def ticket_fingerprint(subject: str, description: str) -> int:
+    """Fingerprint a ticket from its subject and description."""
+    return simhash(f"{subject}\n{description}")
+
+
+class DuplicateMatch(BaseModel):
+    """An open ticket that a new submission nearly duplicates."""
+
+    ticket_id: str
+    work_item: dict[str, Any]
+    distance: int
+
+
+class _Entry:
+    __slots__ = ("ticket_id", "fingerprint", "work_item", "added_at")
+
+    def __init__(self, ticket_id: str, fingerprint: int, work_item: dict[str, Any], added_at: float) -> None:
+        self.ticket_id = ticket_id
+        self.fingerprint = fingerprint
+        self.work_item = work_item
+        self.added_at = added_at
+
+
+class _AppIndex:
+    """Banded fingerprint index for one app_id."""
+
+    def __init__(self, band_masks: list[tuple[int, int]]) -> None:
+        self._band_masks = band_masks
+        self.bands: list[dict[int, set[_Entry]]] = [{} for _ in band_masks]
+        self.by_age: deque[_Entry] = deque()
+
+    def _keys(self, fingerprint: int):
+        for shift, mask in self._band_masks:
+            yield (fingerprint >> shift) & mask
+
+    def add(self, entry: _Entry) -> None:
+        for band, key in zip(self.bands, self._keys(entry.fingerprint)):
+            band.setdefault(key, set()).add(entry)
+        self.by_age.append(entry)
+
+    def remove(self, entry: _Entry) -> None:
+        for band, key in zip(self.bands, self._keys(entry.fingerprint)):
+            bucket = band.get(key)
+            if bucket is not None:
+                bucket.discard(entry)
+                if not bucket:
+                    del band[key]
+
+    def candidates(self, fingerprint: int) -> set[_Entry]:
+        found: set[_Entry] = set()
+        for band, key in zip(self.bands, self._keys(fingerprint)):
+            bucket = band.get(key)
+            if bucket:
+                found |= bucket
+        return found
+
+
+class NearDuplicateIndex:
+    """In-memory, per-app index of recent ticket fingerprints."""
+
+    def __init__(
+        self,
+        window_seconds: float = 3600.0,
+        max_distance: int = 6,
+        max_entries_per_app: int = 5000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._window = window_seconds
+        self._max_distance = max_distance
+        self._max_entries = max_entries_per_app
+        self._clock = clock
+        self._apps: dict[str, _AppIndex] = {}
+        self._by_work_item: dict[int, tuple[str, _Entry]] = {}
+
+        # Split the fingerprint into max_distance + 1 contiguous bands
+        bands = max_distance + 1
+        width, extra = divmod(_FINGERPRINT_BITS, bands)
+        self._band_masks: list[tuple[int, int]] = []
+        shift = 0
+        for i in range(bands):
+            bits = width + (1 if i < extra else 0)
+            self._band_masks.append((shift, (1 << bits) - 1))
+            shift += bits
+
+    def _prune(self, app_id: str, index: _AppIndex) -> None:
+        cutoff = self._clock() - self._window
+        while index.by_age and (index.by_age[0].added_at <= cutoff or len(index.by_age) > self._max_entries):
+            self._drop(app_id, index, index.by_age.popleft())
+
+    def _drop(self, app_id: str, index: _AppIndex, entry: _Entry) -> None:
+        index.remove(entry)
+        owner = self._by_work_item.get(entry.work_item["id"])
+        if owner is not None and owner[1] is entry:
+            del self._by_work_item[entry.work_item["id"]]
+        if not index.by_age:
+            self._apps.pop(app_id, None)
+
+    def find(self, app_id: str, fingerprint: int) -> DuplicateMatch | None:
+        """Return the closest open ticket within ``max_distance`` bits, if any."""
+        index = self._apps.get(app_id)
+        if index is None:
+            return None
+        self._prune(app_id, index)
+
+        best: _Entry | None = None
+        best_distance = self._max_distance + 1
+        for entry in index.candidates(fingerprint):
+            distance = (entry.fingerprint ^ fingerprint).bit_count()
+            if distance < best_distance:
+                best, best_distance = entry, distance
+        if best is None:
+            return None
+        return DuplicateMatch(ticket_id=best.ticket_id, work_item=best.work_item, distance=best_distance)
+
+    def add(self, app_id: str, fingerprint: int, ticket_id: str, work_item: dict[str, Any]) -> None:
+        """Index a newly created ticket."""
+        index = self._apps.get(app_id)
+        if index is None:
+            index = self._apps[app_id] = _AppIndex(self._band_masks)
+        entry = _Entry(ticket_id, fingerprint, work_item, self._clock())
+        index.add(entry)
+        self._by_work_item[work_item["id"]] = (app_id, entry)
+        self._prune(app_id, index)
+
+    def discard_work_item(self, work_item_id: int) -> None:
+        """Stop matching against a work item (e.g. once it is closed)."""
+        owner = self._by_work_item.pop(work_item_id, None)
+        if owner is None:
+            return
+        app_id, entry = owner
+        index = self._apps.get(app_id)
+        if index is None:
+            return
+        index.remove(entry)
+        try:
+            index.by_age.remove(entry)
+        except ValueError:
+            pass
+        if not index.by_age:
+            self._apps.pop(app_id, None)
+
+    def __len__(self) -> int:
+        return sum(len(index.by_age) for index in self._apps.values())
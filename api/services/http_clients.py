@@ -0,0 +1,212 @@
+"""
+HTTP client registry — one tuned, long-lived connection pool per upstream.
+
+Services used to build their own ``httpx.AsyncClient`` (the licensing lookup
+built one per call, paying a TLS handshake to APIM every time).  The
+registry owns one client per upstream host with its own pool limits,
+keepalive expiry and optional HTTP/2, is created once per process and
+closed in the app lifespan.
+
+``warm()`` opens connections to each upstream at startup so the first
+customer request does not pay for DNS, TCP and TLS.  Pool occupancy (active
+and idle connections, requests in flight) and the configured pool size per
+upstream are exported on ``/api/metrics``.
+"""
+
+import asyncio
+import importlib.util
+import logging
+from collections.abc import AsyncIterator
+from typing import NamedTuple
+
+import httpcore
+import httpx
+
+from api.metrics import registry
+
+logger = logging.getLogger("acidni-support.services.http_clients")
+
+_in_flight = registry.gauge("http_pool_requests_in_flight", "Requests with an open response, per upstream")
+_connections = registry.gauge("http_pool_connections", "Pooled connections per upstream and state (active/idle)")
+_max_connections = registry.gauge("http_pool_max_connections", "Configured pool size per upstream")
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class UpstreamConfig(NamedTuple):
+    """Pool settings for one upstream host."""
+
+    name: str
+    base_url: str = ""
+    timeout: float = 30.0
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    # Path requested by ``warm()`` (any response counts); None skips warm-up
+    warm_path: str | None = None
+    warm_connections: int = 1
+
+
+# httpcore errors, re-raised as the httpx exception of the same name
+_CORE_ERRORS = (
+    httpcore.TimeoutException,
+    httpcore.NetworkError,
+    httpcore.ProtocolError,
+    httpcore.ProxyError,
+    httpcore.UnsupportedProtocol,
+)
+
+
+def _httpx_error(exc: Exception) -> httpx.TransportError:
+    """Map an httpcore exception to the httpx exception of the same name."""
+    for cls in type(exc).__mro__:
+        mapped = getattr(httpx, cls.__name__, None)
+        if isinstance(mapped, type) and issubclass(mapped, httpx.TransportError):
+            return mapped(str(exc))
+    return httpx.TransportError(str(exc))
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    """Response body that maps httpcore errors and reports when it is closed."""
+
+    def __init__(self, stream, on_close) -> None:
+        self._stream = stream
+        self._on_close = on_close
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in self._stream:
+                yield chunk
+        except _CORE_ERRORS as exc:
+            raise _httpx_error(exc) from exc
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._on_close is not None:
+                self._on_close()
+                self._on_close = None
+
+
+class _PooledTransport(httpx.AsyncBaseTransport):
+    """Transport over an ``httpcore.AsyncConnectionPool`` it owns.
+
+    Owning the pool (rather than the one ``httpx.AsyncHTTPTransport`` keeps
+    privately) lets it export requests in flight and active/idle connections
+    per upstream from the pool's public ``connections`` list.
+    """
+
+    def __init__(self, upstream: str, limits: httpx.Limits, http2: bool = False) -> None:
+        self._upstream = upstream
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=True,
+            http2=http2,
+        )
+
+    def _publish(self) -> None:
+        connections = self._pool.connections
+        idle = sum(1 for conn in connections if conn.is_idle())
+        _connections.set(len(connections) - idle, upstream=self._upstream, state="active")
+        _connections.set(idle, upstream=self._upstream, state="idle")
+
+    def _finished(self) -> None:
+        _in_flight.dec(upstream=self._upstream)
+        self._publish()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        _in_flight.inc(upstream=self._upstream)
+        try:
+            response = await self._pool.handle_async_request(core_request)
+        except _CORE_ERRORS as exc:
+            self._finished()
+            raise _httpx_error(exc) from exc
+        except BaseException:
+            self._finished()
+            raise
+        self._publish()
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_TrackedStream(response.stream, self._finished),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._pool.aclose()
+        self._publish()
+
+
+class HttpClientRegistry:
+    """Named ``httpx.AsyncClient`` instances, one per upstream."""
+
+    def __init__(self, upstreams: list[UpstreamConfig]) -> None:
+        self._configs = {upstream.name: upstream for upstream in upstreams}
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """Return the shared client for ``name``, creating it on first use."""
+        client = self._clients.get(name)
+        if client is None:
+            client = self._clients[name] = self._build(self._configs[name])
+        return client
+
+    @staticmethod
+    def _build(config: UpstreamConfig) -> httpx.AsyncClient:
+        http2 = config.http2 and HTTP2_AVAILABLE
+        if config.http2 and not HTTP2_AVAILABLE:
+            logger.warning("HTTP/2 requested for %s but the 'h2' package is not installed", config.name)
+        limits = httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        )
+        _max_connections.set(config.max_connections, upstream=config.name)
+        return httpx.AsyncClient(
+            base_url=config.base_url,
+            timeout=config.timeout,
+            transport=_PooledTransport(config.name, limits, http2=http2),
+        )
+
+    async def _warm_one(self, config: UpstreamConfig) -> None:
+        client = self.get(config.name)
+        results = await asyncio.gather(
+            *(client.head(config.warm_path, timeout=5.0) for _ in range(config.warm_connections)),
+            return_exceptions=True,
+        )
+        failures = [r for r in results if isinstance(r, Exception)]
+        if failures:
+            logger.warning("Warm-up of %s failed: %s", config.name, failures[0])
+        else:
+            logger.info("Warmed %d connection(s) to %s", len(results), config.name)
+
+    async def warm(self) -> None:
+        """Open connections to every upstream that has a ``warm_path``.
+
+        Failures are logged and ignored; the pool simply connects on first use.
+        """
+        await asyncio.gather(
+            *(self._warm_one(config) for config in self._configs.values() if config.warm_path is not None)
+        )
+
+    async def aclose(self) -> None:
+        """Close every client and its pooled connections."""
+        clients, self._clients = list(self._clients.values()), {}
+        await asyncio.gather(*(client.aclose() for client in clients), return_exceptions=True)
@@ -0,0 +1,184 @@
+"""
+Idempotency-Key support for POST /api/submit.
+
+A widget that retries after a network timeout re-sends the same
+``Idempotency-Key``.  The first attempt's response is remembered and replayed
+for later attempts, so DevOps and Cosmos DB are only written once.  Duplicates
+that arrive while the first attempt is still running wait for it instead of
+racing it.
+
+Responses are kept in a bounded in-process LRU+TTL cache.  When a shared store
+is configured (Cosmos DB), keys are also reserved and recorded there so that
+duplicates landing on different workers or replicas are deduplicated too.
+"""
+
+import asyncio
+import hashlib
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any, Protocol
+
+from pydantic import BaseModel
+
+from api.services.ttl_cache import LruTtlCache
+
+logger = logging.getLogger("acidni-support.services.idempotency")
+
+
+class IdempotencyConflictError(Exception):
+    """The key was already used with a different request payload."""
+
+
+class IdempotencyInProgressError(Exception):
+    """Another worker still holds the key after the wait timeout."""
+
+
+class IdempotencyRecord(BaseModel):
+    """A completed request's response, stored under its idempotency key."""
+
+    fingerprint: str
+    status_code: int
+    body: dict[str, Any]
+
+
+class IdempotencyStore(Protocol):
+    """Shared store for idempotency records (implemented by the ticket stores)."""
+
+    async def reserve_idempotency_key(self, key: str, fingerprint: str, ttl_seconds: int) -> dict | None: ...
+
+    async def complete_idempotency_key(self, key: str, record: dict, ttl_seconds: int) -> None: ...
+
+    async def get_idempotency_record(self, key: str) -> dict | None: ...
+
+    async def release_idempotency_key(self, key: str) -> None: ...
+
+
+def fingerprint_payload(payload: str | bytes) -> str:
+    """Hash a canonical request payload for key-reuse detection."""
+    if isinstance(payload, str):
+        payload = payload.encode()
+    return hashlib.sha256(payload).hexdigest()
+
+
+Operation = Callable[[], Awaitable[tuple[int, dict[str, Any]]]]
+
+
+class IdempotencyCache:
+    """Run an operation at most once per idempotency key and replay its result."""
+
+    # How long a reservation in the shared store survives if its owner dies
+    PENDING_TTL_SECONDS = 120
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl_seconds: int = 86_400,
+        store: IdempotencyStore | None = None,
+        wait_seconds: float = 30.0,
+        poll_interval: float = 0.25,
+    ) -> None:
+        self._ttl = ttl_seconds
+        self._records = LruTtlCache(max_entries, ttl_seconds)
+        # key -> (fingerprint, future resolved with the record, or None if the owner was cancelled)
+        self._inflight: dict[str, tuple[str, asyncio.Future]] = {}
+        self._store = store
+        self._wait_seconds = wait_seconds
+        self._poll_interval = poll_interval
+
+    @staticmethod
+    def _check(record: IdempotencyRecord, fingerprint: str) -> IdempotencyRecord:
+        if record.fingerprint != fingerprint:
+            raise IdempotencyConflictError("Idempotency-Key was already used with a different request body")
+        return record
+
+    async def run(self, key: str, fingerprint: str, operation: Operation) -> tuple[IdempotencyRecord, bool]:
+        """Return ``(record, replayed)`` for the key, running ``operation`` only if needed.
+
+        If the request running the operation is cancelled (e.g. its client
+        disconnected), one of the duplicates waiting on it takes over.
+        """
+        while True:
+            record = self._records.get(key)
+            if record is not None:
+                return self._check(record, fingerprint), True
+
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            inflight_fingerprint, future = inflight
+            if inflight_fingerprint != fingerprint:
+                raise IdempotencyConflictError("Idempotency-Key was already used with a different request body")
+            record = await asyncio.shield(future)
+            if record is not None:
+                return record, True
+            # The owner was cancelled: the first waiter to get here runs the operation
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = (fingerprint, future)
+        try:
+            record, replayed = await self._execute(key, fingerprint, operation)
+        except asyncio.CancelledError:
+            # Waiters are not cancelled themselves, so wake them to take over instead
+            future.set_result(None)
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        else:
+            self._records.set(key, record)
+            future.set_result(record)
+            return record, replayed
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _execute(self, key: str, fingerprint: str, operation: Operation) -> tuple[IdempotencyRecord, bool]:
+        if self._store is not None:
+            deadline = asyncio.get_running_loop().time() + self._wait_seconds
+            while True:
+                existing = await self._store.reserve_idempotency_key(key, fingerprint, self.PENDING_TTL_SECONDS)
+                if existing is None:
+                    break  # this caller owns the key
+                if existing.get("fingerprint") != fingerprint:
+                    raise IdempotencyConflictError("Idempotency-Key was already used with a different request body")
+                record = await self._await_shared(key, existing, deadline)
+                if record is not None:
+                    return record, True
+                # The owner failed and released the key: try to take it over
+
+        try:
+            status_code, body = await operation()
+        except BaseException:
+            if self._store is not None:
+                await self._release(key)
+            raise
+
+        record = IdempotencyRecord(fingerprint=fingerprint, status_code=status_code, body=body)
+        if self._store is not None:
+            try:
+                await self._store.complete_idempotency_key(key, record.model_dump(), self._ttl)
+            except Exception:
+                logger.exception("Failed to record idempotency key %s in shared store", key)
+        return record, False
+
+    async def _await_shared(self, key: str, existing: dict, deadline: float) -> IdempotencyRecord | None:
+        """Wait for another worker's reservation to complete.
+
+        Returns None if the reservation disappears (its owner failed and
+        released it), so the caller can reserve the key itself.
+        """
+        loop = asyncio.get_running_loop()
+        while existing.get("state") != "completed":
+            if loop.time() >= deadline:
+                raise IdempotencyInProgressError(f"Request with Idempotency-Key {key} is still in progress")
+            await asyncio.sleep(self._poll_interval)
+            existing = await self._store.get_idempotency_record(key)
+            if existing is None:
+                return None
+        return IdempotencyRecord.model_validate(existing)
+
+    async def _release(self, key: str) -> None:
+        try:
+            await self._store.release_idempotency_key(key)
+        except Exception:
+            logger.exception("Failed to release idempotency key %s", key)
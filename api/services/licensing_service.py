@@ -69,10 +69,11 @@ SUPPORT_PLAN_NAMES: dict[str, str] = {
 class LicensingService:
     """Fetch license and support plan info from the Marketplace API."""
 
-    def __init__(self) -> None:
+    def __init__(self, client: httpx.AsyncClient | None = None) -> None:
         settings = get_settings()
         self._base_url = f"{settings.apim_base_url}/marketplace/api"
         self._apim_key = settings.apim_subscription_key
+        self._client = client or httpx.AsyncClient(timeout=10.0)
 
     async def get_license_info(self, email: str) -> dict[str, Any]:
         """Look up subscriptions for a user by email.
@@ -108,12 +109,12 @@ class LicensingService:
             if self._apim_key:
                 headers["Ocp-Apim-Subscription-Key"] = self._apim_key
 
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                resp = await client.get(
-                    f"{self._base_url}/subscription-lookup",
-                    params={"email": email},
-                    headers=headers,
-                )
+            resp = await self._client.get(
+                f"{self._base_url}/subscription-lookup",
+                params={"email": email},
+                headers=headers,
+                timeout=10.0,
+            )
 
             if resp.status_code != 200:
                 logger.error(
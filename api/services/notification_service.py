@@ -1,12 +1,18 @@
 """
 Notification service — sends email confirmations via Azure Communication Services.
+
+``notify_created()`` is called once a ticket is stored and sends the
+reporter's confirmation in the background, so the email never delays the
+submit response; ``close()`` waits for confirmations still being sent.
 """
 
+import asyncio
 import logging
 
 import httpx
 
 from api.config import get_settings
+from api.services.description_renderer import escape
 
 logger = logging.getLogger("acidni-support.services.notification")
 
@@ -14,13 +20,24 @@ logger = logging.getLogger("acidni-support.services.notification")
 class NotificationService:
     """Send notifications for support tickets via the Terprint Communications API."""
 
-    def __init__(self) -> None:
+    def __init__(self, client: httpx.AsyncClient | None = None) -> None:
         settings = get_settings()
         self._apim_url = settings.apim_base_url
         self._apim_key = settings.apim_subscription_key
         self._enabled = settings.notifications_enabled
         self._from_email = settings.notifications_from_email
-        self._client = httpx.AsyncClient(timeout=15.0)
+        # An injected client is a shared pool owned by the caller
+        self._owns_client = client is None
+        self._client = client or httpx.AsyncClient(timeout=15.0)
+        self._inflight: set[asyncio.Task] = set()
+
+    def notify_created(self, to_email: str | None, ticket_id: str, subject: str, app_name: str) -> None:
+        """Send the confirmation for a stored ticket in the background."""
+        if not self._enabled or not to_email:
+            return
+        task = asyncio.create_task(self.send_confirmation(to_email, ticket_id, subject, app_name))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
 
     async def send_confirmation(
         self,
@@ -44,15 +61,15 @@ class NotificationService:
             <table style="border-collapse: collapse; width: 100%; margin: 16px 0;">
                 <tr>
                     <td style="padding: 8px; border-bottom: 1px solid #e5e7eb; font-weight: bold;">Ticket ID</td>
-                    <td style="padding: 8px; border-bottom: 1px solid #e5e7eb;">{ticket_id}</td>
+                    <td style="padding: 8px; border-bottom: 1px solid #e5e7eb;">{escape(ticket_id)}</td>
                 </tr>
                 <tr>
                     <td style="padding: 8px; border-bottom: 1px solid #e5e7eb; font-weight: bold;">Subject</td>
-                    <td style="padding: 8px; border-bottom: 1px solid #e5e7eb;">{subject}</td>
+                    <td style="padding: 8px; border-bottom: 1px solid #e5e7eb;">{escape(subject)}</td>
                 </tr>
                 <tr>
                     <td style="padding: 8px; border-bottom: 1px solid #e5e7eb; font-weight: bold;">Application</td>
-                    <td style="padding: 8px; border-bottom: 1px solid #e5e7eb;">{app_name}</td>
+                    <td style="padding: 8px; border-bottom: 1px solid #e5e7eb;">{escape(app_name)}</td>
                 </tr>
             </table>
             <p>We'll review your request and get back to you shortly.</p>
@@ -73,6 +90,7 @@ class NotificationService:
                     "body": body_html,
                     "from": self._from_email,
                 },
+                timeout=15.0,
             )
             if response.status_code in (200, 201, 202):
                 logger.info("Confirmation email sent for %s to %s", ticket_id, to_email)
@@ -88,5 +106,8 @@ class NotificationService:
             return False
 
     async def close(self) -> None:
-        """Close the HTTP client."""
-        await self._client.aclose()
+        """Wait for confirmations in flight, then close the HTTP client unless it was injected."""
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        if self._owns_client:
+            await self._client.aclose()
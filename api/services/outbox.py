@@ -0,0 +1,340 @@
+"""
+Submission outbox — durable local queue for accept-then-process submits.
+
+When asynchronous submit is enabled, ``POST /api/submit`` validates the
+payload, writes it to a SQLite database (WAL mode) and returns 202.  A pool of
+background workers started in the app lifespan drains the outbox to Azure
+DevOps and Cosmos DB, retrying with exponential backoff.
+
+Rows are claimed with a lease so that several uvicorn workers can share the
+same file, and a row whose worker died mid-flight is picked up again once its
+lease expires.  Every claim records a fresh lease owner token, and a worker
+only writes the outcome of a row while it still owns it: one whose lease
+expired and was reclaimed cannot overwrite its successor's state.
+
+Created and failed rows are kept for ``retention_seconds`` (so the status
+endpoint can report them) and then purged by the worker pool.
+
+Rows in the priority lane are claimed as if they had been
+queued ``priority_boost_seconds`` earlier, so they jump ahead of standard work
+without starving it.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+logger = logging.getLogger("acidni-support.services.outbox")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    ticket_id       TEXT PRIMARY KEY,
+    payload         TEXT NOT NULL,
+    status          TEXT NOT NULL,
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    lease_until     REAL NOT NULL DEFAULT 0,
+    lease_owner     TEXT,
+    work_item       TEXT,
+    stored_ticket_id TEXT,
+    last_error      TEXT,
+    created_at      REAL NOT NULL,
+    updated_at      REAL NOT NULL,
+    lane            TEXT NOT NULL DEFAULT 'standard'
+);
+CREATE INDEX IF NOT EXISTS ix_outbox_due ON outbox (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS ix_outbox_finished ON outbox (status, updated_at);
+"""
+
+
+class OutboxStatus:
+    """Outbox row states (also surfaced by the submission status endpoint)."""
+
+    QUEUED = "queued"
+    PROCESSING = "processing"
+    CREATED = "created"
+    FAILED = "failed"
+
+
+class OutboxEntry(BaseModel):
+    """A queued submission as stored in the outbox."""
+
+    ticket_id: str
+    payload: str
+    status: str
+    lane: str = "standard"
+    attempts: int = 0
+    lease_owner: str | None = None
+    work_item: dict[str, Any] | None = None
+    # Set when ticket_id turned out to belong to another ticket and this one was stored under a new ID
+    stored_ticket_id: str | None = None
+    last_error: str | None = None
+    created_at: float
+    updated_at: float
+
+
+def _row_to_entry(row: sqlite3.Row) -> OutboxEntry:
+    return OutboxEntry(
+        ticket_id=row["ticket_id"],
+        payload=row["payload"],
+        status=row["status"],
+        lane=row["lane"],
+        attempts=row["attempts"],
+        lease_owner=row["lease_owner"],
+        work_item=json.loads(row["work_item"]) if row["work_item"] else None,
+        stored_ticket_id=row["stored_ticket_id"],
+        last_error=row["last_error"],
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+    )
+
+
+class SubmissionOutbox:
+    """SQLite-backed outbox of accepted-but-unprocessed submissions.
+
+    All blocking SQLite calls run in a worker thread via ``asyncio.to_thread``
+    and are serialised on a single connection.
+    """
+
+    def __init__(self, path: str | Path, lease_seconds: float = 120.0, priority_boost_seconds: float = 300.0) -> None:
+        self._path = Path(path)
+        self._lease_seconds = lease_seconds
+        self._priority_boost = priority_boost_seconds
+        self._lock = threading.Lock()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None, timeout=30.0)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        # Wakes idle workers in this process as soon as something is enqueued
+        self.new_entry = asyncio.Event()
+
+    def _execute(self, sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    async def enqueue(self, ticket_id: str, payload: str, lane: str = "standard") -> None:
+        """Durably store a submission for background processing."""
+        now = time.time()
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO outbox (ticket_id, payload, status, lane, next_attempt_at, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (ticket_id, payload, OutboxStatus.QUEUED, lane, now, now, now),
+        )
+        self.new_entry.set()
+
+    async def claim(self) -> OutboxEntry | None:
+        """Lease the next due entry, or return None if nothing is due.
+
+        Due entries are queued rows whose backoff has elapsed, and processing
+        rows whose lease has expired.  Priority-lane rows are ordered as if
+        due ``priority_boost_seconds`` earlier.
+        """
+        now = time.time()
+        rows = await asyncio.to_thread(
+            self._execute,
+            "UPDATE outbox SET status = ?, lease_until = ?, lease_owner = ?, attempts = attempts + 1, updated_at = ? "
+            "WHERE ticket_id = ("
+            "  SELECT ticket_id FROM outbox"
+            "  WHERE (status = ? AND next_attempt_at <= ?) OR (status = ? AND lease_until <= ?)"
+            "  ORDER BY next_attempt_at - CASE lane WHEN 'priority' THEN ? ELSE 0 END LIMIT 1"
+            ") RETURNING *",
+            (
+                OutboxStatus.PROCESSING,
+                now + self._lease_seconds,
+                uuid.uuid4().hex,
+                now,
+                OutboxStatus.QUEUED,
+                now,
+                OutboxStatus.PROCESSING,
+                now,
+                self._priority_boost,
+            ),
+        )
+        return _row_to_entry(rows[0]) if rows else None
+
+    async def record_work_item(self, ticket_id: str, work_item: dict[str, Any]) -> None:
+        """Checkpoint the created work item so a retry never creates a second one."""
+        await asyncio.to_thread(
+            self._execute,
+            "UPDATE outbox SET work_item = ?, updated_at = ? WHERE ticket_id = ?",
+            (json.dumps(work_item), time.time(), ticket_id),
+        )
+
+    async def record_ticket_id(self, ticket_id: str, stored_ticket_id: str) -> None:
+        """Checkpoint the new ID a ticket is stored under, so a retry reuses it."""
+        await asyncio.to_thread(
+            self._execute,
+            "UPDATE outbox SET stored_ticket_id = ?, updated_at = ? WHERE ticket_id = ?",
+            (stored_ticket_id, time.time(), ticket_id),
+        )
+
+    def _execute_fenced(self, sql: str, params: tuple) -> bool:
+        """Run an UPDATE ending in ``WHERE ticket_id = ? AND lease_owner = ?``; False if the lease was lost."""
+        with self._lock:
+            if self._conn.execute(sql, params).rowcount:
+                return True
+        logger.warning("Outbox entry %s is no longer leased by this worker; not updating it", params[-2])
+        return False
+
+    async def mark_created(self, ticket_id: str, lease_owner: str) -> bool:
+        """Mark an entry as fully processed, if ``lease_owner`` still holds its lease."""
+        return await asyncio.to_thread(
+            self._execute_fenced,
+            "UPDATE outbox SET status = ?, lease_until = 0, last_error = NULL, updated_at = ? "
+            "WHERE ticket_id = ? AND lease_owner = ?",
+            (OutboxStatus.CREATED, time.time(), ticket_id, lease_owner),
+        )
+
+    async def mark_retry(self, ticket_id: str, lease_owner: str, error: str, delay: float) -> bool:
+        """Return an entry to the queue after a failed attempt, if ``lease_owner`` still holds its lease."""
+        now = time.time()
+        return await asyncio.to_thread(
+            self._execute_fenced,
+            "UPDATE outbox SET status = ?, next_attempt_at = ?, lease_until = 0, last_error = ?, updated_at = ? "
+            "WHERE ticket_id = ? AND lease_owner = ?",
+            (OutboxStatus.QUEUED, now + delay, error[:500], now, ticket_id, lease_owner),
+        )
+
+    async def mark_failed(self, ticket_id: str, lease_owner: str, error: str) -> bool:
+        """Give up on an entry after exhausting its retries, if ``lease_owner`` still holds its lease."""
+        return await asyncio.to_thread(
+            self._execute_fenced,
+            "UPDATE outbox SET status = ?, lease_until = 0, last_error = ?, updated_at = ? "
+            "WHERE ticket_id = ? AND lease_owner = ?",
+            (OutboxStatus.FAILED, error[:500], time.time(), ticket_id, lease_owner),
+        )
+
+    async def purge(self, retention_seconds: float) -> int:
+        """Delete created and failed entries last updated more than ``retention_seconds`` ago.
+
+        Returns the number of entries deleted.
+        """
+        cutoff = time.time() - retention_seconds
+        rows = await asyncio.to_thread(
+            self._execute,
+            "DELETE FROM outbox WHERE status IN (?, ?) AND updated_at < ? RETURNING ticket_id",
+            (OutboxStatus.CREATED, OutboxStatus.FAILED, cutoff),
+        )
+        if rows:
+            logger.info("Purged %d finished outbox entries", len(rows))
+        return len(rows)
+
+    async def get(self, ticket_id: str) -> OutboxEntry | None:
+        """Look up an entry by ticket ID."""
+        rows = await asyncio.to_thread(self._execute, "SELECT * FROM outbox WHERE ticket_id = ?", (ticket_id,))
+        return _row_to_entry(rows[0]) if rows else None
+
+    def close(self) -> None:
+        """Close the SQLite connection."""
+        with self._lock:
+            self._conn.close()
+
+
+OutboxHandler = Callable[[OutboxEntry], Awaitable[None]]
+
+
+class OutboxWorkerPool:
+    """Background workers that drain a ``SubmissionOutbox``."""
+
+    def __init__(
+        self,
+        outbox: SubmissionOutbox,
+        handler: OutboxHandler,
+        *,
+        concurrency: int = 4,
+        max_attempts: int = 8,
+        poll_interval: float = 1.0,
+        base_backoff: float = 2.0,
+        max_backoff: float = 300.0,
+        retention_seconds: float | None = None,
+        purge_interval: float = 3600.0,
+    ) -> None:
+        self._outbox = outbox
+        self._handler = handler
+        self._concurrency = concurrency
+        self._max_attempts = max_attempts
+        self._poll_interval = poll_interval
+        self._base_backoff = base_backoff
+        self._max_backoff = max_backoff
+        self._retention = retention_seconds
+        self._purge_interval = purge_interval
+        self._tasks: list[asyncio.Task] = []
+
+    def _backoff(self, attempts: int) -> float:
+        """Exponential backoff with jitter for the given attempt number."""
+        delay = min(self._max_backoff, self._base_backoff * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def process_one(self) -> bool:
+        """Claim and process a single entry.  Returns False if nothing was due."""
+        entry = await self._outbox.claim()
+        if entry is None:
+            return False
+        try:
+            await self._handler(entry)
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            if entry.attempts >= self._max_attempts:
+                logger.error("Outbox entry %s failed permanently after %d attempts: %s", entry.ticket_id,
+                             entry.attempts, error)
+                await self._outbox.mark_failed(entry.ticket_id, entry.lease_owner, error)
+            else:
+                delay = self._backoff(entry.attempts)
+                logger.warning("Outbox entry %s attempt %d failed (%s) — retrying in %.1fs", entry.ticket_id,
+                               entry.attempts, error, delay)
+                await self._outbox.mark_retry(entry.ticket_id, entry.lease_owner, error, delay)
+        else:
+            await self._outbox.mark_created(entry.ticket_id, entry.lease_owner)
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            self._outbox.new_entry.clear()
+            try:
+                if await self.process_one():
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Outbox worker error")
+            try:
+                await asyncio.wait_for(self._outbox.new_entry.wait(), timeout=self._poll_interval)
+            except TimeoutError:
+                pass
+
+    async def _purge(self) -> None:
+        while True:
+            try:
+                await self._outbox.purge(self._retention)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Outbox purge failed")
+            await asyncio.sleep(self._purge_interval)
+
+    async def start(self) -> None:
+        """Start the worker tasks (and, with a retention period, the purge task)."""
+        self._tasks = [asyncio.create_task(self._run(), name=f"outbox-worker-{i}") for i in range(self._concurrency)]
+        if self._retention is not None:
+            self._tasks.append(asyncio.create_task(self._purge(), name="outbox-purge"))
+        logger.info("Started %d outbox workers", self._concurrency)
+
+    async def stop(self) -> None:
+        """Cancel the worker and purge tasks.  Leased entries are retried after restart."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
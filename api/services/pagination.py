@@ -0,0 +1,45 @@
+"""
+Opaque page cursors for list endpoints.
+
+A cursor wraps a Cosmos DB continuation token together with a short hash of
+the filters it was issued for, base64url-encoded.  Clients treat it as an
+opaque string; replaying it with different filters is rejected instead of
+silently returning pages of another query.  The filter values themselves
+(e.g. an email address) are never embedded.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor is malformed or was issued for different filters."""
+
+
+def _scope(filters: tuple[str | None, ...]) -> str:
+    return hashlib.sha256(json.dumps(filters).encode()).hexdigest()[:16]
+
+
+def encode_cursor(continuation: str, *filters: str | None) -> str:
+    """Wrap a continuation token for the query identified by ``filters``."""
+    payload = json.dumps({"s": _scope(filters), "t": continuation}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *filters: str | None) -> str:
+    """Return the continuation token inside ``cursor``.
+
+    Raises ``InvalidCursorError`` if it cannot be decoded or belongs to a
+    query with other filters.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        scope, continuation = payload["s"], payload["t"]
+    except (binascii.Error, ValueError, TypeError, KeyError) as exc:
+        raise InvalidCursorError("Cursor is not valid.") from exc
+    if scope != _scope(filters) or not isinstance(continuation, str):
+        raise InvalidCursorError("Cursor was issued for a different query.")
+    return continuation
@@ -0,0 +1,147 @@
+"""
+Priority scheduler — license-tier lanes for outbound Azure DevOps calls.
+
+Every DevOps call made on behalf of a submission takes a slot from a shared
+pool of ``max_concurrency`` slots.  Requests are assigned a lane:
+
+* ``priority`` — P1 tickets and customers with priority support or a paid
+  support plan;
+* ``standard`` — everyone else.
+
+The standard lane can never hold more than ``max_concurrency - reserved``
+slots, so ``reserved`` slots are always available to priority work.  When
+both lanes have waiters, freed slots go to the priority lane ``weight`` times
+for every one standard grant, so standard traffic still makes progress under
+a sustained priority burst.
+
+Grants happen synchronously from the event loop, so no lock is needed.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from enum import Enum
+
+from api.metrics import registry
+from api.models import SupportSubmitRequest
+
+logger = logging.getLogger("acidni-support.services.priority_scheduler")
+
+_wait_time = registry.histogram("devops_lane_wait_seconds", "Time spent waiting for a DevOps call slot, per lane")
+_in_flight = registry.gauge("devops_lane_in_flight", "DevOps calls holding a slot, per lane")
+_queued = registry.gauge("devops_lane_queued", "Calls waiting for a DevOps slot, per lane")
+
+
+class Lane(str, Enum):
+    """Scheduling lanes, highest priority first."""
+
+    PRIORITY = "priority"
+    STANDARD = "standard"
+
+
+def lane_for(request: SupportSubmitRequest) -> Lane:
+    """Pick the lane for a submission from its priority and license tier."""
+    if request.priority == 1:
+        return Lane.PRIORITY
+    lic = request.license_info
+    if lic is not None and (lic.has_priority_support or lic.support_plan):
+        return Lane.PRIORITY
+    return Lane.STANDARD
+
+
+class PriorityScheduler:
+    """Weighted two-lane concurrency limiter with a reserved priority share."""
+
+    def __init__(self, max_concurrency: int = 16, reserved: int = 4, weight: int = 3) -> None:
+        if not 0 <= reserved < max_concurrency:
+            raise ValueError("reserved must be at least 0 and less than max_concurrency")
+        self._limit = max_concurrency
+        self._reserved = reserved
+        self._weight = max(1, weight)
+        self._in_flight = {lane: 0 for lane in Lane}
+        self._waiters: dict[Lane, deque[asyncio.Future]] = {lane: deque() for lane in Lane}
+        # Priority grants made in a row while standard work was also waiting
+        self._priority_streak = 0
+
+    def in_flight(self, lane: Lane) -> int:
+        return self._in_flight[lane]
+
+    def queued(self, lane: Lane) -> int:
+        return len(self._waiters[lane])
+
+    def _has_capacity(self, lane: Lane) -> bool:
+        if sum(self._in_flight.values()) >= self._limit:
+            return False
+        if lane is Lane.STANDARD:
+            return self._in_flight[Lane.STANDARD] < self._limit - self._reserved
+        return True
+
+    def _next_lane(self) -> Lane | None:
+        ready = [lane for lane in Lane if self._waiters[lane] and self._has_capacity(lane)]
+        if not ready:
+            return None
+        if len(ready) == 1:
+            return ready[0]
+        if self._priority_streak < self._weight:
+            self._priority_streak += 1
+            return Lane.PRIORITY
+        self._priority_streak = 0
+        return Lane.STANDARD
+
+    def _grant(self, lane: Lane) -> None:
+        self._in_flight[lane] += 1
+        _in_flight.set(self._in_flight[lane], lane=lane.value)
+
+    def _dispatch(self) -> None:
+        while (lane := self._next_lane()) is not None:
+            waiter = self._waiters[lane].popleft()
+            _queued.set(len(self._waiters[lane]), lane=lane.value)
+            if waiter.done():  # cancelled while queued
+                continue
+            self._grant(lane)
+            waiter.set_result(None)
+
+    def _release(self, lane: Lane) -> None:
+        self._in_flight[lane] -= 1
+        _in_flight.set(self._in_flight[lane], lane=lane.value)
+        self._dispatch()
+
+    async def acquire(self, lane: Lane) -> None:
+        """Wait for a slot in ``lane``."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        if not any(self._waiters.values()) and self._has_capacity(lane):
+            self._grant(lane)
+        else:
+            waiter = loop.create_future()
+            self._waiters[lane].append(waiter)
+            _queued.set(len(self._waiters[lane]), lane=lane.value)
+            self._dispatch()
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._release(lane)  # granted just as we were cancelled
+                else:
+                    try:
+                        self._waiters[lane].remove(waiter)
+                    except ValueError:
+                        pass
+                    _queued.set(len(self._waiters[lane]), lane=lane.value)
+                raise
+        _wait_time.observe(loop.time() - started, lane=lane.value)
+
+    def release(self, lane: Lane) -> None:
+        """Return a slot acquired with ``acquire``."""
+        self._release(lane)
+
+    @asynccontextmanager
+    async def slot(self, lane: Lane) -> AsyncIterator[None]:
+        """Hold a slot in ``lane`` for the duration of the block."""
+        await self.acquire(lane)
+        try:
+            yield
+        finally:
+            self.release(lane)
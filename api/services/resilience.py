@@ -0,0 +1,198 @@
+"""
+Resilience primitives for outbound calls — retry policy, token bucket and
+circuit breaker.
+
+* ``RetryPolicy`` — bounded attempts with full-jitter exponential backoff
+  and a total deadline, so retries never outlive the caller's patience.
+* ``TokenBucket`` — client-side pre-throttle.  It can also be paused when
+  the upstream reports (``Retry-After`` / ``X-RateLimit-*``) that we are
+  close to being rate limited, so every caller slows down together instead
+  of each one discovering the 429 on its own.
+* ``CircuitBreaker`` — after ``failure_threshold`` consecutive failures the
+  circuit opens and calls fail immediately with ``CircuitOpenError`` for
+  ``reset_timeout`` seconds; then a single probe call is let through to
+  decide whether to close it again.
+
+Everything runs on the event loop without awaiting between checks and state
+changes, so no locks are needed.
+"""
+
+import asyncio
+import logging
+import math
+import random
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from enum import Enum
+
+from api.metrics import registry
+
+logger = logging.getLogger("acidni-support.services.resilience")
+
+_circuit_state = registry.gauge("circuit_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)")
+_throttle_wait = registry.histogram("throttle_wait_seconds", "Time spent waiting for a token bucket")
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a ``Retry-After`` header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=UTC)
+    return max(0.0, (when - datetime.now(UTC)).total_seconds())
+
+
+class CircuitOpenError(Exception):
+    """The circuit is open; the call was not attempted."""
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(f"Circuit '{name}' is open; retry after {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class RetryPolicy:
+    """Bounded retries with full-jitter exponential backoff and a total deadline."""
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+        deadline: float = 20.0,
+    ) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before the retry that follows attempt number ``attempt`` (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` tokens per second, bursts up to ``burst``."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self._rate = rate
+        self._burst = max(1, burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self._burst)
+        self._updated = clock()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait for a token."""
+        started = self._clock()
+        while True:
+            now = self._clock()
+            self._refill(now)
+            if now < self._paused_until:
+                wait = self._paused_until - now
+            elif self._tokens >= 1:
+                self._tokens -= 1
+                break
+            else:
+                wait = (1 - self._tokens) / self._rate
+            await self._sleep(wait)
+        _throttle_wait.observe(self._clock() - started)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for ``seconds`` (e.g. on an upstream throttle hint)."""
+        now = self._clock()
+        self._paused_until = max(self._paused_until, now + seconds)
+        self._refill(now)
+        self._tokens = 0.0
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+
+_STATE_VALUES = {CircuitState.CLOSED: 0, CircuitState.HALF_OPEN: 1, CircuitState.OPEN: 2}
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self._threshold = max(1, failure_threshold)
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started: float | None = None
+        _circuit_state.set(0, circuit=name)
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state is CircuitState.OPEN and self._clock() - self._opened_at >= self._reset_timeout:
+            self._set_state(CircuitState.HALF_OPEN)
+        return self._state
+
+    def _set_state(self, state: CircuitState) -> None:
+        if state is not self._state:
+            logger.warning("Circuit '%s' %s → %s", self.name, self._state.value, state.value)
+        self._state = state
+        self._probe_started = None
+        _circuit_state.set(_STATE_VALUES[state], circuit=self.name)
+
+    def before_call(self) -> None:
+        """Raise ``CircuitOpenError`` unless a call may go ahead."""
+        state = self.state
+        if state is CircuitState.CLOSED:
+            return
+        now = self._clock()
+        if state is CircuitState.HALF_OPEN:
+            # A probe that never reported back (e.g. cancelled) stops blocking after reset_timeout
+            if self._probe_started is None or now - self._probe_started >= self._reset_timeout:
+                self._probe_started = now
+                return
+            raise CircuitOpenError(self.name, self._reset_timeout - (now - self._probe_started))
+        raise CircuitOpenError(self.name, self._reset_timeout - (now - self._opened_at))
+
+    def record_success(self) -> None:
+        self._failures = 0
+        if self._state is not CircuitState.CLOSED:
+            self._set_state(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state is CircuitState.HALF_OPEN or self._failures >= self._threshold:
+            self._opened_at = self._clock()
+            self._set_state(CircuitState.OPEN)
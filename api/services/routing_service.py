@@ -4,42 +4,149 @@ Routing service — resolves app_id to Azure DevOps project + area path.
 Loads routing configuration from support-routing.yaml and provides
 fast lookups for mapping application submissions to the correct
 DevOps project and area path.
+
+Alongside the raw routes it precomputes a submission plan for every
+(app_id, category) pair — the project, area path, work item type, tags and
+title prefix a submit needs — so the submit hot path is a single dict lookup.
+Apps without a route get the ``_default`` plan tagged with their app_id; that
+derived plan is built on first use and cached (bounded, reset on reload).
+Routes can override any of these per category:
+
+    - app_id: terprint
+      devops_project: Terprint
+      area_path: "Terprint\\Web"
+      categories:
+        feature:
+          work_item_type: User Story
+          area_path: "Terprint\\Product"
 """
 
 import logging
 from pathlib import Path
-from typing import Any
+from typing import Any, NamedTuple
 
 import yaml
+from pydantic import BaseModel, ConfigDict
+
+from api.models import SupportCategory
+from api.services.ttl_cache import LruTtlCache
 
 logger = logging.getLogger("acidni-support.services.routing")
 
 _CONFIG_PATH = Path(__file__).parent.parent / "config" / "support-routing.yaml"
 
+CATEGORY_TYPE_MAP = {
+    SupportCategory.BUG: "Bug",
+    SupportCategory.FEATURE: "Task",
+    SupportCategory.FEEDBACK: "Task",
+    SupportCategory.QUESTION: "Task",
+}
+
+TAG_PREFIX = {
+    SupportCategory.BUG: "support-widget; customer-reported",
+    SupportCategory.FEATURE: "support-widget; feature-request",
+    SupportCategory.FEEDBACK: "support-widget; customer-feedback",
+    SupportCategory.QUESTION: "support-widget; customer-question",
+}
+
+TITLE_PREFIX = {
+    SupportCategory.BUG: "[Support]",
+    SupportCategory.FEATURE: "[Feature Request]",
+    SupportCategory.FEEDBACK: "[Feedback]",
+    SupportCategory.QUESTION: "[Question]",
+}
+
+_CATEGORY_VALUES = {c.value for c in SupportCategory}
+
+# Keys a route may override under ``categories.<category>``
+_OVERRIDE_KEYS = {"devops_project", "area_path", "work_item_type", "tags", "title_prefix"}
+
+# Derived ``_default`` plans kept for unrouted apps; app_id is caller-supplied, so bound it
+_MAX_FALLBACK_PLANS = 4096
+
+
+class SubmissionPlan(BaseModel):
+    """Everything needed to create a work item for one (app_id, category)."""
+
+    model_config = ConfigDict(frozen=True)
+
+    app_id: str
+    category: SupportCategory
+    project: str
+    area_path: str
+    work_item_type: str
+    tag_prefix: str
+    tags: str
+    title_prefix: str
+
+
+def _build_plan(app_id: str, category: SupportCategory, route: dict[str, Any]) -> SubmissionPlan:
+    overrides = (route.get("categories") or {}).get(category.value) or {}
+    project = overrides.get("devops_project", route["devops_project"])
+    tag_prefix = overrides.get("tags", TAG_PREFIX[category])
+    return SubmissionPlan(
+        app_id=app_id,
+        category=category,
+        project=project,
+        area_path=overrides.get("area_path", route.get("area_path", project)),
+        work_item_type=overrides.get("work_item_type", CATEGORY_TYPE_MAP[category]),
+        tag_prefix=tag_prefix,
+        tags=f"{tag_prefix}; {app_id}",
+        title_prefix=overrides.get("title_prefix", TITLE_PREFIX[category]),
+    )
+
+
+class _RoutingTable(NamedTuple):
+    routes: dict[str, dict[str, Any]]
+    plans: dict[tuple[str, SupportCategory], SubmissionPlan]
+    fallbacks: LruTtlCache
+
+
+def _table(
+    routes: dict[str, dict[str, Any]], plans: dict[tuple[str, SupportCategory], SubmissionPlan]
+) -> _RoutingTable:
+    return _RoutingTable(routes, plans, LruTtlCache(_MAX_FALLBACK_PLANS, float("inf")))
+
 
 class RoutingService:
     """Map app_id values to Azure DevOps projects and area paths."""
 
-    def __init__(self, config_path: Path | None = None) -> None:
-        self._config_path = config_path or _CONFIG_PATH
-        self._routes: dict[str, dict[str, Any]] = {}
-        self._load()
+    def __init__(self, config_path: Path | str | None = None) -> None:
+        self._config_path = Path(config_path) if config_path else _CONFIG_PATH
+        self._table = self._load()
+
+    @property
+    def _routes(self) -> dict[str, dict[str, Any]]:
+        return self._table.routes
 
-    def _load(self) -> None:
-        """Load routing configuration from YAML."""
+    def _load(self) -> _RoutingTable:
+        """Load routing configuration from YAML and build the plan table."""
+        routes: dict[str, dict[str, Any]] = {}
+        plans: dict[tuple[str, SupportCategory], SubmissionPlan] = {}
         if not self._config_path.exists():
             logger.warning("Routing config not found at %s — using empty routing", self._config_path)
-            return
+            return _table(routes, plans)
         with open(self._config_path) as fh:
             data = yaml.safe_load(fh)
         if not data or "routes" not in data:
             logger.warning("Routing config has no 'routes' key")
-            return
+            return _table(routes, plans)
         for route in data["routes"]:
             app_id = route.get("app_id")
             if app_id:
-                self._routes[app_id] = route
-        logger.info("Loaded %d support routes", len(self._routes))
+                routes[app_id] = route
+
+        for app_id, route in routes.items():
+            for key, overrides in (route.get("categories") or {}).items():
+                if key not in _CATEGORY_VALUES:
+                    logger.warning("Route %s overrides unknown category '%s'", app_id, key)
+                elif unknown := set(overrides or {}) - _OVERRIDE_KEYS:
+                    logger.warning("Route %s category '%s' has unknown keys: %s", app_id, key, sorted(unknown))
+            for category in SupportCategory:
+                plans[(app_id, category)] = _build_plan(app_id, category, route)
+
+        logger.info("Loaded %d support routes", len(routes))
+        return _table(routes, plans)
 
     def resolve(self, app_id: str) -> dict[str, Any] | None:
         """Resolve an app_id to its routing configuration.
@@ -49,11 +156,47 @@ class RoutingService:
         """
         return self._routes.get(app_id)
 
+    def plan(self, app_id: str, category: SupportCategory) -> SubmissionPlan | None:
+        """Return the submission plan for an app and category.
+
+        Apps without a route use the ``_default`` route's plan, tagged with
+        the requesting app_id.  Returns None if neither exists.
+        """
+        table = self._table
+        key = (app_id, category)
+        plan = table.plans.get(key) or table.fallbacks.get(key)
+        if plan is not None:
+            return plan
+        fallback = table.plans.get(("_default", category))
+        if fallback is None:
+            return None
+        plan = fallback.model_copy(update={"app_id": app_id, "tags": f"{fallback.tag_prefix}; {app_id}"})
+        table.fallbacks.set(key, plan)
+        return plan
+
+    def list_plans(self) -> list[SubmissionPlan]:
+        """Return every precomputed plan, including the ``_default`` route's."""
+        return list(self._table.plans.values())
+
+    def list_projects(self) -> list[str]:
+        """Return the DevOps projects any route can submit to."""
+        return sorted({plan.project for plan in self._table.plans.values()})
+
     def list_app_ids(self) -> list[str]:
         """Return all configured app IDs."""
         return [k for k in self._routes if not k.startswith("_")]
 
     def reload(self) -> None:
-        """Hot-reload routing config."""
-        self._routes.clear()
-        self._load()
+        """Hot-reload routing config.
+
+        The new routes and plans are built aside and swapped in with a single
+        assignment, so concurrent lookups see either the old or the new
+        configuration.  If the file cannot be parsed, the current
+        configuration is kept.
+        """
+        try:
+            table = self._load()
+        except Exception:
+            logger.exception("Failed to reload routing config — keeping current routes")
+            return
+        self._table = table
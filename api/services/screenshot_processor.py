@@ -0,0 +1,240 @@
+"""
+Screenshot processor — normalizes screenshots in a process pool.
+
+Screenshots from high-DPI displays arrive as multi-megabyte PNGs.  Before they
+are attached to a work item they are downscaled to ``max_dimension``,
+re-encoded as WebP or JPEG with all metadata (EXIF, text chunks, ICC) dropped,
+and a small thumbnail is produced alongside.
+
+Decoding and encoding images is CPU-bound and holds the GIL, so the work runs
+in a ``ProcessPoolExecutor`` and the event loop only awaits the result.  Files
+are passed by path, never by content, to keep inter-process traffic tiny.
+
+Pillow is an optional dependency (``pip install acidni-support[images]``);
+without it ``ScreenshotProcessor.available`` is False and callers upload the
+original image.
+"""
+
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from api.metrics import registry
+
+logger = logging.getLogger("acidni-support.services.screenshot_processor")
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - depends on the installed extras
+    Image = None
+    ImageOps = None
+
+OUTPUT_FORMATS = {
+    "webp": ("WEBP", "image/webp", ".webp"),
+    "jpeg": ("JPEG", "image/jpeg", ".jpg"),
+}
+
+_queue_depth = registry.gauge(
+    "screenshot_processing_queue_depth", "Screenshots submitted to the process pool and not yet finished"
+)
+_latency = registry.histogram(
+    "screenshot_processing_seconds", "End-to-end screenshot processing time, including pool queue wait"
+)
+_cpu_time = registry.histogram(
+    "screenshot_processing_worker_seconds", "Time spent decoding, resizing and encoding inside the worker"
+)
+_failures = registry.counter("screenshot_processing_failures_total", "Screenshots that could not be processed")
+
+
+class ProcessedImage(BaseModel):
+    """One encoded output image on disk."""
+
+    path: Path
+    size: int
+    width: int
+    height: int
+    content_type: str
+    extension: str
+
+    def unlink(self) -> None:
+        """Delete the output file."""
+        self.path.unlink(missing_ok=True)
+
+
+class ProcessedScreenshot(BaseModel):
+    """A normalized screenshot and its thumbnail."""
+
+    image: ProcessedImage
+    thumbnail: ProcessedImage
+    original_width: int
+    original_height: int
+    worker_seconds: float
+
+    def unlink(self) -> None:
+        """Delete both output files."""
+        self.image.unlink()
+        self.thumbnail.unlink()
+
+
+def _flatten(image: "Image.Image", output_format: str) -> "Image.Image":
+    """Convert to a mode the output encoder accepts, dropping alpha for JPEG."""
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    if output_format == "JPEG":
+        if has_alpha:
+            rgba = image.convert("RGBA")
+            background = Image.new("RGB", rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.getchannel("A"))
+            return background
+        return image.convert("RGB") if image.mode != "RGB" else image
+    if image.mode not in ("RGB", "RGBA"):
+        return image.convert("RGBA" if has_alpha else "RGB")
+    return image
+
+
+def _encode(image: "Image.Image", directory: str, stem: str, fmt: str, quality: int) -> dict:
+    pil_format, content_type, extension = OUTPUT_FORMATS[fmt]
+    fd, name = tempfile.mkstemp(prefix=f"{stem}-", suffix=extension, dir=directory)
+    with os.fdopen(fd, "wb") as fh:
+        options = {"method": 4} if pil_format == "WEBP" else {"optimize": True}
+        # A fresh image carries no info dict, so no EXIF/XMP/ICC/text chunks are written
+        image.save(fh, format=pil_format, quality=quality, **options)
+    return {
+        "path": name,
+        "size": os.path.getsize(name),
+        "width": image.width,
+        "height": image.height,
+        "content_type": content_type,
+        "extension": extension,
+    }
+
+
+def process_image_file(
+    source: str,
+    *,
+    max_dimension: int,
+    thumbnail_dimension: int,
+    output_format: str,
+    quality: int,
+) -> dict:
+    """Downscale, strip and re-encode ``source``; runs inside a pool worker.
+
+    Returns plain dicts (cheap to pickle) describing the image and thumbnail
+    files, which are written next to ``source``.
+    """
+    started = time.perf_counter()
+    directory = os.path.dirname(source)
+    with Image.open(source) as original:
+        original_size = original.size
+        original.draft("RGB", (max_dimension, max_dimension))  # JPEG: decode at reduced scale
+        ImageOps.exif_transpose(original, in_place=True)
+        # A no-op for RGB/RGBA screenshots; palette images are converted so they resample smoothly
+        image = _flatten(original, OUTPUT_FORMATS[output_format][0])
+        # Downscale in place before anything is copied, so peak memory is one full-size decode
+        image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+        # Copy the (downscaled) pixels only, leaving every metadata block behind
+        image = Image.frombytes(image.mode, image.size, image.tobytes())
+
+    result = _encode(image, directory, "screenshot", output_format, quality)
+    try:
+        thumbnail = image.copy()
+        thumbnail.thumbnail((thumbnail_dimension, thumbnail_dimension), Image.Resampling.LANCZOS)
+        thumb = _encode(thumbnail, directory, "thumbnail", output_format, quality)
+    except BaseException:
+        os.unlink(result["path"])
+        raise
+
+    return {
+        "image": result,
+        "thumbnail": thumb,
+        "original_width": original_size[0],
+        "original_height": original_size[1],
+        "worker_seconds": time.perf_counter() - started,
+    }
+
+
+class ScreenshotProcessor:
+    """Runs ``process_image_file`` in a lazily created process pool."""
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_dimension: int = 1920,
+        thumbnail_dimension: int = 320,
+        output_format: str = "webp",
+        quality: int = 80,
+    ) -> None:
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported screenshot format: {output_format}")
+        self._max_workers = max_workers
+        self._max_dimension = max_dimension
+        self._thumbnail_dimension = thumbnail_dimension
+        self._output_format = output_format
+        self._quality = quality
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def available(self) -> bool:
+        """True when Pillow is installed."""
+        return Image is not None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+            logger.info("Started screenshot process pool with %d workers", self._max_workers)
+        return self._executor
+
+    async def process(self, source: Path) -> ProcessedScreenshot:
+        """Normalize the image at ``source`` and create its thumbnail."""
+        if not self.available:
+            raise RuntimeError("Pillow is not installed; install acidni-support[images]")
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        _queue_depth.inc()
+        try:
+            result = await loop.run_in_executor(
+                self._get_executor(),
+                partial(
+                    process_image_file,
+                    str(source),
+                    max_dimension=self._max_dimension,
+                    thumbnail_dimension=self._thumbnail_dimension,
+                    output_format=self._output_format,
+                    quality=self._quality,
+                ),
+            )
+        except Exception:
+            _failures.inc()
+            raise
+        finally:
+            _queue_depth.dec()
+
+        elapsed = time.perf_counter() - started
+        _latency.observe(elapsed)
+        _cpu_time.observe(result["worker_seconds"])
+        processed = ProcessedScreenshot.model_validate(result)
+        logger.info(
+            "Processed screenshot %dx%d → %dx%d %s (%d bytes) in %.3fs",
+            processed.original_width,
+            processed.original_height,
+            processed.image.width,
+            processed.image.height,
+            processed.image.content_type,
+            processed.image.size,
+            elapsed,
+        )
+        return processed
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
@@ -0,0 +1,167 @@
+"""
+Screenshot upload — spools streamed screenshot uploads to a temp file.
+
+The upload arrives as raw image bytes or as base64 text (optionally a
+``data:image/...;base64,`` URL, which is what the widget's canvas capture
+produces).  It is written to disk chunk by chunk, base64 being decoded
+incrementally, so peak memory per request stays at a few chunks regardless of
+image size.
+"""
+
+import binascii
+import logging
+import os
+import tempfile
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+from pydantic import BaseModel
+
+logger = logging.getLogger("acidni-support.services.screenshot_upload")
+
+CHUNK_SIZE = 64 * 1024
+
+# Content types whose payload is base64 text rather than raw image bytes
+BASE64_CONTENT_TYPES = {"text/plain", "application/base64"}
+
+_IMAGE_SIGNATURES: list[tuple[bytes, str, str]] = [
+    (b"\x89PNG\r\n\x1a\n", "image/png", ".png"),
+    (b"\xff\xd8\xff", "image/jpeg", ".jpg"),
+    (b"GIF87a", "image/gif", ".gif"),
+    (b"GIF89a", "image/gif", ".gif"),
+]
+
+_WHITESPACE = b" \t\r\n"
+
+
+class ScreenshotUploadError(ValueError):
+    """Base class for rejected screenshot uploads."""
+
+
+class ScreenshotTooLargeError(ScreenshotUploadError):
+    """The decoded screenshot exceeds the configured size limit."""
+
+
+class UnsupportedScreenshotError(ScreenshotUploadError):
+    """The upload is not a recognised image or is malformed."""
+
+
+class SpooledScreenshot(BaseModel):
+    """A screenshot spooled to a temporary file."""
+
+    path: Path
+    size: int
+    content_type: str
+    extension: str
+
+    def unlink(self) -> None:
+        """Delete the temporary file."""
+        self.path.unlink(missing_ok=True)
+
+
+def detect_image_type(header: bytes) -> tuple[str, str] | None:
+    """Return ``(content_type, extension)`` for a supported image header, else None."""
+    for signature, content_type, extension in _IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return content_type, extension
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp", ".webp"
+    return None
+
+
+class Base64StreamDecoder:
+    """Incremental base64 decoder that tolerates whitespace and a data-URL prefix."""
+
+    def __init__(self) -> None:
+        self._carry = b""
+        self._prefix_checked = False
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Decode as much of ``chunk`` as forms whole base64 quanta."""
+        data = self._carry + chunk.translate(None, _WHITESPACE)
+        if not self._prefix_checked:
+            if data.startswith(b"data:"):
+                comma = data.find(b",")
+                if comma == -1:
+                    if len(data) > 256:
+                        raise UnsupportedScreenshotError("Malformed data URL")
+                    self._carry = data
+                    return b""
+                data = data[comma + 1:]
+            elif len(data) < 5 and b"data:".startswith(data):
+                self._carry = data  # could still be the start of "data:"
+                return b""
+            self._prefix_checked = True
+
+        usable = len(data) - len(data) % 4
+        self._carry = data[usable:]
+        try:
+            return binascii.a2b_base64(data[:usable], strict_mode=True) if usable else b""
+        except binascii.Error as e:
+            raise UnsupportedScreenshotError(f"Invalid base64 screenshot: {e}") from e
+
+    def finish(self) -> bytes:
+        """Decode whatever remains; the total input must be valid base64."""
+        if not self._carry:
+            return b""
+        try:
+            return binascii.a2b_base64(self._carry, strict_mode=True)
+        except binascii.Error as e:
+            raise UnsupportedScreenshotError(f"Invalid base64 screenshot: {e}") from e
+        finally:
+            self._carry = b""
+
+
+async def spool_screenshot(
+    chunks: AsyncIterator[bytes],
+    *,
+    base64_encoded: bool,
+    max_bytes: int,
+    directory: str | None = None,
+) -> SpooledScreenshot:
+    """Write an uploaded screenshot to a temporary file as it streams in.
+
+    Raises ``ScreenshotTooLargeError`` once more than ``max_bytes`` of image
+    data have been received, or ``UnsupportedScreenshotError`` if the data is
+    not a PNG, JPEG, GIF or WebP image.  The temp file is removed on error.
+    """
+    decoder = Base64StreamDecoder() if base64_encoded else None
+    fd, name = tempfile.mkstemp(prefix="screenshot-", dir=directory)
+    path = Path(name)
+    size = 0
+    header = b""
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            def write(data: bytes) -> None:
+                nonlocal size, header
+                if not data:
+                    return
+                size += len(data)
+                if size > max_bytes:
+                    raise ScreenshotTooLargeError(f"Screenshot exceeds {max_bytes} bytes")
+                if len(header) < 16:
+                    header += data[: 16 - len(header)]
+                fh.write(data)
+
+            async for chunk in chunks:
+                write(decoder.feed(chunk) if decoder else chunk)
+            if decoder:
+                write(decoder.finish())
+
+        image_type = detect_image_type(header)
+        if image_type is None:
+            raise UnsupportedScreenshotError("Screenshot must be a PNG, JPEG, GIF or WebP image")
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+
+    content_type, extension = image_type
+    logger.info("Spooled %s screenshot (%d bytes) to %s", content_type, size, path)
+    return SpooledScreenshot(path=path, size=size, content_type=content_type, extension=extension)
+
+
+async def iter_file(path: Path, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Yield a file's contents in chunks (for streaming uploads upstream)."""
+    with open(path, "rb") as fh:
+        while chunk := fh.read(chunk_size):
+            yield chunk
@@ -0,0 +1,374 @@
+"""
+SQLite ticket store — an embedded ``TicketStore`` for local development,
+tests and load benchmarks.
+
+Everything lives in one database file in WAL mode, so several uvicorn
+workers can share it.  Documents are stored as JSON next to the columns the
+queries filter on:
+
+* ``tickets`` — keyed by ``(app_id, id)`` like a Cosmos DB point read, with
+  indexes on ``id`` (the newest-first listing), the normalized
+  ``user_email`` ("My Tickets") and the linked work item ID (status sync);
+* ``audit_log``, ``sync_state`` and ``idempotency`` — the documents Cosmos
+  DB keeps in the tickets, sync_state and idempotency containers.
+
+Listings page with keyset continuations (the last ticket ID of the page) and
+project fields inside SQLite with ``json_extract``, mirroring the Cosmos DB
+query contract.  All blocking SQLite calls run in a worker thread via
+``asyncio.to_thread`` and are serialised on a single connection.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import AsyncIterator, Sequence
+from pathlib import Path
+
+from api.models import TicketDocument
+from api.services.cosmos_service import TicketPage, audit_doc, email_index_doc, normalize_email, projection
+from api.services.ticket_store import TicketIdConflictError, is_same_submission
+
+logger = logging.getLogger("acidni-support.services.sqlite_store")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tickets (
+    app_id       TEXT NOT NULL,
+    id           TEXT NOT NULL,
+    user_email   TEXT,
+    created_at   TEXT NOT NULL,
+    work_item_id INTEGER,
+    doc          TEXT NOT NULL,
+    PRIMARY KEY (app_id, id)
+);
+CREATE INDEX IF NOT EXISTS ix_tickets_id ON tickets (id);
+CREATE INDEX IF NOT EXISTS ix_tickets_email ON tickets (user_email, id) WHERE user_email IS NOT NULL;
+CREATE INDEX IF NOT EXISTS ix_tickets_work_item ON tickets (work_item_id) WHERE work_item_id IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS audit_log (
+    app_id    TEXT NOT NULL,
+    id        TEXT NOT NULL,
+    ticket_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    doc       TEXT NOT NULL,
+    PRIMARY KEY (app_id, id)
+);
+CREATE INDEX IF NOT EXISTS ix_audit_ticket ON audit_log (app_id, ticket_id, timestamp);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    name TEXT PRIMARY KEY,
+    doc  TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS idempotency (
+    key        TEXT PRIMARY KEY,
+    doc        TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+_INSERT_TICKET = (
+    "INSERT OR IGNORE INTO tickets (app_id, id, user_email, created_at, work_item_id, doc) VALUES (?, ?, ?, ?, ?, ?)"
+)
+_INSERT_AUDIT = "INSERT OR IGNORE INTO audit_log (app_id, id, ticket_id, timestamp, doc) VALUES (?, ?, ?, ?, ?)"
+_UPSERT_AUDIT = "INSERT OR REPLACE INTO audit_log (app_id, id, ticket_id, timestamp, doc) VALUES (?, ?, ?, ?, ?)"
+
+_AUDIT_ENTRY_FIELDS = ("id", "ticket_id", "app_id", "action", "details", "timestamp")
+
+Statement = tuple[str, tuple]
+
+
+def _ticket_row(doc: dict) -> tuple:
+    email = doc.get("user_email")
+    devops = doc.get("devops") or {}
+    return (
+        doc["app_id"],
+        doc["id"],
+        normalize_email(email) if email else None,
+        doc.get("created_at") or "",
+        devops.get("work_item_id"),
+        json.dumps(doc),
+    )
+
+
+def _audit_row(entry: dict) -> tuple:
+    return entry["app_id"], entry["id"], entry["ticket_id"], entry["timestamp"], json.dumps(entry)
+
+
+def _document_column(fields: Sequence[str] | None) -> str:
+    """SQL expression returning each row's (projected) document as JSON text."""
+    if not fields:
+        return "doc"
+    pairs = ", ".join(f"'{alias}', json_extract(doc, '$.{field}')" for field, alias in projection(fields))
+    return f"json_object({pairs})"
+
+
+class SqliteTicketStore:
+    """``TicketStore`` backed by a local SQLite database file."""
+
+    def __init__(self, path: str | Path) -> None:
+        self._path = Path(path)
+        self._lock = threading.Lock()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None, timeout=30.0)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _execute(self, sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _transaction(self, statements: list[Statement]) -> list[int]:
+        """Run statements atomically; returns each statement's row count."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                counts = [self._conn.execute(sql, params).rowcount for sql, params in statements]
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return counts
+
+    def _insert_ticket(self, doc: dict, entry: dict | None) -> dict | None:
+        """Insert a ticket (and audit entry) atomically; returns the stored ticket if the ID was taken."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._conn.execute(_INSERT_TICKET, _ticket_row(doc)).rowcount:
+                    stored = None
+                else:
+                    row = self._conn.execute(
+                        "SELECT doc FROM tickets WHERE app_id = ? AND id = ?", (doc["app_id"], doc["id"])
+                    ).fetchone()
+                    stored = json.loads(row["doc"])
+                if entry is not None and (stored is None or is_same_submission(stored, doc)):
+                    self._conn.execute(_INSERT_AUDIT, _audit_row(entry))
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return stored
+
+    async def _create_ticket(self, doc: dict, entry: dict | None = None) -> dict:
+        stored = await asyncio.to_thread(self._insert_ticket, doc, entry)
+        if stored is None:
+            return doc
+        if not is_same_submission(stored, doc):
+            raise TicketIdConflictError(f"Ticket ID {doc['id']} is already used by another ticket")
+        logger.info("Ticket %s was already stored; treating the save as a retry", doc["id"])
+        return stored
+
+    async def save_ticket(self, ticket: TicketDocument) -> dict:
+        """Create a ticket document; raises ``TicketIdConflictError`` if another ticket has its ID."""
+        doc = await self._create_ticket(ticket.model_dump(mode="json"))
+        logger.info("Saved ticket %s to SQLite", ticket.id)
+        return doc
+
+    async def save_ticket_with_audit(self, ticket: TicketDocument, details: dict) -> dict:
+        """Save a ticket and its ``created`` audit entry in one transaction."""
+        entry = audit_doc(
+            ticket.id, ticket.app_id, "created", details, timestamp=ticket.created_at, entry_id=f"{ticket.id}-created"
+        )
+        doc = await self._create_ticket(ticket.model_dump(mode="json"), entry)
+        logger.info("Saved ticket %s with audit entry to SQLite", ticket.id)
+        return doc
+
+    async def index_ticket_emails(self, tickets: list[dict]) -> int:
+        """Nothing to write: ``user_email`` is an indexed column of the tickets table.
+
+        Returns the number of tickets with an email, i.e. those the index covers.
+        """
+        return sum(1 for ticket in tickets if ticket.get("user_email"))
+
+    async def get_ticket(self, ticket_id: str, app_id: str) -> dict | None:
+        """Retrieve a ticket by ID, or None if it does not exist."""
+        rows = await asyncio.to_thread(
+            self._execute, "SELECT doc FROM tickets WHERE app_id = ? AND id = ?", (app_id, ticket_id)
+        )
+        return json.loads(rows[0]["doc"]) if rows else None
+
+    async def list_tickets(
+        self,
+        app_id: str | None = None,
+        user_email: str | None = None,
+        limit: int = 50,
+        continuation: str | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> TicketPage:
+        """List one page of tickets, newest first, with optional filters.
+
+        Same contract as ``CosmosService.list_tickets``, except that
+        ``user_email`` matches case-insensitively.  The continuation is the
+        last ticket ID of the page.
+        """
+        conditions = []
+        params: list = []
+        if app_id:
+            conditions.append("app_id = ?")
+            params.append(app_id)
+        if user_email:
+            conditions.append("user_email = ?")
+            params.append(normalize_email(user_email))
+        if continuation:
+            conditions.append("id < ?")
+            params.append(continuation)
+        where_clause = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        # One extra row tells whether there is a next page
+        rows = await asyncio.to_thread(
+            self._execute,
+            f"SELECT id, {_document_column(fields)} AS doc FROM tickets{where_clause} ORDER BY id DESC LIMIT ?",
+            (*params, limit + 1),
+        )
+        page = rows[:limit]
+        next_token = page[-1]["id"] if len(rows) > limit else None
+        return TicketPage([json.loads(row["doc"]) for row in page], next_token)
+
+    async def list_tickets_by_email(
+        self,
+        user_email: str,
+        app_id: str | None = None,
+        limit: int = 50,
+        continuation: str | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> TicketPage:
+        """List one page of a user's ticket summaries (the ``user_email`` index)."""
+        page = await self.list_tickets(app_id, user_email, limit, continuation, fields)
+        if fields:
+            return page
+        return TicketPage([email_index_doc(item) for item in page.items], page.continuation)
+
+    async def scan_tickets(self, page_size: int = 100, continuation: str | None = None) -> AsyncIterator[TicketPage]:
+        """Yield every ticket with an email, page by page.
+
+        Each page's ``continuation`` resumes the scan after that page.
+        """
+        after = int(continuation) if continuation else 0
+        while True:
+            rows = await asyncio.to_thread(
+                self._execute,
+                "SELECT rowid AS seq, doc FROM tickets WHERE user_email IS NOT NULL AND rowid > ? "
+                "ORDER BY rowid LIMIT ?",
+                (after, page_size),
+            )
+            if not rows:
+                return
+            after = rows[-1]["seq"]
+            more = len(rows) == page_size
+            yield TicketPage([json.loads(row["doc"]) for row in rows], str(after) if more else None)
+            if not more:
+                return
+
+    async def find_tickets_by_work_items(self, work_item_ids: list[int]) -> list[dict]:
+        """Return ``id``, ``app_id`` and ``status`` of tickets linked to any of the work items."""
+        if not work_item_ids:
+            return []
+        placeholders = ", ".join("?" for _ in work_item_ids)
+        rows = await asyncio.to_thread(
+            self._execute,
+            "SELECT id, app_id, json_extract(doc, '$.status') AS status, work_item_id FROM tickets "
+            f"WHERE work_item_id IN ({placeholders})",
+            tuple(work_item_ids),
+        )
+        return [dict(row) for row in rows]
+
+    async def patch_ticket_statuses(self, app_id: str, updates: list[tuple[str, str, str]]) -> int:
+        """Set ``status`` and ``updated_at`` on tickets in one app, in one transaction.
+
+        Returns the number of tickets patched; missing tickets are skipped.
+        """
+        counts = await asyncio.to_thread(
+            self._transaction,
+            [
+                (
+                    "UPDATE tickets SET doc = json_set(doc, '$.status', ?, '$.updated_at', ?) "
+                    "WHERE app_id = ? AND id = ?",
+                    (status, updated_at, app_id, ticket_id),
+                )
+                for ticket_id, status, updated_at in updates
+            ],
+        )
+        return sum(counts)
+
+    async def get_sync_state(self, name: str) -> dict | None:
+        """Read a background sync checkpoint (e.g. a watermark)."""
+        rows = await asyncio.to_thread(self._execute, "SELECT doc FROM sync_state WHERE name = ?", (name,))
+        return json.loads(rows[0]["doc"]) if rows else None
+
+    async def save_sync_state(self, name: str, state: dict) -> None:
+        """Store a background sync checkpoint."""
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT OR REPLACE INTO sync_state (name, doc) VALUES (?, ?)",
+            (name, json.dumps({**state, "id": name})),
+        )
+
+    async def save_audit_log(self, ticket_id: str, app_id: str, action: str, details: dict) -> None:
+        """Write one audit entry."""
+        await self.save_audit_logs(app_id, [audit_doc(ticket_id, app_id, action, details)])
+        logger.info("Audit log: %s %s", action, ticket_id)
+
+    async def save_audit_logs(self, app_id: str, entries: list[dict]) -> None:
+        """Write audit entries of one app in a single transaction."""
+        await asyncio.to_thread(self._transaction, [(_UPSERT_AUDIT, _audit_row(entry)) for entry in entries])
+
+    async def list_audit_entries(self, ticket_id: str, app_id: str) -> list[dict]:
+        """Return a ticket's audit entries, oldest first."""
+        rows = await asyncio.to_thread(
+            self._execute,
+            f"SELECT {_document_column(_AUDIT_ENTRY_FIELDS)} AS doc FROM audit_log "
+            "WHERE app_id = ? AND ticket_id = ? ORDER BY timestamp ASC",
+            (app_id, ticket_id),
+        )
+        return [json.loads(row["doc"]) for row in rows]
+
+    async def reserve_idempotency_key(self, key: str, fingerprint: str, ttl_seconds: int) -> dict | None:
+        """Reserve an idempotency key.
+
+        Returns None if this caller now owns the key, or the existing record
+        (pending or completed) if another request got there first.
+        """
+        now = time.time()
+        doc = {"id": key, "fingerprint": fingerprint, "state": "pending", "ttl": ttl_seconds}
+        _, inserted = await asyncio.to_thread(
+            self._transaction,
+            [
+                ("DELETE FROM idempotency WHERE key = ? AND expires_at <= ?", (key, now)),
+                (
+                    "INSERT OR IGNORE INTO idempotency (key, doc, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(doc), now + ttl_seconds),
+                ),
+            ],
+        )
+        if inserted:
+            return None
+        return await self.get_idempotency_record(key) or {"state": "pending", "fingerprint": fingerprint}
+
+    async def complete_idempotency_key(self, key: str, record: dict, ttl_seconds: int) -> None:
+        """Store the completed response for an idempotency key."""
+        doc = {**record, "id": key, "state": "completed", "ttl": ttl_seconds}
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT OR REPLACE INTO idempotency (key, doc, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(doc), time.time() + ttl_seconds),
+        )
+
+    async def get_idempotency_record(self, key: str) -> dict | None:
+        """Read an unexpired idempotency record, or None."""
+        rows = await asyncio.to_thread(
+            self._execute, "SELECT doc FROM idempotency WHERE key = ? AND expires_at > ?", (key, time.time())
+        )
+        return json.loads(rows[0]["doc"]) if rows else None
+
+    async def release_idempotency_key(self, key: str) -> None:
+        """Drop a pending reservation so the request can be retried."""
+        await asyncio.to_thread(self._execute, "DELETE FROM idempotency WHERE key = ?", (key,))
+
+    async def close(self) -> None:
+        """Close the SQLite connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,106 @@
+"""
+Status update coalescer — turns bursts of work item events into one write.
+
+Azure DevOps sends a ``workitem.updated`` service hook for every save, so
+triaging a ticket can produce a handful of events within seconds.
+``StatusUpdateCoalescer`` keeps only the newest state per work item and
+flushes after ``window_seconds``: however many events arrive for an item in
+a window, its tickets get at most one patch.
+
+Patches are not skipped when a ticket seems to already have the status: the
+status sync and other workers also write statuses, so only Cosmos DB knows
+the current one, and writing the same status again is harmless.
+"""
+
+import asyncio
+import logging
+from collections.abc import Callable
+from typing import NamedTuple
+
+from api.metrics import registry
+from api.services.status_sync import CLOSED_STATUSES
+from api.services.ticket_store import TicketStore
+from api.services.work_item_index import WorkItemTicketIndex
+
+logger = logging.getLogger("acidni-support.services.status_coalescer")
+
+_events = registry.counter("status_hook_events_total", "Work item status events received")
+_writes = registry.counter("status_hook_tickets_patched_total", "Tickets patched from status events")
+_flush_size = registry.histogram("status_hook_flush_items", "Work items per coalesced flush",
+                                 buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500))
+
+
+class StatusUpdate(NamedTuple):
+    status: str
+    rev: int
+    changed_at: str
+
+
+class StatusUpdateCoalescer:
+    """Coalesce per-work-item status updates and apply them in batches."""
+
+    def __init__(
+        self,
+        cosmos: TicketStore,
+        index: WorkItemTicketIndex,
+        window_seconds: float = 2.0,
+        on_closed: Callable[[int], None] | None = None,
+    ) -> None:
+        self._cosmos = cosmos
+        self._index = index
+        self._window = window_seconds
+        self._on_closed = on_closed
+        self._pending: dict[int, StatusUpdate] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._inflight: set[asyncio.Task] = set()
+
+    def submit(self, work_item_id: int, status: str, rev: int, changed_at: str) -> None:
+        """Queue a status; an older revision than one already queued is ignored."""
+        _events.inc()
+        current = self._pending.get(work_item_id)
+        if current is None or rev >= current.rev:
+            self._pending[work_item_id] = StatusUpdate(status, rev, changed_at)
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self._window, self._start_flush)
+
+    def _start_flush(self) -> None:
+        self._timer = None
+        task = asyncio.create_task(self.flush())
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def flush(self) -> int:
+        """Apply everything queued so far.  Returns the number of tickets patched."""
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        _flush_size.observe(len(pending))
+        try:
+            refs = await self._index.lookup(list(pending))
+        except Exception:
+            logger.exception("Failed to look up tickets for %d work items", len(pending))
+            return 0
+
+        by_partition: dict[str, list[tuple[str, str, str]]] = {}
+        for work_item_id, update in pending.items():
+            for ref in refs.get(work_item_id, []):
+                by_partition.setdefault(ref.app_id, []).append((ref.ticket_id, update.status, update.changed_at))
+            if self._on_closed is not None and update.status in CLOSED_STATUSES:
+                self._on_closed(work_item_id)
+
+        patched = 0
+        for app_id, updates in by_partition.items():
+            try:
+                patched += await self._cosmos.patch_ticket_statuses(app_id, updates)
+            except Exception:
+                logger.exception("Failed to patch %d ticket statuses in %s", len(updates), app_id)
+        _writes.inc(patched)
+        return patched
+
+    async def stop(self) -> None:
+        """Flush whatever is queued and wait for in-flight flushes."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await asyncio.gather(*self._inflight, return_exceptions=True)
+        await self.flush()
@@ -0,0 +1,176 @@
+"""
+Status synchronizer — mirrors Azure DevOps work item state onto tickets.
+
+Tickets are stored with ``status="created"`` and never updated by the
+submit path.  ``StatusSynchronizer`` runs in the background and, on every
+pass:
+
+1. runs a WIQL query for ``support-widget`` work items whose
+   ``System.ChangedDate`` is at or after the stored watermark;
+2. reads the changed items through ``workitemsbatch`` in chunks of 200;
+3. looks up the tickets linked to those work items and patches ``status``
+   and ``updated_at`` on the ones whose status actually changed, batched per
+   partition;
+4. advances the watermark to the newest ``ChangedDate`` it processed.
+
+Each pass costs in proportion to the number of changed work items, not the
+number of tickets.  The query window overlaps the previous pass by
+``overlap_seconds`` so clock skew and same-second changes are not missed;
+re-reading an unchanged item is harmless because its ticket is not patched.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+
+from api.metrics import registry
+from api.services.devops_client import DevOpsClient
+from api.services.ticket_store import TicketStore
+
+logger = logging.getLogger("acidni-support.services.status_sync")
+
+_changes = registry.counter("status_sync_work_items_total", "Changed work items read by the status sync")
+_patched = registry.counter("status_sync_tickets_patched_total", "Tickets whose status was updated")
+_duration = registry.histogram("status_sync_seconds", "Duration of one status sync pass")
+
+SYNC_STATE_NAME = "devops-status"
+SUPPORT_TAG = "support-widget"
+_FIELDS = ["System.Id", "System.State", "System.ChangedDate"]
+
+# DevOps work item states (Agile, Scrum, Basic and CMMI processes) → ticket status
+STATE_STATUS_MAP = {
+    "new": "created",
+    "to do": "created",
+    "proposed": "created",
+    "approved": "triaged",
+    "committed": "in_progress",
+    "active": "in_progress",
+    "doing": "in_progress",
+    "in progress": "in_progress",
+    "resolved": "resolved",
+    "done": "closed",
+    "closed": "closed",
+    "removed": "closed",
+}
+
+CLOSED_STATUSES = {"resolved", "closed"}
+
+
+def ticket_status(state: str) -> str:
+    """Map a DevOps ``System.State`` to a ticket status (custom states pass through)."""
+    return STATE_STATUS_MAP.get(state.casefold(), state.casefold().replace(" ", "_"))
+
+
+def _format_wiql_date(value: datetime) -> str:
+    return value.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+class StatusSynchronizer:
+    """Incremental DevOps → Cosmos DB ticket status sync."""
+
+    def __init__(
+        self,
+        devops: DevOpsClient,
+        cosmos: TicketStore,
+        *,
+        interval_seconds: float = 60.0,
+        overlap_seconds: float = 120.0,
+        initial_lookback_hours: float = 168.0,
+        on_closed: Callable[[int], None] | None = None,
+    ) -> None:
+        self._devops = devops
+        self._cosmos = cosmos
+        self._interval = interval_seconds
+        self._overlap = timedelta(seconds=overlap_seconds)
+        self._initial_lookback = timedelta(hours=initial_lookback_hours)
+        self._on_closed = on_closed
+        self._task: asyncio.Task | None = None
+
+    async def _load_watermark(self) -> datetime:
+        state = await self._cosmos.get_sync_state(SYNC_STATE_NAME)
+        if state and state.get("watermark"):
+            return datetime.fromisoformat(state["watermark"].replace("Z", "+00:00"))
+        return datetime.now(UTC) - self._initial_lookback
+
+    async def _read_changes(self, ids: list[int]) -> dict[int, tuple[str, datetime]]:
+        """Read ``(state, changed_date)`` for every ID, 200 per call."""
+        size = DevOpsClient.MAX_READ_BATCH_SIZE
+        chunks = await asyncio.gather(
+            *(self._devops.get_work_items(ids[i:i + size], _FIELDS) for i in range(0, len(ids), size))
+        )
+        changes: dict[int, tuple[str, datetime]] = {}
+        for chunk in chunks:
+            for item in chunk:
+                fields = item.get("fields", {})
+                changed = datetime.fromisoformat(fields["System.ChangedDate"].replace("Z", "+00:00"))
+                changes[item["id"]] = (fields.get("System.State", ""), changed)
+        return changes
+
+    async def sync_once(self) -> int:
+        """Run one sync pass.  Returns the number of tickets patched."""
+        started = time.monotonic()
+        watermark = await self._load_watermark()
+        since = watermark - self._overlap
+        wiql = (
+            "SELECT [System.Id] FROM WorkItems "
+            f"WHERE [System.Tags] CONTAINS '{SUPPORT_TAG}' "
+            f"AND [System.ChangedDate] >= '{_format_wiql_date(since)}' "
+            "ORDER BY [System.ChangedDate] ASC"
+        )
+        ids = await self._devops.query_work_item_ids(wiql)
+        if not ids:
+            _duration.observe(time.monotonic() - started)
+            return 0
+
+        changes = await self._read_changes(ids)
+        _changes.inc(len(changes))
+
+        by_partition: dict[str, list[tuple[str, str, str]]] = {}
+        for ticket in await self._cosmos.find_tickets_by_work_items(list(changes)):
+            state, changed = changes[ticket["work_item_id"]]
+            status = ticket_status(state)
+            if status != ticket.get("status"):
+                by_partition.setdefault(ticket["app_id"], []).append(
+                    (ticket["id"], status, changed.isoformat().replace("+00:00", "Z"))
+                )
+
+        patched = 0
+        for app_id, updates in by_partition.items():
+            patched += await self._cosmos.patch_ticket_statuses(app_id, updates)
+        _patched.inc(patched)
+
+        if self._on_closed is not None:
+            for work_item_id, (state, _) in changes.items():
+                if ticket_status(state) in CLOSED_STATUSES:
+                    self._on_closed(work_item_id)
+
+        newest = max(changed for _, changed in changes.values())
+        if newest > watermark:
+            await self._cosmos.save_sync_state(
+                SYNC_STATE_NAME, {"watermark": newest.isoformat().replace("+00:00", "Z")}
+            )
+        _duration.observe(time.monotonic() - started)
+        logger.info("Status sync: %d changed work items, %d tickets updated", len(changes), patched)
+        return patched
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sync_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Status sync pass failed")
+            await asyncio.sleep(self._interval)
+
+    async def start(self) -> None:
+        """Start syncing in the background."""
+        self._task = asyncio.create_task(self._run(), name="devops-status-sync")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -0,0 +1,266 @@
+"""
+Submission service — the submit pipeline shared by the HTTP route and the outbox workers.
+
+Looks up the submission plan for the request's app and category, creates the
+work item, and stores the ticket document in Cosmos DB.
+"""
+
+import logging
+from collections.abc import Awaitable, Callable
+from contextlib import AbstractAsyncContextManager, nullcontext
+from typing import Any
+
+from api.models import SupportSubmitRequest, SupportSubmitResponse, TicketDocument
+from api.services.audit_writer import AuditLogWriter
+from api.services.description_renderer import escape, render_description
+from api.services.devops_batcher import WorkItemBatcher
+from api.services.devops_client import DevOpsClient
+from api.services.devops_metadata import DevOpsMetadataCache
+from api.services.duplicate_index import NearDuplicateIndex, ticket_fingerprint
+from api.services.priority_scheduler import PriorityScheduler, lane_for
+from api.services.routing_service import RoutingService, SubmissionPlan
+from api.services.ticket_store import TicketIdConflictError, TicketStore
+from api.services.work_item_index import WorkItemTicketIndex
+
+logger = logging.getLogger("acidni-support.services.submission")
+
+# Saves tried per ticket before a ticket ID conflict is given up on
+_MAX_TICKET_ID_ATTEMPTS = 3
+
+class UnknownAppError(LookupError):
+    """Raised when an app_id has no route and no ``_default`` route exists."""
+
+
+class SubmissionService:
+    """Run a validated support request through routing, DevOps and Cosmos DB."""
+
+    def __init__(
+        self,
+        routing: RoutingService,
+        devops: DevOpsClient | WorkItemBatcher,
+        cosmos: TicketStore,
+        duplicates: NearDuplicateIndex | None = None,
+        scheduler: PriorityScheduler | None = None,
+        metadata: DevOpsMetadataCache | None = None,
+        work_items: WorkItemTicketIndex | None = None,
+        audit: bool = False,
+        audit_log: AuditLogWriter | None = None,
+        new_ticket_id: Callable[[], str] | None = None,
+    ) -> None:
+        self._routing = routing
+        self._devops = devops
+        self._cosmos = cosmos
+        self._duplicates = duplicates
+        self._scheduler = scheduler
+        self._metadata = metadata
+        self._work_items = work_items
+        self._audit = audit
+        self._audit_log = audit_log
+        self._new_ticket_id = new_ticket_id
+
+    def _devops_slot(self, request: SupportSubmitRequest) -> AbstractAsyncContextManager[None]:
+        """Hold a DevOps call slot in the request's priority lane (if scheduling is on)."""
+        if self._scheduler is None:
+            return nullcontext()
+        return self._scheduler.slot(lane_for(request))
+
+    def forget_work_item(self, work_item_id: int) -> None:
+        """Stop offering a (closed) work item as a near-duplicate target."""
+        if self._duplicates is not None:
+            self._duplicates.discard_work_item(work_item_id)
+
+    def resolve_plan(self, request: SupportSubmitRequest) -> SubmissionPlan:
+        """Return the submission plan for a request, falling back to ``_default``.
+
+        With a metadata cache, stale area paths and work item types are
+        corrected here rather than rejected by DevOps.
+        """
+        plan = self._routing.plan(request.app_id, request.category)
+        if plan is None:
+            raise UnknownAppError(f"Unknown app_id: {request.app_id}. No routing configured.")
+        if self._metadata is not None:
+            plan = self._metadata.validate(plan)
+        return plan
+
+    async def create_work_item(self, request: SupportSubmitRequest, plan: SubmissionPlan) -> dict[str, Any]:
+        """Create the DevOps work item for a request.
+
+        Returns the dict produced by ``DevOpsClient.create_work_item``.
+        """
+        description = render_description(request, plan.project)
+        async with self._devops_slot(request):
+            return await self._devops.create_work_item(
+                project=plan.project,
+                work_item_type=plan.work_item_type,
+                title=f"{plan.title_prefix} {request.subject}",
+                description=description,
+                area_path=plan.area_path,
+                priority=request.priority,
+                tags=plan.tags,
+            )
+
+    async def create_or_link_work_item(
+        self,
+        request: SupportSubmitRequest,
+        plan: SubmissionPlan,
+        ticket_id: str,
+    ) -> tuple[dict[str, Any], bool]:
+        """Create the work item, or comment on an open near-duplicate instead.
+
+        Returns ``(work_item, linked)`` where ``linked`` is True when the
+        request was attached to an existing work item.
+        """
+        if self._duplicates is None:
+            return await self.create_work_item(request, plan), False
+
+        fingerprint = ticket_fingerprint(request.subject, request.description)
+        match = self._duplicates.find(request.app_id, fingerprint)
+        if match is not None:
+            work_item = match.work_item
+            comment = (
+                f"<p><b>Another customer reported this issue</b> (ticket {ticket_id}).</p>"
+                f"<h4>{escape(request.subject)}</h4>"
+                f"{render_description(request, plan.project)}"
+            )
+            try:
+                async with self._devops_slot(request):
+                    await self._devops.add_comment(work_item["project"], work_item["id"], comment)
+            except Exception:
+                logger.exception(
+                    "Failed to comment on duplicate work item #%s — creating a new one",
+                    work_item["id"],
+                )
+            else:
+                logger.info(
+                    "Linked %s to open work item #%s (distance %d)",
+                    ticket_id,
+                    work_item["id"],
+                    match.distance,
+                )
+                return work_item, True
+
+        work_item = await self.create_work_item(request, plan)
+        self._duplicates.add(
+            request.app_id,
+            fingerprint,
+            ticket_id,
+            {**work_item, "project": work_item.get("project", plan.project)},
+        )
+        return work_item, False
+
+    async def save_ticket(
+        self,
+        ticket_id: str,
+        request: SupportSubmitRequest,
+        plan: SubmissionPlan,
+        work_item: dict[str, Any],
+    ) -> None:
+        """Store the ticket document (and, if auditing, its ``created`` entry) in Cosmos DB."""
+        ticket = TicketDocument(
+            id=ticket_id,
+            app_id=request.app_id,
+            category=request.category,
+            subject=request.subject,
+            description=request.description,
+            priority=request.priority,
+            user_email=request.user_email,
+            user_name=request.user_name,
+            context=request.context,
+            license_info=request.license_info,
+            devops={
+                "org": "acidni",
+                "project": plan.project,
+                "work_item_id": work_item["id"],
+                "work_item_url": work_item["url"],
+                "work_item_type": work_item.get("type", plan.work_item_type),
+            },
+        )
+        if self._audit:
+            await self._cosmos.save_ticket_with_audit(
+                ticket,
+                details={
+                    "project": plan.project,
+                    "work_item_id": work_item["id"],
+                    "category": request.category.value,
+                    "priority": request.priority,
+                },
+            )
+        else:
+            await self._cosmos.save_ticket(ticket)
+        if self._work_items is not None:
+            self._work_items.add(work_item["id"], ticket_id, request.app_id)
+
+    async def store_ticket(
+        self,
+        ticket_id: str,
+        request: SupportSubmitRequest,
+        plan: SubmissionPlan,
+        work_item: dict[str, Any],
+        reassigned: Callable[[str], Awaitable[None]] | None = None,
+    ) -> str:
+        """Save the ticket, moving it to a new ID if another ticket already has ``ticket_id``.
+
+        ``reassigned`` is awaited with each new ID before the ticket is saved
+        under it.  Returns the ID the ticket was stored under; raises
+        ``TicketIdConflictError`` if no new IDs can be generated or every one
+        tried was taken.
+        """
+        attempts = 1
+        while True:
+            try:
+                await self.save_ticket(ticket_id, request, plan, work_item)
+                return ticket_id
+            except TicketIdConflictError:
+                if self._new_ticket_id is None or attempts >= _MAX_TICKET_ID_ATTEMPTS:
+                    raise
+            attempts += 1
+            new_id = self._new_ticket_id()
+            logger.warning("Ticket ID %s belongs to another ticket; storing this one as %s", ticket_id, new_id)
+            if reassigned is not None:
+                await reassigned(new_id)
+            ticket_id = new_id
+
+    async def submit(self, request: SupportSubmitRequest, ticket_id: str) -> SupportSubmitResponse:
+        """Run the full synchronous pipeline for a request.
+
+        Raises ``UnknownAppError`` if the app cannot be routed; DevOps errors
+        propagate.  A Cosmos DB failure is logged but does not fail the
+        submission because the work item already exists.  If ``ticket_id``
+        is taken the ticket is stored, and reported, under a new ID.
+        """
+        plan = self.resolve_plan(request)
+        work_item, linked = await self.create_or_link_work_item(request, plan, ticket_id)
+
+        try:
+            ticket_id = await self.store_ticket(ticket_id, request, plan, work_item)
+        except TicketIdConflictError:
+            raise  # never answer with another customer's ticket ID
+        except Exception:
+            logger.exception("Failed to save ticket %s to Cosmos DB", ticket_id)
+            # Don't fail — work item was already created in DevOps
+
+        logger.info(
+            "Support ticket created: %s → %s #%s",
+            ticket_id,
+            plan.project,
+            work_item["id"],
+        )
+
+        if linked:
+            if self._audit_log is not None:
+                self._audit_log.log(ticket_id, request.app_id, "linked", {"work_item_id": work_item["id"]})
+            return SupportSubmitResponse(
+                ticket_id=ticket_id,
+                devops_work_item_id=work_item["id"],
+                devops_work_item_url=work_item["url"],
+                status="linked",
+                message="We're already working on this issue — your report has been added to the existing ticket.",
+            )
+
+        return SupportSubmitResponse(
+            ticket_id=ticket_id,
+            devops_work_item_id=work_item["id"],
+            devops_work_item_url=work_item["url"],
+            status="created",
+            message="Your support request has been submitted. We'll review it shortly.",
+        )
@@ -0,0 +1,101 @@
+"""
+Read-through cache of ticket documents.
+
+Keyed by ``(app_id, ticket_id)`` — the partition key and id of a Cosmos DB
+point read.  ``CosmosService`` fills it on reads and writes through on
+``save_ticket`` and status patches, so a replica sees its own writes
+immediately; other replicas see them within ``ttl_seconds``.
+
+Concurrent misses for the same ticket share one point read, and a ticket
+that does not exist is remembered for ``negative_ttl_seconds`` so retries
+against a not-yet-created ticket do not each cost a read.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from api.metrics import registry
+from api.services.ttl_cache import LruTtlCache
+
+_lookups = registry.counter("ticket_cache_lookups_total", "Ticket cache lookups by result")
+_ru_saved = registry.counter("ticket_cache_ru_saved_total", "Request units not spent thanks to cache hits")
+
+# Loads a ticket and reports the request charge of the read: (document or None, RU)
+Loader = Callable[[], Awaitable[tuple[dict | None, float]]]
+
+_NOT_FOUND = object()
+
+
+def _hit_ratio() -> float:
+    hits = _lookups.value(result="hit") + _lookups.value(result="negative_hit") + _lookups.value(result="coalesced")
+    total = hits + _lookups.value(result="miss")
+    return hits / total if total else 0.0
+
+
+registry.gauge("ticket_cache_hit_ratio", "Share of ticket lookups served without a Cosmos read", callback=_hit_ratio)
+
+
+class TicketCache:
+    """LRU + TTL cache of ticket documents with single-flight loads."""
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 60,
+        negative_ttl_seconds: float = 10,
+    ) -> None:
+        self._entries = LruTtlCache(max_entries, ttl_seconds)
+        self._negative_ttl = negative_ttl_seconds
+        self._inflight: dict[tuple[str, str], asyncio.Future] = {}
+
+    def put(self, ticket: dict, charge: float = 1.0) -> None:
+        """Store a ticket document (write-through).
+
+        ``charge`` is what a point read of it would cost; about 1 RU for a
+        ticket-sized document.  A load already in flight for the ticket no
+        longer updates the cache, so it cannot overwrite this newer copy.
+        """
+        key = (ticket["app_id"], ticket["id"])
+        self._entries.set(key, (ticket, charge))
+        self._inflight.pop(key, None)
+
+    async def get(self, app_id: str, ticket_id: str, load: Loader) -> dict | None:
+        """Return the cached ticket, or run ``load`` once for all concurrent callers."""
+        key = (app_id, ticket_id)
+        entry = self._entries.get(key)
+        if entry is not None:
+            ticket, charge = entry
+            _lookups.inc(result="negative_hit" if ticket is _NOT_FOUND else "hit")
+            _ru_saved.inc(charge)
+            return None if ticket is _NOT_FOUND else ticket
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            _lookups.inc(result="coalesced")
+            ticket, charge = await asyncio.shield(inflight)
+            _ru_saved.inc(charge)
+            return ticket
+
+        _lookups.inc(result="miss")
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            ticket, charge = await load()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        else:
+            if self._inflight.get(key) is future:
+                if ticket is None:
+                    self._entries.set(key, (_NOT_FOUND, charge), self._negative_ttl)
+                else:
+                    self._entries.set(key, (ticket, charge))
+            future.set_result((ticket, charge))
+            return ticket
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
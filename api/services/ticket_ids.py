@@ -0,0 +1,155 @@
+"""
+Ticket ID generator — collision-free, time-sortable support ticket IDs.
+
+IDs keep the human-readable date/time prefix and end in twelve Crockford
+base32 characters::
+
+    SUP-20250314-0915-1C7Z4M0G2K5R
+        └──────┘ └──┘ └──────────┘
+          date   HHMM  ms-in-minute (16 bits) | worker (30 bits) | sequence (14 bits)
+
+The worker ID is the replica ID (25 bits) followed by a worker slot (5
+bits).  Each worker process of a replica leases its own slot by locking a
+file in a directory the replica's workers share, so uvicorn workers started
+from the same configuration never share an ID.
+
+Every field is fixed-width and most-significant first, so IDs sort
+lexicographically in creation order (to the millisecond, then by worker).
+The sequence allows 16,384 IDs per millisecond per worker; if it runs out,
+or the wall clock steps backwards, the generator borrows the next
+millisecond so IDs stay strictly increasing.
+
+``next_id`` never awaits, so under asyncio it runs to completion without a
+lock.  Two workers only collide if they share a worker ID.  Replicas of a
+Container App share one configuration and no disk, so unless
+``TICKET_REPLICA_ID`` is set each process draws a random replica ID: among
+ten replicas the chance that any two draw the same one is below one in a
+million.  Ticket stores create tickets rather than upsert them, so a
+collision fails the save instead of overwriting a ticket, and the
+submission is then stored under a fresh ID.
+"""
+
+import logging
+import os
+import secrets
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger("acidni-support.services.ticket_ids")
+
+CROCKFORD_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+WORKER_BITS = 30
+SEQUENCE_BITS = 14
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+SLOT_BITS = 5
+REPLICA_BITS = WORKER_BITS - SLOT_BITS
+MAX_REPLICA_ID = (1 << REPLICA_BITS) - 1
+MAX_WORKER_SLOT = (1 << SLOT_BITS) - 1
+_MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+_SUFFIX_CHARS = 12  # 60 bits: 16 (ms in minute) + 30 + 14
+
+# Lock file descriptors of the slots this process holds; the OS releases them on exit
+_slot_leases: dict[Path, int] = {}
+
+
+def default_replica_id() -> int:
+    """Draw a random replica ID for a process whose replica has none configured."""
+    return secrets.randbits(REPLICA_BITS)
+
+
+def claim_worker_slot(lease_dir: str | Path) -> int:
+    """Lease the lowest free worker slot in ``lease_dir`` for the life of the process.
+
+    Each slot is a lock file held with an exclusive ``flock``, which the OS
+    drops when the process exits, so a restarted worker can take it again.
+    Raises ``RuntimeError`` if every slot is taken.
+    """
+    lease_dir = Path(lease_dir)
+    if fcntl is None:
+        logger.warning("File locks unavailable; deriving the ticket worker slot from the process ID")
+        return os.getpid() & MAX_WORKER_SLOT
+    lease_dir.mkdir(parents=True, exist_ok=True)
+    for slot in range(MAX_WORKER_SLOT + 1):
+        path = lease_dir / f"slot-{slot}.lock"
+        if path in _slot_leases:
+            continue
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            continue
+        _slot_leases[path] = fd
+        return slot
+    raise RuntimeError(f"All {MAX_WORKER_SLOT + 1} ticket worker slots in {lease_dir} are taken")
+
+
+def claim_worker_id(replica_id: int | None, lease_dir: str | Path) -> int:
+    """Worker ID for this process: ``replica_id`` plus a slot leased in ``lease_dir``."""
+    if replica_id is None:
+        replica_id = default_replica_id()
+    if not 0 <= replica_id <= MAX_REPLICA_ID:
+        raise ValueError(f"replica_id must be between 0 and {MAX_REPLICA_ID}")
+    worker_id = (replica_id << SLOT_BITS) | claim_worker_slot(lease_dir)
+    logger.info("Ticket IDs use worker %d (replica %d)", worker_id, replica_id)
+    return worker_id
+
+
+def _encode(value: int) -> str:
+    chars = []
+    for _ in range(_SUFFIX_CHARS):
+        chars.append(CROCKFORD_ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+class TicketIdGenerator:
+    """Monotonic ``SUP-YYYYMMDD-HHMM-XXXXXXXXXXXX`` generator for one worker."""
+
+    def __init__(
+        self,
+        worker_id: int,
+        prefix: str = "SUP",
+        clock_ms: Callable[[], int] = lambda: time.time_ns() // 1_000_000,
+    ) -> None:
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"worker_id must be between 0 and {MAX_WORKER_ID}")
+        self.worker_id = worker_id
+        self._prefix = prefix
+        self._clock_ms = clock_ms
+        self._last_ms = -1
+        self._sequence = 0
+        # Cache of the formatted "SUP-YYYYMMDD-HHMM-" prefix for the current minute
+        self._minute = -1
+        self._minute_prefix = ""
+
+    def next_id(self) -> str:
+        """Return the next ticket ID."""
+        now_ms = self._clock_ms()
+        if now_ms > self._last_ms:
+            self._last_ms = now_ms
+            self._sequence = 0
+        else:
+            # Same millisecond or clock went backwards — stay on the logical clock
+            self._sequence += 1
+            if self._sequence > _MAX_SEQUENCE:
+                self._last_ms += 1
+                self._sequence = 0
+        ms = self._last_ms
+
+        minute, ms_in_minute = divmod(ms, 60_000)
+        if minute != self._minute:
+            stamp = datetime.fromtimestamp(minute * 60, tz=UTC)
+            self._minute = minute
+            self._minute_prefix = f"{self._prefix}-{stamp:%Y%m%d}-{stamp:%H%M}-"
+
+        suffix = (ms_in_minute << (WORKER_BITS + SEQUENCE_BITS)) | (self.worker_id << SEQUENCE_BITS) | self._sequence
+        return self._minute_prefix + _encode(suffix)
@@ -0,0 +1,108 @@
+"""
+Ticket store — the storage interface behind tickets, audit entries, sync
+checkpoints and idempotency records.
+
+``CosmosService`` is the production implementation.  ``SqliteTicketStore``
+keeps everything in one local SQLite file, so local development, tests and
+throughput benchmarks of the full submit/list path need neither mocks nor a
+Cosmos DB account.  ``Settings.ticket_store`` picks the backend.
+
+Both create tickets instead of upserting them: saving a ticket under an ID
+that another ticket already has raises ``TicketIdConflictError`` rather
+than overwriting it, while a retried save of the same ticket succeeds.
+"""
+
+from collections.abc import AsyncIterator, Sequence
+from typing import TYPE_CHECKING, Protocol
+
+from api.models import TicketDocument
+
+if TYPE_CHECKING:
+    from api.config import Settings
+    from api.services.cosmos_service import TicketPage
+
+
+# Fields that tell a retried save of a ticket from a different ticket with the same ID
+_SUBMISSION_FIELDS = ("app_id", "subject", "description", "user_email")
+
+
+class TicketIdConflictError(Exception):
+    """A different ticket is already stored under this ticket's ID."""
+
+
+def is_same_submission(stored: dict, doc: dict) -> bool:
+    """Whether ``stored`` is ``doc`` saved earlier, i.e. the new save is a retry."""
+    work_item = (doc.get("devops") or {}).get("work_item_id")
+    return (stored.get("devops") or {}).get("work_item_id") == work_item and all(
+        stored.get(field) == doc.get(field) for field in _SUBMISSION_FIELDS
+    )
+
+
+class TicketStore(Protocol):
+    """Operations the API and background services need from ticket storage."""
+
+    async def save_ticket(self, ticket: TicketDocument) -> dict: ...
+
+    async def save_ticket_with_audit(self, ticket: TicketDocument, details: dict) -> dict: ...
+
+    async def index_ticket_emails(self, tickets: list[dict]) -> int: ...
+
+    async def get_ticket(self, ticket_id: str, app_id: str) -> dict | None: ...
+
+    async def list_tickets(
+        self,
+        app_id: str | None = None,
+        user_email: str | None = None,
+        limit: int = 50,
+        continuation: str | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> "TicketPage": ...
+
+    async def list_tickets_by_email(
+        self,
+        user_email: str,
+        app_id: str | None = None,
+        limit: int = 50,
+        continuation: str | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> "TicketPage": ...
+
+    def scan_tickets(self, page_size: int = 100, continuation: str | None = None) -> AsyncIterator["TicketPage"]: ...
+
+    async def find_tickets_by_work_items(self, work_item_ids: list[int]) -> list[dict]: ...
+
+    async def patch_ticket_statuses(self, app_id: str, updates: list[tuple[str, str, str]]) -> int: ...
+
+    async def get_sync_state(self, name: str) -> dict | None: ...
+
+    async def save_sync_state(self, name: str, state: dict) -> None: ...
+
+    async def save_audit_log(self, ticket_id: str, app_id: str, action: str, details: dict) -> None: ...
+
+    async def save_audit_logs(self, app_id: str, entries: list[dict]) -> None: ...
+
+    async def list_audit_entries(self, ticket_id: str, app_id: str) -> list[dict]: ...
+
+    async def reserve_idempotency_key(self, key: str, fingerprint: str, ttl_seconds: int) -> dict | None: ...
+
+    async def complete_idempotency_key(self, key: str, record: dict, ttl_seconds: int) -> None: ...
+
+    async def get_idempotency_record(self, key: str) -> dict | None: ...
+
+    async def release_idempotency_key(self, key: str) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+def create_ticket_store(settings: "Settings") -> TicketStore:
+    """Build the ticket store selected by ``settings.ticket_store``."""
+    if settings.ticket_store == "sqlite":
+        from api.services.sqlite_store import SqliteTicketStore
+
+        return SqliteTicketStore(settings.ticket_store_path)
+    if settings.ticket_store != "cosmos":
+        raise ValueError(f"Unknown ticket_store {settings.ticket_store!r} (expected 'cosmos' or 'sqlite')")
+
+    from api.services.cosmos_service import CosmosService
+
+    return CosmosService()
@@ -0,0 +1,69 @@
+"""
+Work item → ticket index.
+
+Maps DevOps work item IDs back to the tickets linked to them (several
+tickets can share one work item when near-duplicates are linked).  Entries
+are added as tickets are saved and, on a miss, loaded from Cosmos DB with a
+single ``ARRAY_CONTAINS`` query for all missing IDs.  Work items with no
+ticket (created outside the widget) are cached as empty for a short while
+so repeated hook events for them do not query Cosmos each time.
+
+Only where a ticket lives is cached, never its status: statuses are written
+by several paths and processes, so a cached one would go stale.
+"""
+
+import logging
+from typing import NamedTuple
+
+from api.services.ticket_store import TicketStore
+from api.services.ttl_cache import LruTtlCache
+
+logger = logging.getLogger("acidni-support.services.work_item_index")
+
+
+class TicketRef(NamedTuple):
+    """Where a ticket lives."""
+
+    ticket_id: str
+    app_id: str
+
+
+class WorkItemTicketIndex:
+    """LRU + TTL cache of work item ID → linked tickets, backed by Cosmos DB."""
+
+    def __init__(
+        self,
+        cosmos: TicketStore,
+        max_entries: int = 50_000,
+        ttl_seconds: float = 86_400,
+        negative_ttl_seconds: float = 300,
+    ) -> None:
+        self._cosmos = cosmos
+        self._cache = LruTtlCache(max_entries, ttl_seconds)
+        self._negative_ttl = negative_ttl_seconds
+
+    def add(self, work_item_id: int, ticket_id: str, app_id: str) -> None:
+        """Record a ticket linked to a work item."""
+        refs = [ref for ref in self._cache.get(work_item_id, []) if ref.ticket_id != ticket_id]
+        refs.append(TicketRef(ticket_id, app_id))
+        self._cache.set(work_item_id, refs)
+
+    async def lookup(self, work_item_ids: list[int]) -> dict[int, list[TicketRef]]:
+        """Return the tickets linked to each work item (empty list if none)."""
+        found: dict[int, list[TicketRef]] = {}
+        missing: list[int] = []
+        for work_item_id in work_item_ids:
+            refs = self._cache.get(work_item_id)
+            if refs is None:
+                missing.append(work_item_id)
+            else:
+                found[work_item_id] = refs
+
+        if missing:
+            loaded: dict[int, list[TicketRef]] = {work_item_id: [] for work_item_id in missing}
+            for ticket in await self._cosmos.find_tickets_by_work_items(missing):
+                loaded[ticket["work_item_id"]].append(TicketRef(ticket["id"], ticket["app_id"]))
+            for work_item_id, refs in loaded.items():
+                self._cache.set(work_item_id, refs, None if refs else self._negative_ttl)
+            found.update(loaded)
+        return found
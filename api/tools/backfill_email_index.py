@@ -0,0 +1,65 @@
+"""
+Backfill the ``tickets_by_email`` index from the tickets container.
+
+Scans every ticket that has an email (cross-partition, page by page) and
+upserts its summary into the email-partitioned index.  Upserts are
+idempotent, so the command is safe to re-run; progress is checkpointed in
+the ``sync_state`` container after every page and a rerun resumes from the
+last checkpoint unless ``--restart`` is given.
+
+    python -m api.tools.backfill_email_index --page-size 200
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+
+from api.services.cosmos_service import CosmosService
+from api.services.ticket_store import TicketStore
+
+logger = logging.getLogger("acidni-support.tools.backfill_email_index")
+
+CHECKPOINT_NAME = "email-index-backfill"
+
+
+async def backfill(cosmos: TicketStore, page_size: int = 100, restart: bool = False) -> int:
+    """Index every ticket with an email.  Returns the number of summaries written."""
+    state = None if restart else await cosmos.get_sync_state(CHECKPOINT_NAME)
+    if state and state.get("complete"):
+        state = None
+    continuation = state.get("continuation") if state else None
+    written = int(state.get("written", 0)) if state else 0
+    if continuation:
+        logger.info("Resuming backfill after %d tickets", written)
+
+    async for page in cosmos.scan_tickets(page_size=page_size, continuation=continuation):
+        written += await cosmos.index_ticket_emails(page.items)
+        await cosmos.save_sync_state(CHECKPOINT_NAME, {"continuation": page.continuation, "written": written})
+        logger.info("Indexed %d tickets", written)
+
+    await cosmos.save_sync_state(CHECKPOINT_NAME, {"continuation": None, "written": written, "complete": True})
+    return written
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--restart", action="store_true", help="ignore the stored checkpoint and scan from the start")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        stream=sys.stdout,
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s [%(name)s] %(message)s",
+    )
+    cosmos = CosmosService()
+    try:
+        written = await backfill(cosmos, page_size=args.page_size, restart=args.restart)
+    finally:
+        await cosmos.close()
+    print(f"Email index backfill complete: {written} tickets indexed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
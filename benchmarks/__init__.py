@@ -0,0 +1 @@
+"""Benchmarks for acidni-support hot paths (run with ``python -m benchmarks.<name>``)."""
@@ -0,0 +1,133 @@
+"""
+Benchmark: precompiled description renderer vs the previous inline f-string builder.
+
+Renders work item descriptions for a minimal and a fully populated request
+and reports the time per render for each implementation.  The old builder
+did not escape anything, so the difference is the price of escaping every
+user-supplied value.
+
+    python -m benchmarks.bench_description_renderer --iterations 200000
+"""
+
+import argparse
+import json
+import timeit
+from typing import Any
+
+from api.models import LicenseInfo, SubmitContext, SupportCategory, SupportSubmitRequest
+from api.services.description_renderer import render_description
+
+ROUTE = {"devops_project": "Terprint", "area_path": "Terprint\\Support"}
+
+REQUESTS = {
+    "minimal": SupportSubmitRequest(
+        app_id="APP-000001",
+        category=SupportCategory.FEEDBACK,
+        subject="Love the new dashboard",
+        description="The new dashboard layout is much easier to read.",
+    ),
+    "full": SupportSubmitRequest(
+        app_id="APP-000001",
+        category=SupportCategory.BUG,
+        subject="Reports page fails to load",
+        description="After logging in, opening Reports spins forever. It worked yesterday. " * 8,
+        user_email="pat@example.com",
+        user_name="Pat Example",
+        context=SubmitContext(
+            url="https://terprint.acidni.net/reports?range=30d&store=12",
+            browser="Chrome 131.0",
+            os="Windows 11",
+            screen_resolution="2560x1440",
+            app_version="4.2.1",
+        ),
+        license_info=LicenseInfo(
+            has_license=True,
+            plan_name="Pro",
+            status="active",
+            has_priority_support=True,
+        ),
+    ),
+}
+
+
+def legacy_build_description(request: SupportSubmitRequest, route: dict[str, Any]) -> str:
+    """The inline f-string builder this renderer replaced (no escaping)."""
+    context_html = ""
+    if request.context:
+        ctx_items = []
+        if request.context.url:
+            ctx_items.append(f"<li><b>URL:</b> {request.context.url}</li>")
+        if request.context.browser:
+            ctx_items.append(f"<li><b>Browser:</b> {request.context.browser}</li>")
+        if request.context.os:
+            ctx_items.append(f"<li><b>OS:</b> {request.context.os}</li>")
+        if request.context.app_version:
+            ctx_items.append(f"<li><b>App Version:</b> {request.context.app_version}</li>")
+        if request.context.screen_resolution:
+            ctx_items.append(f"<li><b>Resolution:</b> {request.context.screen_resolution}</li>")
+        if ctx_items:
+            context_html = f"<h3>Context</h3><ul>{''.join(ctx_items)}</ul>"
+
+    reporter_html = ""
+    if request.user_email:
+        reporter_html = f"<h3>Reported By</h3><p>{request.user_name or ''} ({request.user_email})</p>"
+
+    license_html = ""
+    if request.license_info:
+        lic = request.license_info
+        lic_items = []
+        if lic.plan_name:
+            lic_items.append(f"<li><b>Plan:</b> {lic.plan_name}</li>")
+        if lic.status:
+            lic_items.append(f"<li><b>Status:</b> {lic.status}</li>")
+        if lic.is_free_trial:
+            end = lic.free_trial_end or "N/A"
+            lic_items.append(f"<li><b>Free Trial:</b> Yes (ends {end})</li>")
+        if lic.support_plan:
+            lic_items.append(f"<li><b>Support Plan:</b> {lic.support_plan}</li>")
+        elif lic.has_priority_support:
+            lic_items.append("<li><b>Support:</b> Priority (included in plan)</li>")
+        else:
+            lic_items.append("<li><b>Support:</b> Standard</li>")
+        if lic_items:
+            license_html = f"<h3>License &amp; Support</h3><ul>{''.join(lic_items)}</ul>"
+
+    return (
+        f"<h3>{'Customer Report' if request.category == SupportCategory.BUG else 'Customer Feedback'}</h3>"
+        f"<p>{request.description}</p>"
+        f"<h3>App</h3><p>{request.app_id} (routed to {route['devops_project']})</p>"
+        f"{context_html}"
+        f"{reporter_html}"
+        f"{license_html}"
+    )
+
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    for name, request in REQUESTS.items():
+        legacy = min(
+            timeit.repeat(lambda: legacy_build_description(request, ROUTE), number=args.iterations, repeat=3)
+        )
+        renderer = min(
+            timeit.repeat(
+                lambda: render_description(request, ROUTE["devops_project"]), number=args.iterations, repeat=3
+            )
+        )
+        print(
+            json.dumps(
+                {
+                    "request": name,
+                    "legacy_us": round(legacy / args.iterations * 1e6, 3),
+                    "renderer_us": round(renderer / args.iterations * 1e6, 3),
+                    "speedup": round(legacy / renderer, 2),
+                }
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
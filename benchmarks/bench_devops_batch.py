@@ -0,0 +1,93 @@
+"""
+Benchmark: upstream Azure DevOps calls with and without $batch coalescing.
+
+Simulates an incident spike — waves of concurrent work item creates — against
+a fake DevOps endpoint with fixed latency, and reports how many upstream HTTP
+calls each strategy makes.
+
+    python -m benchmarks.bench_devops_batch --waves 20 --concurrency 50 --latency-ms 80
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from api.services.devops_batcher import WorkItemBatcher
+from api.services.devops_client import DevOpsClient
+
+
+class FakeDevOps:
+    """httpx handler that answers single and $batch creates after a fixed delay."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.calls = 0
+        self._next_id = 1
+
+    def _work_item(self) -> dict:
+        work_item_id = self._next_id
+        self._next_id += 1
+        return {"id": work_item_id, "rev": 1, "_links": {"html": {"href": f"https://dev.azure.com/x/{work_item_id}"}}}
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if "/$batch" in request.url.path:
+            items = json.loads(request.content)
+            value = [{"code": 200, "headers": {}, "body": json.dumps(self._work_item())} for _ in items]
+            return httpx.Response(200, json={"count": len(value), "value": value})
+        return httpx.Response(200, json=self._work_item())
+
+
+async def _run(label: str, make_client, waves: int, concurrency: int, latency: float) -> None:
+    fake = FakeDevOps(latency)
+    http = httpx.AsyncClient(transport=httpx.MockTransport(fake))
+    client = make_client(DevOpsClient("https://dev.azure.com/acidni", "pat", client=http))
+
+    started = time.perf_counter()
+    for _ in range(waves):
+        await asyncio.gather(*(
+            client.create_work_item(
+                project="Terprint",
+                work_item_type="Bug",
+                title=f"[Support] Page not loading #{i}",
+                description="<p>The analytics page fails to load.</p>",
+                area_path="Terprint\\Web",
+                tags="support-widget; customer-reported; terprint",
+            )
+            for i in range(concurrency)
+        ))
+    elapsed = time.perf_counter() - started
+    await client.close()
+
+    creates = waves * concurrency
+    print(
+        f"{label:<10} creates={creates:<6} upstream_calls={fake.calls:<6} "
+        f"upstream_calls/s={fake.calls / elapsed:8.1f} creates/s={creates / elapsed:8.1f} elapsed={elapsed:6.2f}s"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--waves", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    latency = args.latency_ms / 1000.0
+
+    await _run("unbatched", lambda c: c, args.waves, args.concurrency, latency)
+    await _run(
+        "batched",
+        lambda c: WorkItemBatcher(c, window_ms=args.window_ms, max_batch_size=200),
+        args.waves,
+        args.concurrency,
+        latency,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
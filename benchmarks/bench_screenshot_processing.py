@@ -0,0 +1,144 @@
+"""
+Benchmark: screenshot normalization inline on the event loop vs in a process pool.
+
+Generates a fixture set of synthetic high-DPI screenshots (or uses a directory
+of real ones), processes them concurrently both ways, and reports throughput,
+per-image latency, bytes saved, and the worst event-loop stall seen by a
+heartbeat task — the number that matters for every other request on the
+worker.
+
+    python -m benchmarks.bench_screenshot_processing --copies 4 --workers 4
+    python -m benchmarks.bench_screenshot_processing --fixtures ./screenshots
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+from api.services.screenshot_processor import ProcessedScreenshot, ScreenshotProcessor, process_image_file
+
+FIXTURE_SIZES = [(1920, 1080), (2560, 1440), (2880, 1800), (3840, 2160)]
+
+
+def make_fixtures(directory: Path, copies: int) -> list[Path]:
+    """Draw UI-like screenshots: flat panels, text-ish strips and an embedded photo."""
+    rng = random.Random(42)
+    paths = []
+    for copy in range(copies):
+        for width, height in FIXTURE_SIZES:
+            image = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+            draw = ImageDraw.Draw(image)
+            for _ in range(40):
+                x, y = rng.randrange(width), rng.randrange(height)
+                color = tuple(rng.randrange(256) for _ in range(3))
+                draw.rectangle((x, y, x + rng.randrange(50, 600), y + rng.randrange(20, 300)), fill=color)
+            for row in range(0, height, 24):
+                for col in range(0, width, 9):
+                    if rng.random() < 0.3:
+                        draw.rectangle((col, row, col + 6, row + 12), fill=(20, 20, 20))
+            photo = Image.effect_noise((width // 2, height // 2), 60).convert("RGB")
+            image.paste(photo, (width // 4, height // 4))
+            path = directory / f"screen-{width}x{height}-{copy}.png"
+            image.save(path, format="PNG")
+            paths.append(path)
+    return paths
+
+
+async def _heartbeat(stop: asyncio.Event, stalls: list[float], interval: float = 0.01) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        stalls.append(max(0.0, loop.time() - expected))
+
+
+async def _run(label: str, process, sources: list[Path], concurrency: int) -> dict:
+    stalls: list[float] = []
+    stop = asyncio.Event()
+    heartbeat = asyncio.create_task(_heartbeat(stop, stalls))
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    out_bytes = 0
+
+    async def one(source: Path) -> None:
+        nonlocal out_bytes
+        async with semaphore:
+            started = time.perf_counter()
+            result = await process(source)
+            latencies.append(time.perf_counter() - started)
+            out_bytes += result.image.size + result.thumbnail.size
+            result.unlink()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(s) for s in sources))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await heartbeat
+
+    latencies.sort()
+    return {
+        "mode": label,
+        "images": len(sources),
+        "seconds": round(elapsed, 3),
+        "images_per_sec": round(len(sources) / elapsed, 2),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 1),
+        "max_loop_stall_ms": round(max(stalls, default=0.0) * 1000, 1),
+        "bytes_in": sum(s.stat().st_size for s in sources),
+        "bytes_out": out_bytes,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", type=Path, help="Directory of PNG/JPEG screenshots (default: synthetic)")
+    parser.add_argument("--copies", type=int, default=2, help="Synthetic copies of each fixture size")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--format", default="webp", choices=["webp", "jpeg"])
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench-screenshots-"))
+    try:
+        if args.fixtures:
+            sources = []
+            for path in sorted(args.fixtures.iterdir()):
+                if path.suffix.lower() in (".png", ".jpg", ".jpeg"):
+                    sources.append(Path(shutil.copy(path, workdir)))
+        else:
+            sources = make_fixtures(workdir, args.copies)
+
+        async def inline(source: Path) -> ProcessedScreenshot:
+            # Blocks the event loop for the whole encode, as a naive handler would
+            return ProcessedScreenshot.model_validate(
+                process_image_file(
+                    str(source), max_dimension=1920, thumbnail_dimension=320, output_format=args.format, quality=80
+                )
+            )
+
+        processor = ScreenshotProcessor(max_workers=args.workers, output_format=args.format)
+        await processor.process(sources[0])  # start the pool outside the timed run
+        try:
+            results = [
+                await _run("inline", inline, sources, args.concurrency),
+                await _run(f"process_pool[{args.workers}]", processor.process, sources, args.concurrency),
+            ]
+        finally:
+            processor.shutdown()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for result in results:
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,131 @@
+"""
+Benchmark: full submit/list path of the API on the SQLite ticket store.
+
+Drives the real FastAPI app in-process (middleware, validation, routing,
+submission pipeline, ticket store) with ``TICKET_STORE=sqlite``; only Azure
+DevOps is faked, with a fixed latency per call.  Submits tickets with
+bounded concurrency, then pages through an app's ticket history and looks
+up users' "My Tickets", and reports throughput and latency per phase.
+
+    python -m benchmarks.bench_submit_list --tickets 2000 --concurrency 50 --devops-latency-ms 20
+    python -m benchmarks.bench_submit_list --db ./bench-tickets.db  # keep the database for inspection
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+import httpx
+
+from benchmarks.bench_devops_batch import FakeDevOps
+
+APPS = ["terprint", "terprint-ai-chat", "terprint-ai-recommender"]
+API_KEY = "bench"
+
+
+def _report(label: str, latencies: list[float], elapsed: float) -> None:
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1] if len(ordered) >= 20 else ordered[-1]
+    print(
+        f"{label:<10} requests={len(latencies):<6} req/s={len(latencies) / elapsed:8.1f} "
+        f"p50={statistics.median(ordered) * 1000:7.2f}ms p95={p95 * 1000:7.2f}ms elapsed={elapsed:6.2f}s"
+    )
+
+
+async def _timed(calls: list[Callable[[], Awaitable[None]]], concurrency: int) -> tuple[list[float], float]:
+    """Run calls with bounded concurrency; returns (per-call latencies, wall time)."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def run(call: Callable[[], Awaitable[None]]) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run(call) for call in calls))
+    return latencies, time.perf_counter() - started
+
+
+async def run(tickets: int, concurrency: int, users: int, page_size: int, devops_latency: float) -> None:
+    # Imported here: the environment must select the SQLite store before settings load
+    from api.main import app
+    from api.routes import support
+    from api.services.devops_client import DevOpsClient
+
+    for name in ("acidni-support", "httpx"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    fake = FakeDevOps(devops_latency)
+    support._devops = DevOpsClient(
+        "https://dev.azure.com/acidni", "pat", client=httpx.AsyncClient(transport=httpx.MockTransport(fake))
+    )
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench", headers={"X-Api-Key": API_KEY}
+    )
+
+    async def submit(i: int) -> None:
+        response = await client.post("/api/submit", json={
+            "app_id": APPS[i % len(APPS)],
+            "category": "bug",
+            "subject": f"Reports page fails to load #{i}",
+            "description": "After logging in, opening Reports spins forever. It worked yesterday. " * 4,
+            "user_email": f"user{i % users}@example.com",
+        })
+        response.raise_for_status()
+
+    latencies, elapsed = await _timed([lambda i=i: submit(i) for i in range(tickets)], concurrency)
+    _report("submit", latencies, elapsed)
+
+    async def list_history(app_id: str) -> None:
+        cursor = None
+        while True:
+            params = {"app_id": app_id, "limit": page_size, **({"cursor": cursor} if cursor else {})}
+            response = await client.get("/api/tickets", params=params)
+            response.raise_for_status()
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                return
+
+    pages = -(-tickets // len(APPS) // page_size) * len(APPS)
+    _, elapsed = await _timed([lambda a=a: list_history(a) for a in APPS], len(APPS))
+    print(f"{'list':<10} pages={pages:<9} pages/s={pages / elapsed:8.1f} elapsed={elapsed:6.2f}s")
+
+    async def my_tickets(user: int) -> None:
+        response = await client.get("/api/tickets", params={"email": f"user{user}@example.com", "limit": page_size})
+        response.raise_for_status()
+
+    latencies, elapsed = await _timed([lambda u=u: my_tickets(u) for u in range(users)], concurrency)
+    _report("my-tickets", latencies, elapsed)
+
+    print(f"devops_calls={fake.calls}")
+    await client.aclose()
+    await support._get_cosmos().close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=200, help="distinct submitter emails")
+    parser.add_argument("--page-size", type=int, default=25)
+    parser.add_argument("--devops-latency-ms", type=float, default=20.0)
+    parser.add_argument("--db", help="SQLite database path (default: a temporary file)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["TICKET_STORE"] = "sqlite"
+        os.environ["TICKET_STORE_PATH"] = args.db or str(Path(tmp) / "tickets.db")
+        os.environ["SUPPORT_API_KEY"] = API_KEY
+        asyncio.run(run(args.tickets, args.concurrency, args.users, args.page_size, args.devops_latency_ms / 1000))
+
+
+if __name__ == "__main__":
+    main()
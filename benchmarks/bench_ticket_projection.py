@@ -0,0 +1,208 @@
+"""
+Benchmark: ticket listing with ``SELECT *`` vs the TicketSummary projection.
+
+Seeds a store with realistic tickets (multi-KB descriptions, browser context,
+license info), then pages through one app's history with both queries via
+``CosmosService.list_tickets`` and reports RU charge and response bytes.
+
+By default the store is an in-memory stand-in, which measures response bytes
+only.  Point it at the Cosmos DB emulator (or a scratch account) to measure
+RU charge as well:
+
+    python -m benchmarks.bench_ticket_projection --tickets 2000 --page-size 25
+    python -m benchmarks.bench_ticket_projection --endpoint https://localhost:8081/ --key <emulator key>
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+from collections.abc import Sequence
+
+from api.models import TicketDocument
+from api.services.cosmos_service import TICKET_SUMMARY_FIELDS, CosmosService
+
+APPS = ["terprint", "cdes", "marketplace", "portal"]
+WORDS = "page dashboard export report fails loading timeout error browser upload filter chart".split()
+
+
+def seed_tickets(count: int, seed: int = 7) -> list[dict]:
+    """Return ``count`` stored-ticket documents spread over APPS."""
+    rng = random.Random(seed)
+    docs = []
+    for i in range(count):
+        app_id = APPS[i % len(APPS)]
+        ticket = TicketDocument(
+            id=f"SUP-{i:08d}",
+            app_id=app_id,
+            category=rng.choice(["bug", "feature", "feedback", "question"]),
+            subject=" ".join(rng.choices(WORDS, k=6)).capitalize(),
+            description=" ".join(rng.choices(WORDS, k=rng.randint(150, 400))),
+            priority=rng.randint(1, 4),
+            user_email=f"user{i % 97}@example.com",
+            user_name=f"User {i % 97}",
+            context={
+                "url": f"https://{app_id}.acidni.net/analytics?range=30d&view={i}",
+                "browser": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/126.0 Safari/537.36",
+                "screen_resolution": "2560x1440",
+                "app_version": "2.14.3",
+                "timestamp": "2025-03-02T10:00:00Z",
+            },
+            license_info={"tier": "professional", "subscription_id": f"sub-{i:06d}", "plan": "Pro Annual"},
+            devops={
+                "org": "acidni",
+                "project": app_id.capitalize(),
+                "work_item_id": 10_000 + i,
+                "work_item_url": f"https://dev.azure.com/acidni/{app_id}/_workitems/edit/{10_000 + i}",
+                "work_item_type": "Bug",
+            },
+        )
+        docs.append({**ticket.model_dump(mode="json"), "_partition_key": app_id})
+    return docs
+
+
+class _InMemoryPages:
+    def __init__(self, pages: list[list[dict]], start: int) -> None:
+        self._pages = pages
+        self._index = start
+        self.continuation_token: str | None = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._index >= len(self._pages):
+            raise StopAsyncIteration
+        page = self._pages[self._index]
+        self._index += 1
+        self.continuation_token = str(self._index) if self._index < len(self._pages) else None
+
+        async def items():
+            for item in page:
+                yield item
+
+        return items()
+
+
+class InMemoryTickets:
+    """Enough of a Cosmos container for ``list_tickets``: filters, ORDER BY id DESC, projection."""
+
+    def __init__(self, docs: list[dict]) -> None:
+        self._docs = docs
+
+    @staticmethod
+    def _project(doc: dict, select: str) -> dict:
+        if select == "*":
+            return doc
+        out = {}
+        for column in select.split(", "):
+            path, _, alias = column.partition(" AS ")
+            value: object = doc
+            for key in path.removeprefix("c.").split("."):
+                value = value.get(key) if isinstance(value, dict) else None
+            if value is not None:
+                out[alias or path.removeprefix("c.")] = value
+        return out
+
+    def query_items(self, query: str, parameters=None, max_item_count: int = 100, partition_key=None, **_):
+        select = re.match(r"SELECT (.+?) FROM c", query).group(1)
+        params = {p["name"]: p["value"] for p in parameters or []}
+        docs = [
+            d for d in self._docs
+            if (partition_key is None or d["_partition_key"] == partition_key)
+            and ("@app_id" not in params or d["app_id"] == params["@app_id"])
+            and ("@email" not in params or d["user_email"] == params["@email"])
+        ]
+        docs.sort(key=lambda d: d["id"], reverse=True)
+        rows = [self._project(d, select) for d in docs]
+        pages = [rows[i:i + max_item_count] for i in range(0, len(rows), max_item_count)]
+
+        class _Query:
+            def by_page(self, continuation: str | None = None):
+                return _InMemoryPages(pages, int(continuation or 0))
+
+        return _Query()
+
+
+class _BenchCosmos(CosmosService):
+    def __init__(self, container) -> None:
+        self._container = container
+        self._email_index = False
+
+    async def _get_container(self, container_name: str = "tickets"):
+        return self._container
+
+
+async def _page_through(cosmos: CosmosService, app_id: str, page_size: int, pages: int,
+                        fields: Sequence[str] | None, charges: list[float]) -> tuple[int, int, float]:
+    """Read up to ``pages`` pages; returns (items, response bytes, RU)."""
+    items = size = 0
+    charged_before = sum(charges)
+    continuation = None
+    for _ in range(pages):
+        page = await cosmos.list_tickets(app_id=app_id, limit=page_size, continuation=continuation, fields=fields)
+        items += len(page.items)
+        size += len(json.dumps(page.items).encode())
+        continuation = page.continuation
+        if continuation is None:
+            break
+    return items, size, sum(charges) - charged_before
+
+
+async def _cosmos_container(endpoint: str, key: str, docs: list[dict], charges: list[float]):
+    from azure.cosmos import PartitionKey
+    from azure.cosmos.aio import CosmosClient
+
+    def hook(response) -> None:
+        charge = response.http_response.headers.get("x-ms-request-charge")
+        if charge:
+            charges.append(float(charge))
+
+    client = CosmosClient(endpoint, credential=key, connection_verify=False, raw_response_hook=hook)
+    database = await client.create_database_if_not_exists("support-bench")
+    container = await database.create_container_if_not_exists(
+        "tickets", partition_key=PartitionKey(path="/_partition_key")
+    )
+    semaphore = asyncio.Semaphore(32)
+
+    async def upsert(doc: dict) -> None:
+        async with semaphore:
+            await container.upsert_item(doc)
+
+    await asyncio.gather(*(upsert(doc) for doc in docs))
+    return client, container
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=25)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--endpoint", help="Cosmos DB endpoint (e.g. the emulator); omit for the in-memory store")
+    parser.add_argument("--key", help="account key for --endpoint")
+    args = parser.parse_args()
+
+    docs = seed_tickets(args.tickets)
+    charges: list[float] = []
+    client = None
+    if args.endpoint:
+        client, container = await _cosmos_container(args.endpoint, args.key, docs, charges)
+    else:
+        container = InMemoryTickets(docs)
+    cosmos = _BenchCosmos(container)
+
+    print(f"{args.tickets} tickets, {args.pages} pages x {args.page_size} of app '{APPS[0]}'")
+    print(f"{'query':<12} {'items':>6} {'bytes':>10} {'bytes/item':>11} {'RU':>9}")
+    try:
+        for label, fields in (("SELECT *", None), ("projection", TICKET_SUMMARY_FIELDS)):
+            items, size, ru = await _page_through(cosmos, APPS[0], args.page_size, args.pages, fields, charges)
+            ru_text = f"{ru:9.2f}" if args.endpoint else f"{'n/a':>9}"
+            print(f"{label:<12} {items:>6} {size:>10,} {size / max(items, 1):>11,.0f} {ru_text}")
+    finally:
+        if client is not None:
+            await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,167 @@
+"""
+Fake Azure DevOps service hook sender.
+
+Builds ``workitem.updated`` payloads shaped like the ones DevOps posts and
+replays bursts of them against the hook receiver — in-process through
+``httpx.ASGITransport`` with a fake Cosmos DB by default, or against a
+running instance with ``--url``.  Reports receiver throughput, latency and,
+in-process, how many Cosmos writes the coalescer issued for the burst.
+
+    python -m benchmarks.fake_devops_hooks --work-items 200 --updates 10 --concurrency 50
+    python -m benchmarks.fake_devops_hooks --url http://localhost:8000/api/hooks/devops --secret s3cret
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from datetime import UTC, datetime
+from typing import Any
+
+import httpx
+
+STATES = ["New", "Active", "Active", "Resolved", "Closed"]
+
+
+def workitem_updated_payload(
+    work_item_id: int,
+    state: str,
+    rev: int,
+    old_state: str | None = None,
+    changed_date: str | None = None,
+) -> dict[str, Any]:
+    """Return a ``workitem.updated`` event (``resourceVersion`` 1.0-preview.3)."""
+    changed_date = changed_date or datetime.now(UTC).isoformat().replace("+00:00", "Z")
+    fields: dict[str, Any] = {
+        "System.Rev": {"oldValue": rev - 1, "newValue": rev},
+        "System.ChangedDate": {"newValue": changed_date},
+    }
+    if state != old_state:
+        fields["System.State"] = {"oldValue": old_state, "newValue": state}
+    return {
+        "subscriptionId": "00000000-0000-0000-0000-000000000000",
+        "notificationId": rev,
+        "eventType": "workitem.updated",
+        "publisherId": "tfs",
+        "resourceVersion": "1.0-preview.3",
+        "resource": {
+            "id": rev,
+            "workItemId": work_item_id,
+            "rev": rev,
+            "fields": fields,
+            "revision": {
+                "id": work_item_id,
+                "rev": rev,
+                "fields": {
+                    "System.State": state,
+                    "System.ChangedDate": changed_date,
+                    "System.Tags": "support-widget",
+                },
+            },
+        },
+    }
+
+
+def burst(work_items: int, updates: int, first_id: int = 1) -> list[dict[str, Any]]:
+    """Return ``updates`` events per work item, interleaved across items, walking through STATES."""
+    events = []
+    for rev in range(1, updates + 1):
+        state = STATES[min(rev - 1, len(STATES) - 1)]
+        old_state = STATES[min(rev - 2, len(STATES) - 1)] if rev > 1 else None
+        for work_item_id in range(first_id, first_id + work_items):
+            events.append(workitem_updated_payload(work_item_id, state, rev, old_state))
+    return events
+
+
+class FakeCosmos:
+    """Just enough of CosmosService for the coalescer: one ticket per work item."""
+
+    def __init__(self) -> None:
+        self.lookups = 0
+        self.patch_calls = 0
+        self.tickets_patched = 0
+
+    async def find_tickets_by_work_items(self, ids: list[int]) -> list[dict]:
+        self.lookups += 1
+        return [{"id": f"SUP-{i}", "app_id": f"app-{i % 4}", "status": "created", "work_item_id": i} for i in ids]
+
+    async def patch_ticket_statuses(self, app_id: str, updates: list[tuple[str, str, str]]) -> int:
+        self.patch_calls += 1
+        self.tickets_patched += len(updates)
+        return len(updates)
+
+
+async def send(
+    client: httpx.AsyncClient,
+    url: str,
+    events: list[dict[str, Any]],
+    concurrency: int,
+    secret: str,
+) -> list[float]:
+    """POST every event with bounded concurrency; returns per-request latencies."""
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def post(event: dict[str, Any]) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post(url, json=event, headers={"X-Hook-Secret": secret})
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+    await asyncio.gather(*(post(event) for event in events))
+    return latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--work-items", type=int, default=200)
+    parser.add_argument("--updates", type=int, default=10, help="events per work item")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--window-ms", type=float, default=200.0, help="coalescing window (in-process only)")
+    parser.add_argument("--url", help="hook receiver URL; omit to run in-process against a fake Cosmos DB")
+    parser.add_argument("--secret", default="bench-secret")
+    args = parser.parse_args()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    events = burst(args.work_items, args.updates)
+    cosmos = None
+    if args.url:
+        client = httpx.AsyncClient(timeout=30)
+        url = args.url
+    else:
+        from api import auth
+        from api.main import app
+        from api.routes import support
+        from api.services.status_coalescer import StatusUpdateCoalescer
+        from api.services.work_item_index import WorkItemTicketIndex
+
+        app.dependency_overrides[auth.require_devops_hook_auth] = lambda: None
+        cosmos = FakeCosmos()
+        support._status_hooks = StatusUpdateCoalescer(
+            cosmos, WorkItemTicketIndex(cosmos), window_seconds=args.window_ms / 1000
+        )
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+        url = "/api/hooks/devops"
+
+    started = time.perf_counter()
+    async with client:
+        latencies = await send(client, url, events, args.concurrency, args.secret)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"events sent:        {len(events)} ({args.work_items} work items x {args.updates} updates)")
+    print(f"throughput:         {len(events) / elapsed:,.0f} events/s")
+    print(f"latency p50 / p99:  {statistics.median(latencies) * 1000:.2f} / "
+          f"{latencies[int(len(latencies) * 0.99) - 1] * 1000:.2f} ms")
+
+    if cosmos is not None:
+        await support._status_hooks.stop()
+        print(f"cosmos lookups:     {cosmos.lookups}")
+        print(f"cosmos patch calls: {cosmos.patch_calls}")
+        print(f"tickets patched:    {cosmos.tickets_patched} (vs {len(events)} writes without coalescing)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
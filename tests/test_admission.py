@@ -0,0 +1,118 @@
+"""Tests for adaptive admission control on the synchronous submit path."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.services.admission import AdaptiveConcurrencyLimiter, AdmissionRejectedError
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """Tests for AIMD limit adaptation and rejection."""
+
+    def test_rejects_over_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=1)
+        limiter.acquire()
+        limiter.acquire()
+        with pytest.raises(AdmissionRejectedError) as exc_info:
+            limiter.acquire()
+        assert exc_info.value.retry_after >= 1
+        assert limiter.in_flight == 2
+
+    def test_fast_completions_grow_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4, latency_target=1.0)
+        for _ in range(40):
+            for _ in range(limiter.limit):
+                limiter.acquire()
+            for _ in range(limiter.limit):
+                limiter.release(0.1)
+        assert limiter.limit > 4
+
+    def test_idle_limiter_does_not_grow(self):
+        """A limit that is never used is not evidence the upstream can take more."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=10, latency_target=1.0)
+        for _ in range(100):
+            limiter.acquire()
+            limiter.release(0.1)
+        assert limiter.limit == 10
+
+    def test_slow_completions_shrink_limit_once_per_window(self):
+        clock = _Clock()
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=20, latency_target=1.0, backoff_ratio=0.5, clock=clock)
+        for _ in range(5):
+            limiter.acquire()
+        for _ in range(5):
+            limiter.release(5.0)
+        assert limiter.limit == 10
+
+        clock.now = 2.0
+        limiter.acquire()
+        limiter.release(0.1, failed=True)
+        assert limiter.limit == 5
+
+    def test_limit_respects_floor(self):
+        clock = _Clock()
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4, min_limit=2, latency_target=1.0, clock=clock)
+        for step in range(50):
+            clock.now = step * 2.0
+            limiter.acquire()
+            limiter.release(10.0)
+        assert limiter.limit == 2
+
+    def test_retry_after_tracks_latency(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4, latency_target=10.0)
+        limiter.acquire()
+        limiter.release(4.2)
+        assert limiter.retry_after() == 5
+
+
+PAYLOAD = {
+    "app_id": "terprint",
+    "category": "bug",
+    "subject": "Page not loading",
+    "description": "The analytics page fails to load when I click on it.",
+}
+
+
+class TestSubmitAdmission:
+    """Tests for the 429 response when the limiter is saturated."""
+
+    def test_saturated_limiter_returns_problem_with_retry_after(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, min_limit=1, latency_target=2.0)
+        limiter.acquire()
+        payload = PAYLOAD
+        submission = MagicMock()
+        with (
+            patch("api.routes.support._get_submission", return_value=submission),
+            patch("api.routes.support._get_admission", return_value=limiter),
+        ):
+            response = TestClient(app).post("/api/submit", json=payload)
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "2"
+        body = response.json()
+        assert body["code"] == "SUBMIT_OVERLOADED"
+        assert body["retryAfterSeconds"] == 2
+        submission.submit.assert_not_called()
+
+    def test_failed_ticket_id_generation_does_not_leak_a_slot(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, min_limit=1, latency_target=2.0)
+        with (
+            patch("api.routes.support._get_submission", return_value=MagicMock()),
+            patch("api.routes.support._get_admission", return_value=limiter),
+            patch("api.routes.support._generate_ticket_id", side_effect=RuntimeError("no free worker slot")),
+        ):
+            with pytest.raises(RuntimeError):
+                TestClient(app).post("/api/submit", json=PAYLOAD)
+
+        assert limiter.in_flight == 0
@@ -0,0 +1,89 @@
+"""Tests for the buffered audit log writer."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from api.services.audit_writer import AuditLogWriter
+from api.services.cosmos_service import audit_doc
+
+
+def _cosmos(fail: int = 0) -> MagicMock:
+    calls = {"failures": fail}
+
+    async def save(app_id, entries):
+        if calls["failures"]:
+            calls["failures"] -= 1
+            raise RuntimeError("503 Service Unavailable")
+
+    cosmos = MagicMock()
+    cosmos.save_audit_logs = AsyncMock(side_effect=save)
+    return cosmos
+
+
+class TestAuditLogWriter:
+    """Tests for queueing and batched flushes."""
+
+    def test_entry_ids_do_not_collide(self):
+        ids = {audit_doc("SUP-1", "terprint", "linked", {}, timestamp="2025-03-02T10:00:00")["id"] for _ in range(50)}
+        assert len(ids) == 50
+
+    @pytest.mark.asyncio
+    async def test_flush_groups_by_partition_in_batches_of_100(self):
+        cosmos = _cosmos()
+        writer = AuditLogWriter(cosmos)
+        for i in range(150):
+            writer.log(f"SUP-{i}", "terprint", "linked", {"work_item_id": i})
+        for i in range(40):
+            writer.log(f"SUP-C{i}", "cdes", "screenshot_attached", {})
+        cosmos.save_audit_logs.assert_not_called()  # logging never touches Cosmos
+
+        assert await writer.flush() == 190
+
+        sizes = sorted((c.args[0], len(c.args[1])) for c in cosmos.save_audit_logs.await_args_list)
+        assert sizes == [("cdes", 40), ("terprint", 50), ("terprint", 100)]
+
+    @pytest.mark.asyncio
+    async def test_batch_size_triggers_background_flush(self):
+        cosmos = _cosmos()
+        writer = AuditLogWriter(cosmos, batch_size=10, flush_interval=60)
+        await writer.start()
+        for i in range(10):
+            writer.log(f"SUP-{i}", "terprint", "linked", {})
+        await asyncio.sleep(0.05)
+
+        assert cosmos.save_audit_logs.await_count == 1
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_failed_batches_are_retried_then_dropped(self):
+        cosmos = _cosmos(fail=10)
+        writer = AuditLogWriter(cosmos, max_attempts=2)
+        writer.log("SUP-1", "terprint", "linked", {})
+
+        assert await writer.flush() == 0
+        assert await writer.flush() == 0
+        assert await writer.flush() == 0  # nothing left to retry
+        assert cosmos.save_audit_logs.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending_entries(self):
+        cosmos = _cosmos()
+        writer = AuditLogWriter(cosmos, flush_interval=60)
+        await writer.start()
+        writer.log("SUP-1", "terprint", "linked", {})
+
+        await writer.stop()
+
+        cosmos.save_audit_logs.assert_awaited_once()
+        entry = cosmos.save_audit_logs.await_args.args[1][0]
+        assert entry["doc_type"] == "audit"
+        assert entry["_partition_key"] == "terprint"
+
+    @pytest.mark.asyncio
+    async def test_full_queue_drops_instead_of_blocking(self):
+        writer = AuditLogWriter(_cosmos(), max_queue=2)
+        for i in range(5):
+            writer.log(f"SUP-{i}", "terprint", "linked", {})
+        assert await writer.flush() == 2
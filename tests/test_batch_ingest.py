@@ -0,0 +1,101 @@
+"""Tests for NDJSON batch ingestion."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.models import BatchItemResult, SupportSubmitResponse
+from api.services.batch_ingest import LineTooLongError, iter_ndjson_lines, run_batch
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+async def _collect(aiter) -> list:
+    return [item async for item in aiter]
+
+
+class TestNdjsonLines:
+    """Tests for incremental line splitting."""
+
+    @pytest.mark.asyncio
+    async def test_lines_split_across_chunks(self):
+        lines = await _collect(iter_ndjson_lines(_chunks(b'{"a":', b' 1}\n\n{"b"', b": 2}"), 1024))
+        assert lines == [(1, b'{"a": 1}'), (3, b'{"b": 2}')]
+
+    @pytest.mark.asyncio
+    async def test_long_line_is_discarded_not_buffered(self):
+        lines = await _collect(iter_ndjson_lines(_chunks(b"x" * 10, b"y" * 10, b"z\n{}\n"), 8))
+        assert isinstance(lines[0][1], LineTooLongError)
+        assert lines[1] == (2, b"{}")
+
+
+class TestRunBatch:
+    """Tests for bounded concurrency."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        in_flight = 0
+        peak = 0
+
+        async def handler(line: int, raw: bytes) -> BatchItemResult:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return BatchItemResult(line=line, status="created")
+
+        body = b"".join(b"{}\n" for _ in range(20))
+        results = await _collect(run_batch(iter_ndjson_lines(_chunks(body), 64), handler, concurrency=3))
+
+        assert sorted(r.line for r in results) == list(range(1, 21))
+        assert peak == 3
+
+
+class TestBatchEndpoint:
+    """Tests for POST /api/submit/batch."""
+
+    def test_streams_one_result_per_item(self):
+        submission = MagicMock()
+        submission.submit = AsyncMock(
+            side_effect=lambda request, ticket_id: SupportSubmitResponse(
+                ticket_id=ticket_id,
+                devops_work_item_id=100,
+                devops_work_item_url="https://dev.azure.com/acidni/Terprint/_workitems/edit/100",
+            )
+        )
+        item = {
+            "app_id": "terprint",
+            "category": "bug",
+            "subject": "Imported from Zendesk",
+            "description": "Historical ticket imported from Zendesk.",
+        }
+        body = "\n".join([
+            json.dumps({**item, "ref": "zd-1"}),
+            "not json",
+            json.dumps({**item, "subject": "x"}),
+        ])
+
+        with patch("api.routes.support._get_submission", return_value=submission):
+            response = TestClient(app).post(
+                "/api/submit/batch",
+                content=body,
+                headers={"Content-Type": "application/x-ndjson"},
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        results = {r["line"]: r for r in map(json.loads, response.text.splitlines())}
+        assert results[1]["status"] == "created"
+        assert results[1]["ref"] == "zd-1"
+        assert results[1]["ticket_id"].startswith("SUP-")
+        assert results[2]["code"] == "INVALID_ITEM"
+        assert results[3]["code"] == "INVALID_ITEM"
+        assert submission.submit.await_count == 1
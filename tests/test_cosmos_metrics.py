@@ -0,0 +1,129 @@
+"""Tests for Cosmos DB request-unit and latency accounting."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.services import cosmos_metrics
+from api.services.cosmos_metrics import operation, record_response, response_hook, tracked
+
+
+def _headers(charge: float, duration_ms: float = 0, retry_after_ms: float = 0) -> dict:
+    return {
+        "x-ms-request-charge": str(charge),
+        "x-ms-request-duration-ms": str(duration_ms),
+        "x-ms-retry-after-ms": str(retry_after_ms),
+    }
+
+
+class TestOperationAccounting:
+    """Tests for per-operation aggregation of response headers."""
+
+    def test_responses_are_summed_per_operation(self):
+        charged = cosmos_metrics._request_units.value(operation="test_list")
+        observed = cosmos_metrics._charge.count(operation="test_list")
+
+        with operation("test_list") as usage:
+            record_response(_headers(2.5, duration_ms=3.0), 200)
+            record_response(_headers(4.0, duration_ms=5.0), 200)
+
+        assert (usage.request_charge, usage.server_duration_ms, usage.responses) == (6.5, 8.0, 2)
+        assert cosmos_metrics._request_units.value(operation="test_list") == charged + 6.5
+        assert cosmos_metrics._charge.count(operation="test_list") == observed + 1
+
+    def test_inner_operation_keeps_its_own_charge(self):
+        with operation("test_outer") as outer:
+            record_response(_headers(1.0), 200)
+            with operation("test_inner") as inner:
+                record_response(_headers(10.0), 200)
+
+        assert outer.request_charge == 1.0
+        assert inner.request_charge == 10.0
+
+    def test_throttled_responses_record_retry_after(self):
+        throttled = cosmos_metrics._throttled.value(operation="test_save")
+
+        with operation("test_save") as usage:
+            record_response(_headers(0.0, retry_after_ms=250), 429)
+            record_response(_headers(5.7), 201)
+
+        assert usage.throttled == 1
+        assert usage.retry_after_ms == 250
+        assert cosmos_metrics._throttled.value(operation="test_save") == throttled + 1
+
+    def test_hook_reads_pipeline_response_and_never_raises(self):
+        pipeline_response = SimpleNamespace(http_response=SimpleNamespace(headers=_headers(1.3), status_code=200))
+        with operation("test_hook") as usage:
+            response_hook(pipeline_response)
+            response_hook(object())  # malformed response is ignored
+
+        assert usage.request_charge == 1.3
+
+    def test_unparseable_headers_count_as_zero(self):
+        with operation("test_garbage") as usage:
+            record_response({"x-ms-request-charge": "n/a"}, 200)
+
+        assert usage.request_charge == 0.0
+        assert usage.responses == 1
+
+    @pytest.mark.asyncio
+    async def test_totals_are_tagged_on_current_span(self):
+        span = MagicMock(attributes={"cosmos.test_get.request_charge": 1.0})
+        span.is_recording.return_value = True
+
+        @tracked("test_get")
+        async def read():
+            record_response(_headers(2.0, duration_ms=1.5), 200)
+
+        with patch("opentelemetry.trace.get_current_span", return_value=span):
+            await read()
+
+        span.set_attribute.assert_any_call("cosmos.test_get.request_charge", 3.0)
+        span.set_attribute.assert_any_call("cosmos.test_get.server_duration_ms", 1.5)
+
+
+class TestRouteAccounting:
+    """Tests for cumulative RU per API route."""
+
+    def test_request_charge_is_attributed_to_route_template(self):
+        @tracked("audit")
+        async def list_audit_entries(ticket_id, app_id):
+            record_response(_headers(3.5), 200)
+            return []
+
+        cosmos = MagicMock()
+        cosmos.list_audit_entries = list_audit_entries
+        route = "GET /api/tickets/{ticket_id}/audit"
+        before = cosmos_metrics.route_usage().get(route, 0.0)
+
+        with patch("api.routes.support._get_cosmos", return_value=cosmos), \
+                patch("api.auth.get_settings", return_value=MagicMock(support_api_key="")):
+            client = TestClient(app)
+            client.get("/api/tickets/SUP-1/audit", params={"app_id": "terprint"})
+            client.get("/api/tickets/SUP-2/audit", params={"app_id": "terprint"})
+            usage = client.get("/api/metrics/cosmos").json()
+
+        assert usage["request_units_by_route"][route] == before + 7.0
+        assert usage["request_units_by_operation"]["audit"] >= 7.0
+
+    def test_work_outside_a_request_is_background(self):
+        before = cosmos_metrics.route_usage().get(cosmos_metrics.BACKGROUND_ROUTE, 0.0)
+
+        record_response(_headers(2.0), 200)
+
+        assert cosmos_metrics.route_usage()[cosmos_metrics.BACKGROUND_ROUTE] == before + 2.0
+
+    def test_work_left_behind_by_a_request_is_background(self):
+        before = cosmos_metrics.route_usage().get(cosmos_metrics.BACKGROUND_ROUTE, 0.0)
+
+        with cosmos_metrics.request_usage() as usage:
+            pass
+        with cosmos_metrics.request_usage():
+            cosmos_metrics._request.set(usage)  # e.g. a flush scheduled by the request
+            record_response(_headers(1.0), 200)
+
+        assert usage.responses == 0
+        assert cosmos_metrics.route_usage()[cosmos_metrics.BACKGROUND_ROUTE] == before + 1.0
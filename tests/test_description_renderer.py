@@ -0,0 +1,72 @@
+"""Tests for the work item description renderer."""
+
+from api.models import LicenseInfo, SubmitContext, SupportCategory, SupportSubmitRequest
+from api.services.description_renderer import escape, render_description
+
+
+def _request(**overrides) -> SupportSubmitRequest:
+    fields = {
+        "app_id": "APP-000001",
+        "category": SupportCategory.BUG,
+        "subject": "Reports page fails",
+        "description": "Reports never finish loading.",
+    }
+    fields.update(overrides)
+    return SupportSubmitRequest(**fields)
+
+
+class TestEscape:
+    """Tests for HTML escaping."""
+
+    def test_escapes_markup_characters(self):
+        assert escape("<a href=\"x\">Tom & Jerry's</a>") == (
+            "&lt;a href=&quot;x&quot;&gt;Tom &amp; Jerry&#x27;s&lt;/a&gt;"
+        )
+
+    def test_clean_value_is_returned_unchanged(self):
+        value = "Chrome 131 on Windows"
+        assert escape(value) == value
+
+    def test_ampersand_is_always_escaped(self):
+        assert escape("&lt;") == "&amp;lt;"
+
+
+class TestRenderDescription:
+    """Tests for rendering the description sections."""
+
+    def test_minimal_request(self):
+        html = render_description(_request(category=SupportCategory.FEEDBACK), "Terprint")
+        assert html == (
+            "<h3>Customer Feedback</h3><p>Reports never finish loading.</p>"
+            "<h3>App</h3><p>APP-000001 (routed to Terprint)</p>"
+        )
+
+    def test_all_sections(self):
+        request = _request(
+            user_email="pat@example.com",
+            user_name="Pat",
+            context=SubmitContext(url="https://x.test/?a=1&b=2", browser="Chrome"),
+            license_info=LicenseInfo(plan_name="Pro", is_free_trial=True, has_priority_support=True),
+        )
+        html = render_description(request, "Terprint")
+
+        assert html.startswith("<h3>Customer Report</h3>")
+        assert "<h3>Context</h3><ul><li><b>URL:</b> https://x.test/?a=1&amp;b=2</li>" in html
+        assert "<li><b>Browser:</b> Chrome</li></ul>" in html
+        assert "<h3>Reported By</h3><p>Pat (pat@example.com)</p>" in html
+        assert "<li><b>Free Trial:</b> Yes (ends N/A)</li>" in html
+        assert html.endswith("<li><b>Support:</b> Priority (included in plan)</li></ul>")
+
+    def test_empty_context_section_is_omitted(self):
+        html = render_description(_request(context=SubmitContext()), "Terprint")
+        assert "Context" not in html
+
+    def test_user_values_cannot_inject_markup(self):
+        request = _request(
+            description="<img src=x onerror=alert(1)> broken",
+            user_email="a@b.c",
+            user_name="<script>x</script>",
+        )
+        html = render_description(request, "Terprint")
+        assert "<img" not in html and "<script>" not in html
+        assert "&lt;img src=x onerror=alert(1)&gt; broken" in html
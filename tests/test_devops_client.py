@@ -1,9 +1,15 @@
 """Tests for the Azure DevOps client."""
 
+import asyncio
+import json
+
+import httpx
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 
+from api.services.devops_batcher import WorkItemBatcher
 from api.services.devops_client import DevOpsClient
+from api.services.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
 
 
 class TestDevOpsClient:
@@ -107,3 +113,163 @@ class TestDevOpsClient:
         client = self._make_client()
         url = client._build_work_item_url("Terprint", 42)
         assert url == "https://dev.azure.com/acidni/Terprint/_workitems/edit/42"
+
+
+class TestDevOpsClientResilience:
+    """Tests for retries, Retry-After handling and the circuit breaker."""
+
+    def _make_client(self, handler, **kwargs) -> DevOpsClient:
+        http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        kwargs.setdefault("retry_policy", RetryPolicy(max_attempts=3, base_delay=0))
+        return DevOpsClient(org_url="https://dev.azure.com/acidni", pat="test-pat-value", client=http, **kwargs)
+
+    @staticmethod
+    def _create(client: DevOpsClient):
+        return client.create_work_item(project="Terprint", work_item_type="Bug", title="Broken", description="x")
+
+    @pytest.mark.asyncio
+    async def test_throttled_create_is_retried(self):
+        """A 429 with Retry-After is retried and the eventual success returned."""
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            if len(calls) == 1:
+                return httpx.Response(429, headers={"Retry-After": "0"})
+            return httpx.Response(200, json={"id": 9, "rev": 1})
+
+        result = await self._create(self._make_client(handler))
+
+        assert result["id"] == 9
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_server_error_on_create_is_not_retried(self):
+        """A 500 on a create may have created the item, so it is not replayed."""
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(500, text="boom")
+
+        with pytest.raises(RuntimeError, match="500"):
+            await self._create(self._make_client(handler))
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_retry_after_beyond_deadline_gives_up(self):
+        """A Retry-After longer than the remaining deadline is not waited out."""
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(503, headers={"Retry-After": "120"})
+
+        client = self._make_client(handler, retry_policy=RetryPolicy(max_attempts=4, deadline=5.0))
+        with pytest.raises(RuntimeError, match="503"):
+            await self._create(client)
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast(self):
+        """After repeated failures calls are rejected without reaching DevOps."""
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(500, text="down")
+
+        client = self._make_client(
+            handler,
+            retry_policy=RetryPolicy(max_attempts=1),
+            breaker=CircuitBreaker("devops-test", failure_threshold=2, reset_timeout=60),
+        )
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await self._create(client)
+        with pytest.raises(CircuitOpenError) as exc_info:
+            await self._create(client)
+
+        assert len(calls) == 2
+        assert exc_info.value.retry_after == 60
+
+
+class TestWorkItemBatcher:
+    """Tests for $batch coalescing of work item creates."""
+
+    def _make_batcher(self, handler, **kwargs) -> WorkItemBatcher:
+        http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        client = DevOpsClient(org_url="https://dev.azure.com/acidni", pat="test-pat-value", client=http)
+        return WorkItemBatcher(client, **kwargs)
+
+    @staticmethod
+    def _create(batcher: WorkItemBatcher, area_path: str = "Terprint\\Web"):
+        return batcher.create_work_item(
+            project="Terprint",
+            work_item_type="Bug",
+            title="Page not loading",
+            description="<p>Broken</p>",
+            area_path=area_path,
+        )
+
+    @pytest.mark.asyncio
+    async def test_concurrent_creates_share_one_batch_call(self):
+        """Creates arriving within the window go out as one $batch request."""
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            items = json.loads(request.content)
+            value = [
+                {"code": 200, "body": json.dumps({"id": 100 + i, "rev": 1})}
+                for i in range(len(items))
+            ]
+            return httpx.Response(200, json={"count": len(value), "value": value})
+
+        batcher = self._make_batcher(handler, window_ms=20)
+        results = await asyncio.gather(*(self._create(batcher) for _ in range(3)))
+
+        assert len(calls) == 1
+        assert "/_apis/wit/$batch" in calls[0].url.path
+        assert [r["id"] for r in results] == [100, 101, 102]
+
+    @pytest.mark.asyncio
+    async def test_item_error_only_fails_that_item(self):
+        """A per-item 400 (e.g. bad area path) raises for that caller only."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            items = json.loads(request.content)
+            value = []
+            for i, item in enumerate(items):
+                area = next(op["value"] for op in item["body"] if op["path"] == "/fields/System.AreaPath")
+                if area == "Bad\\Area":
+                    value.append({"code": 400, "body": '{"message": "TF401347: Invalid tree name"}'})
+                else:
+                    value.append({"code": 200, "body": json.dumps({"id": 200 + i})})
+            return httpx.Response(200, json={"count": len(value), "value": value})
+
+        batcher = self._make_batcher(handler, window_ms=20)
+        good, bad = await asyncio.gather(
+            self._create(batcher),
+            self._create(batcher, area_path="Bad\\Area"),
+            return_exceptions=True,
+        )
+
+        assert good["id"] == 200
+        assert isinstance(bad, RuntimeError)
+        assert "400" in str(bad)
+
+    @pytest.mark.asyncio
+    async def test_single_create_skips_batch_envelope(self):
+        """A lone create in its window uses the plain work item endpoint."""
+        paths = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            paths.append(request.url.path)
+            return httpx.Response(200, json={"id": 7, "rev": 1})
+
+        batcher = self._make_batcher(handler, window_ms=1)
+        result = await self._create(batcher)
+
+        assert result["id"] == 7
+        assert paths == ["/acidni/Terprint/_apis/wit/workitems/$Bug"]
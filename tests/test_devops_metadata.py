@@ -0,0 +1,113 @@
+"""Tests for the cached DevOps project metadata."""
+
+import httpx
+import pytest
+
+from api.models import SupportCategory
+from api.services.devops_client import DevOpsClient
+from api.services.devops_metadata import DevOpsMetadataCache
+from api.services.routing_service import RoutingService
+
+_ROUTES = """
+routes:
+  - app_id: terprint
+    devops_project: Terprint
+    area_path: "Terprint\\\\Web"
+  - app_id: retired
+    devops_project: Terprint
+    area_path: "Terprint\\\\Retired Team"
+    categories:
+      feature:
+        work_item_type: User Story
+"""
+
+_AREAS = {
+    "name": "Terprint",
+    "children": [
+        {"name": "Web", "children": [{"name": "Checkout"}]},
+        {"name": "AI Services"},
+    ],
+}
+_TYPES = {"value": [{"name": "Bug"}, {"name": "Task"}, {"name": "Epic"}]}
+
+
+def _client(handler) -> DevOpsClient:
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return DevOpsClient(org_url="https://dev.azure.com/acidni", pat="test-pat-value", client=http)
+
+
+def _metadata_handler(requests: list[httpx.Request]):
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("If-None-Match"):
+            return httpx.Response(304)
+        if "classificationnodes" in request.url.path:
+            return httpx.Response(200, json=_AREAS, headers={"ETag": '"areas-1"'})
+        return httpx.Response(200, json=_TYPES, headers={"ETag": '"types-1"'})
+
+    return handler
+
+
+@pytest.fixture
+def routing(tmp_path) -> RoutingService:
+    path = tmp_path / "routes.yaml"
+    path.write_text(_ROUTES)
+    return RoutingService(path)
+
+
+class TestDevOpsMetadataCache:
+    """Tests for loading, ETag revalidation and local plan validation."""
+
+    @pytest.mark.asyncio
+    async def test_area_paths_flattened(self):
+        paths, etag = await _client(_metadata_handler([])).get_area_paths("Terprint")
+
+        assert sorted(paths) == ["Terprint", "Terprint\\AI Services", "Terprint\\Web", "Terprint\\Web\\Checkout"]
+        assert etag == '"areas-1"'
+
+    @pytest.mark.asyncio
+    async def test_refresh_revalidates_with_etag(self, routing):
+        requests: list[httpx.Request] = []
+        cache = DevOpsMetadataCache(_client(_metadata_handler(requests)), routing)
+        await cache.refresh()
+        await cache.refresh()
+
+        assert len(requests) == 4
+        assert [r.headers.get("If-None-Match") for r in requests[2:]] == ['"areas-1"', '"types-1"']
+        assert "terprint\\web" in cache.get("Terprint").area_paths
+
+    @pytest.mark.asyncio
+    async def test_stale_area_path_falls_back_to_project_root(self, routing):
+        cache = DevOpsMetadataCache(_client(_metadata_handler([])), routing)
+        await cache.refresh()
+
+        good = cache.validate(routing.plan("terprint", SupportCategory.BUG))
+        stale = cache.validate(routing.plan("retired", SupportCategory.BUG))
+        story = cache.validate(routing.plan("retired", SupportCategory.FEATURE))
+
+        assert good.area_path == "Terprint\\Web"
+        assert stale.area_path == "Terprint"
+        assert story.work_item_type == "Task"
+
+    @pytest.mark.asyncio
+    async def test_unloaded_project_passes_through(self, routing):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(404, text="project not found")
+
+        cache = DevOpsMetadataCache(_client(handler), routing)
+        await cache.refresh()
+        plan = routing.plan("retired", SupportCategory.BUG)
+
+        assert not cache.loaded
+        assert cache.validate(plan) is plan
+
+    @pytest.mark.asyncio
+    async def test_stale_routes_report(self, routing):
+        cache = DevOpsMetadataCache(_client(_metadata_handler([])), routing)
+        await cache.refresh()
+
+        stale = {(r.app_id, r.category, r.field) for r in cache.stale_routes()}
+
+        assert ("retired", "bug", "area_path") in stale
+        assert ("retired", "feature", "work_item_type") in stale
+        assert not any(app_id == "terprint" for app_id, _, _ in stale)
@@ -0,0 +1,120 @@
+"""Tests for near-duplicate ticket detection."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from api.models import SupportSubmitRequest
+from api.services.duplicate_index import NearDuplicateIndex, simhash, ticket_fingerprint
+from api.services.routing_service import SubmissionPlan
+from api.services.submission_service import SubmissionService
+
+
+class TestSimHash:
+    """Tests for the SimHash fingerprint."""
+
+    def test_identical_text_identical_fingerprint(self):
+        assert simhash("Page not loading") == simhash("page NOT loading!")
+
+    def test_near_identical_text_is_close(self):
+        a = ticket_fingerprint("Page not loading", "The analytics page fails to load when I click on it.")
+        b = ticket_fingerprint("Page not loading", "The analytics page fails to load when I click it.")
+        assert (a ^ b).bit_count() <= 6
+
+    def test_unrelated_text_is_far(self):
+        a = ticket_fingerprint("Page not loading", "The analytics page fails to load when I click on it.")
+        b = ticket_fingerprint("Feature: dark mode", "Please add a dark mode to the dashboard settings.")
+        assert (a ^ b).bit_count() > 6
+
+
+class TestNearDuplicateIndex:
+    """Tests for the banded per-app index."""
+
+    WORK_ITEM = {"id": 42, "url": "https://dev.azure.com/acidni/Terprint/_workitems/edit/42", "project": "Terprint"}
+
+    def test_finds_match_within_distance(self):
+        index = NearDuplicateIndex(max_distance=3)
+        index.add("terprint", 0b1111 << 40, "SUP-1", self.WORK_ITEM)
+
+        match = index.find("terprint", (0b1111 << 40) ^ 0b111)
+        assert match.ticket_id == "SUP-1"
+        assert match.distance == 3
+        assert match.work_item["id"] == 42
+
+    def test_ignores_match_beyond_distance(self):
+        index = NearDuplicateIndex(max_distance=3)
+        index.add("terprint", 0, "SUP-1", self.WORK_ITEM)
+        assert index.find("terprint", 0b1111) is None
+
+    def test_indexes_are_per_app(self):
+        index = NearDuplicateIndex()
+        index.add("terprint", 12345, "SUP-1", self.WORK_ITEM)
+        assert index.find("gridsight", 12345) is None
+
+    def test_entries_expire_after_window(self):
+        now = [0.0]
+        index = NearDuplicateIndex(window_seconds=60, clock=lambda: now[0])
+        index.add("terprint", 12345, "SUP-1", self.WORK_ITEM)
+
+        now[0] = 61.0
+        assert index.find("terprint", 12345) is None
+        assert len(index) == 0
+
+    def test_discard_work_item(self):
+        index = NearDuplicateIndex()
+        index.add("terprint", 12345, "SUP-1", self.WORK_ITEM)
+        index.discard_work_item(42)
+        assert index.find("terprint", 12345) is None
+
+
+class TestDuplicateLinking:
+    """Tests for SubmissionService.create_or_link_work_item."""
+
+    PLAN = SubmissionPlan(
+        app_id="terprint", category="bug", project="Terprint", area_path="Terprint",
+        work_item_type="Bug", tag_prefix="support-widget", tags="support-widget", title_prefix="[Bug]",
+    )
+    EXISTING = {"id": 42, "url": "https://dev.azure.com/acidni/Terprint/_workitems/edit/42", "project": "Terprint"}
+
+    def _service(self, devops: MagicMock) -> SubmissionService:
+        duplicates = NearDuplicateIndex()
+        fingerprint = ticket_fingerprint(self._request().subject, self._request().description)
+        duplicates.add("terprint", fingerprint, "SUP-1", self.EXISTING)
+        return SubmissionService(MagicMock(), devops, MagicMock(), duplicates=duplicates)
+
+    @staticmethod
+    def _request() -> SupportSubmitRequest:
+        return SupportSubmitRequest(
+            app_id="terprint", category="bug", subject="Page not loading",
+            description="The analytics page fails to load when I click on it.",
+        )
+
+    @pytest.mark.asyncio
+    async def test_near_duplicate_is_linked_with_a_comment(self):
+        devops = MagicMock()
+        devops.add_comment = AsyncMock()
+        devops.create_work_item = AsyncMock()
+        service = self._service(devops)
+
+        work_item, linked = await service.create_or_link_work_item(self._request(), self.PLAN, "SUP-2")
+
+        assert linked
+        assert work_item == self.EXISTING
+        devops.create_work_item.assert_not_called()
+        project, work_item_id, comment = devops.add_comment.await_args.args
+        assert (project, work_item_id) == ("Terprint", 42)
+        assert "SUP-2" in comment
+
+    @pytest.mark.asyncio
+    async def test_failed_comment_falls_back_to_a_new_work_item(self):
+        created = {"id": 43, "url": "https://dev.azure.com/acidni/Terprint/_workitems/edit/43"}
+        devops = MagicMock()
+        devops.add_comment = AsyncMock(side_effect=RuntimeError("Azure DevOps API returned 500"))
+        devops.create_work_item = AsyncMock(return_value=created)
+        service = self._service(devops)
+
+        work_item, linked = await service.create_or_link_work_item(self._request(), self.PLAN, "SUP-2")
+
+        assert not linked
+        assert work_item == created
+        devops.create_work_item.assert_awaited_once()
@@ -0,0 +1,142 @@
+"""Tests for the email-partitioned ticket index."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.models import TicketDocument
+from api.services.cosmos_service import CosmosService, TicketPage
+from api.tools.backfill_email_index import CHECKPOINT_NAME, backfill
+
+
+def _cosmos(containers: dict[str, MagicMock], email_index: bool = True) -> CosmosService:
+    cosmos = CosmosService.__new__(CosmosService)
+    cosmos._email_index = email_index
+    cosmos._tickets = None
+    cosmos._get_container = AsyncMock(side_effect=lambda name="tickets": containers[name])
+    return cosmos
+
+
+def _container() -> MagicMock:
+    container = MagicMock()
+    container.create_item = AsyncMock(side_effect=lambda doc: doc)
+    container.upsert_item = AsyncMock(side_effect=lambda doc: doc)
+    return container
+
+
+class TestEmailIndexWrites:
+    """Tests for keeping tickets_by_email in step with the tickets container."""
+
+    @pytest.mark.asyncio
+    async def test_save_ticket_writes_summary_under_lowercased_email(self):
+        tickets, by_email = _container(), _container()
+        cosmos = _cosmos({"tickets": tickets, "tickets_by_email": by_email})
+        ticket = TicketDocument(
+            id="SUP-1",
+            app_id="terprint",
+            category="bug",
+            subject="Page not loading",
+            description="The analytics page fails to load.",
+            priority=2,
+            user_email=" Jane.Doe@Example.com ",
+            devops={
+                "org": "acidni",
+                "project": "Terprint",
+                "work_item_id": 42,
+                "work_item_url": "u",
+                "work_item_type": "Bug",
+            },
+        )
+
+        await cosmos.save_ticket(ticket)
+
+        summary = by_email.upsert_item.await_args.args[0]
+        assert summary["_partition_key"] == "jane.doe@example.com"
+        assert summary["id"] == "SUP-1"
+        assert summary["devops"] == {"work_item_id": 42}
+        assert "description" not in summary
+
+    @pytest.mark.asyncio
+    async def test_disabled_index_is_not_written(self):
+        tickets, by_email = _container(), _container()
+        cosmos = _cosmos({"tickets": tickets, "tickets_by_email": by_email}, email_index=False)
+
+        await cosmos.save_ticket(TicketDocument(
+            id="SUP-1", app_id="terprint", category="bug", subject="s", description="d", priority=2,
+            user_email="jane@example.com",
+        ))
+
+        by_email.upsert_item.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_status_patch_refreshes_summaries_from_batch_response(self):
+        tickets, by_email = _container(), _container()
+        tickets.execute_item_batch = AsyncMock(return_value=[
+            {
+                "statusCode": 200,
+                "resourceBody": {"id": "SUP-1", "app_id": "cdes", "status": "closed", "user_email": "a@x.com"},
+            },
+            {"statusCode": 200, "resourceBody": {"id": "SUP-2", "app_id": "cdes", "status": "closed"}},
+        ])
+        cosmos = _cosmos({"tickets": tickets, "tickets_by_email": by_email})
+
+        patched = await cosmos.patch_ticket_statuses("cdes", [("SUP-1", "closed", "t"), ("SUP-2", "closed", "t")])
+
+        assert patched == 2
+        by_email.upsert_item.assert_awaited_once()
+        assert by_email.upsert_item.await_args.args[0]["status"] == "closed"
+
+
+class TestEmailIndexReads:
+    """Tests for reading a user's tickets from the index."""
+
+    @pytest.mark.asyncio
+    async def test_lookup_is_single_partition(self):
+        by_email = MagicMock()
+        pages = MagicMock()
+        pages.__aiter__.return_value = []
+        pages.continuation_token = None
+        by_email.query_items.return_value.by_page.return_value = pages
+        cosmos = _cosmos({"tickets_by_email": by_email})
+
+        await cosmos.list_tickets_by_email("Jane@Example.com", app_id="terprint", limit=10)
+
+        kwargs = by_email.query_items.call_args.kwargs
+        assert kwargs["partition_key"] == "jane@example.com"
+        assert "user_email" not in kwargs["query"]
+
+    def test_route_uses_index_when_reads_enabled(self):
+        cosmos = MagicMock()
+        cosmos.list_tickets_by_email = AsyncMock(return_value=TicketPage([{"id": "SUP-1", "app_id": "terprint"}], None))
+        cosmos.list_tickets = AsyncMock()
+        with patch("api.routes.support._get_cosmos", return_value=cosmos), \
+                patch("api.routes.support.get_settings", return_value=MagicMock(email_index_reads_enabled=True)):
+            response = TestClient(app).get("/api/tickets", params={"email": "jane@example.com"})
+
+        assert [t["ticket_id"] for t in response.json()] == ["SUP-1"]
+        cosmos.list_tickets.assert_not_called()
+
+
+class TestBackfill:
+    """Tests for the backfill command."""
+
+    @pytest.mark.asyncio
+    async def test_resumes_from_checkpoint_and_records_progress(self):
+        async def scan(page_size, continuation):
+            assert continuation == "page-2"
+            yield TicketPage([{"id": "SUP-3", "user_email": "a@x.com"}], "page-3")
+            yield TicketPage([{"id": "SUP-4", "user_email": "b@x.com"}], None)
+
+        cosmos = MagicMock()
+        cosmos.get_sync_state = AsyncMock(return_value={"continuation": "page-2", "written": 200})
+        cosmos.save_sync_state = AsyncMock()
+        cosmos.scan_tickets = scan
+        cosmos.index_ticket_emails = AsyncMock(side_effect=lambda items: len(items))
+
+        assert await backfill(cosmos) == 202
+
+        checkpoints = [c.args for c in cosmos.save_sync_state.await_args_list]
+        assert checkpoints[0] == (CHECKPOINT_NAME, {"continuation": "page-3", "written": 201})
+        assert checkpoints[-1] == (CHECKPOINT_NAME, {"continuation": None, "written": 202, "complete": True})
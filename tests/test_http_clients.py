@@ -0,0 +1,159 @@
+"""Tests for the shared HTTP client registry."""
+
+import asyncio
+import json
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+from api.metrics import registry
+from api.routes import support
+from api.services.http_clients import HttpClientRegistry, UpstreamConfig
+from api.services.notification_service import NotificationService
+
+_HEADERS = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: keep-alive\r\n\r\n"
+
+
+class _KeepAliveServer:
+    """Minimal HTTP/1.1 server that counts accepted connections."""
+
+    def __init__(self) -> None:
+        self.connections = 0
+        self.port = 0
+        self._server: asyncio.Server | None = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while request := await reader.readuntil(b"\r\n\r\n"):
+                writer.write(_HEADERS if request.startswith(b"HEAD") else _HEADERS + b"ok")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def __aenter__(self) -> "_KeepAliveServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._server.close()
+
+
+class TestHttpClientRegistry:
+    """Tests for pooled, warmed clients."""
+
+    @pytest.mark.asyncio
+    async def test_same_client_per_upstream(self):
+        clients = HttpClientRegistry([UpstreamConfig("a"), UpstreamConfig("b")])
+        try:
+            assert clients.get("a") is clients.get("a")
+            assert clients.get("a") is not clients.get("b")
+            with pytest.raises(KeyError):
+                clients.get("unknown")
+        finally:
+            await clients.aclose()
+
+    @pytest.mark.asyncio
+    async def test_warm_connection_is_reused(self):
+        """A warmed connection serves later requests without a new handshake."""
+        async with _KeepAliveServer() as server:
+            clients = HttpClientRegistry([
+                UpstreamConfig("test-warm", base_url=f"http://127.0.0.1:{server.port}", warm_path="/"),
+            ])
+            try:
+                await clients.warm()
+                assert server.connections == 1
+
+                for _ in range(3):
+                    response = await clients.get("test-warm").get("/ping")
+                    assert response.text == "ok"
+                assert server.connections == 1
+
+                in_flight = registry.gauge("http_pool_requests_in_flight")
+                assert in_flight.value(upstream="test-warm") == 0
+                connections = registry.gauge("http_pool_connections")
+                assert connections.value(upstream="test-warm", state="idle") == 1
+                assert connections.value(upstream="test-warm", state="active") == 0
+            finally:
+                await clients.aclose()
+
+    @pytest.mark.asyncio
+    async def test_warm_failure_is_ignored(self):
+        clients = HttpClientRegistry([
+            UpstreamConfig("test-down", base_url="http://127.0.0.1:9", warm_path="/"),
+        ])
+        try:
+            await clients.warm()
+        finally:
+            await clients.aclose()
+
+    @pytest.mark.asyncio
+    async def test_streamed_response_holds_an_active_connection(self):
+        async with _KeepAliveServer() as server:
+            clients = HttpClientRegistry([UpstreamConfig("test-stream", base_url=f"http://127.0.0.1:{server.port}")])
+            connections = registry.gauge("http_pool_connections")
+            try:
+                async with clients.get("test-stream").stream("GET", "/ping") as response:
+                    assert connections.value(upstream="test-stream", state="active") == 1
+                    assert await response.aread() == b"ok"
+                assert connections.value(upstream="test-stream", state="active") == 0
+                assert connections.value(upstream="test-stream", state="idle") == 1
+            finally:
+                await clients.aclose()
+            assert connections.value(upstream="test-stream", state="idle") == 0
+
+    @pytest.mark.asyncio
+    async def test_connection_errors_are_httpx_errors(self):
+        clients = HttpClientRegistry([UpstreamConfig("test-refused", base_url="http://127.0.0.1:9")])
+        try:
+            with pytest.raises(httpx.ConnectError):
+                await clients.get("test-refused").get("/")
+            assert registry.gauge("http_pool_requests_in_flight").value(upstream="test-refused") == 0
+        finally:
+            await clients.aclose()
+
+
+class TestPooledServices:
+    """Tests for services built on the shared pools."""
+
+    @pytest.mark.asyncio
+    async def test_notifications_use_the_shared_apim_pool(self):
+        clients = HttpClientRegistry([UpstreamConfig("apim", base_url="http://127.0.0.1:9")])
+        with patch.object(support, "_get_http_clients", return_value=clients), \
+                patch.object(support, "_notifications", None):
+            notifications = support._get_notification_service()
+            await notifications.close()
+
+            assert notifications._client is clients.get("apim")
+            assert not clients.get("apim").is_closed  # the pool outlives the service
+        await clients.aclose()
+
+    @pytest.mark.asyncio
+    async def test_confirmation_is_sent_in_the_background(self):
+        sent = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            sent.append(json.loads(request.content))
+            return httpx.Response(202)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        settings = MagicMock(
+            notifications_enabled=True,
+            apim_base_url="http://apim",
+            apim_subscription_key="key",
+            notifications_from_email="support@example.com",
+        )
+        with patch("api.services.notification_service.get_settings", return_value=settings):
+            notifications = NotificationService(client=client)
+        notifications.notify_created("user@example.com", "SUP-1", "<b>Broken</b>", "terprint")
+        notifications.notify_created(None, "SUP-2", "No address", "terprint")
+        await notifications.close()  # waits for the send
+
+        (email,) = sent
+        assert email["to"] == "user@example.com"
+        assert "&lt;b&gt;Broken&lt;/b&gt;" in email["body"]
+        await client.aclose()
@@ -0,0 +1,200 @@
+"""Tests for Idempotency-Key handling."""
+
+import asyncio
+
+import pytest
+
+from api.services.idempotency import (
+    IdempotencyCache,
+    IdempotencyConflictError,
+    IdempotencyInProgressError,
+)
+from api.services.ttl_cache import LruTtlCache
+
+
+class FakeStore:
+    """In-memory stand-in for the Cosmos idempotency container."""
+
+    def __init__(self) -> None:
+        self.docs: dict[str, dict] = {}
+
+    async def reserve_idempotency_key(self, key, fingerprint, ttl_seconds):
+        if key in self.docs:
+            return self.docs[key]
+        self.docs[key] = {"fingerprint": fingerprint, "state": "pending"}
+        return None
+
+    async def complete_idempotency_key(self, key, record, ttl_seconds):
+        self.docs[key] = {**record, "state": "completed"}
+
+    async def get_idempotency_record(self, key):
+        return self.docs.get(key)
+
+    async def release_idempotency_key(self, key):
+        self.docs.pop(key, None)
+
+
+class TestLruTtlCache:
+    """Tests for the bounded LRU+TTL cache."""
+
+    def test_evicts_least_recently_used(self):
+        cache = LruTtlCache(max_entries=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert len(cache) == 2
+
+    def test_entries_expire(self):
+        now = [0.0]
+        cache = LruTtlCache(max_entries=10, ttl_seconds=5, clock=lambda: now[0])
+        cache.set("a", 1)
+        now[0] = 6.0
+        assert cache.get("a") is None
+
+
+class TestIdempotencyCache:
+    """Tests for replay, waiting and conflict detection."""
+
+    @pytest.mark.asyncio
+    async def test_replay_does_not_rerun_operation(self):
+        """A second call with the same key returns the first response."""
+        cache = IdempotencyCache()
+        calls = []
+
+        async def operation():
+            calls.append(1)
+            return 200, {"ticket_id": "SUP-1"}
+
+        first, replayed_first = await cache.run("k", "fp", operation)
+        second, replayed_second = await cache.run("k", "fp", operation)
+
+        assert len(calls) == 1
+        assert not replayed_first and replayed_second
+        assert second.body == first.body == {"ticket_id": "SUP-1"}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicates_wait_for_first(self):
+        """Duplicates arriving mid-flight share the first attempt's result."""
+        cache = IdempotencyCache()
+        release = asyncio.Event()
+        calls = []
+
+        async def operation():
+            calls.append(1)
+            await release.wait()
+            return 200, {"ticket_id": "SUP-1"}
+
+        tasks = [asyncio.create_task(cache.run("k", "fp", operation)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert len(calls) == 1
+        assert all(record.body["ticket_id"] == "SUP-1" for record, _ in results)
+
+    @pytest.mark.asyncio
+    async def test_waiter_takes_over_from_a_cancelled_owner(self):
+        """A client disconnect cancels only its own request, not the duplicates waiting on it."""
+        cache = IdempotencyCache()
+        calls = []
+
+        async def operation():
+            calls.append(1)
+            if len(calls) == 1:
+                await asyncio.Event().wait()  # the owner hangs until cancelled
+            return 200, {"ticket_id": "SUP-1"}
+
+        owner = asyncio.create_task(cache.run("k", "fp", operation))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.run("k", "fp", operation))
+        await asyncio.sleep(0)
+        owner.cancel()
+
+        record, replayed = await waiter
+        assert owner.cancelled()
+        assert record.body == {"ticket_id": "SUP-1"}
+        assert not replayed
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_different_payload_is_a_conflict(self):
+        """Reusing a key with a different payload is rejected."""
+        cache = IdempotencyCache()
+
+        async def operation():
+            return 200, {}
+
+        await cache.run("k", "fp-1", operation)
+        with pytest.raises(IdempotencyConflictError):
+            await cache.run("k", "fp-2", operation)
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self):
+        """A failed attempt can be retried with the same key."""
+        cache = IdempotencyCache()
+        attempts = []
+
+        async def operation():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("DevOps down")
+            return 200, {"ticket_id": "SUP-2"}
+
+        with pytest.raises(RuntimeError):
+            await cache.run("k", "fp", operation)
+        record, replayed = await cache.run("k", "fp", operation)
+
+        assert record.body["ticket_id"] == "SUP-2"
+        assert not replayed
+
+    @pytest.mark.asyncio
+    async def test_shared_store_replays_across_workers(self):
+        """A second worker replays a response recorded by the first."""
+        store = FakeStore()
+        worker_a = IdempotencyCache(store=store)
+        worker_b = IdempotencyCache(store=store)
+
+        async def operation():
+            return 200, {"ticket_id": "SUP-3"}
+
+        await worker_a.run("k", "fp", operation)
+        record, replayed = await worker_b.run("k", "fp", operation)
+
+        assert replayed
+        assert record.body["ticket_id"] == "SUP-3"
+
+    @pytest.mark.asyncio
+    async def test_shared_store_pending_times_out(self):
+        """A reservation held elsewhere past the wait limit is reported in progress."""
+        store = FakeStore()
+        store.docs["k"] = {"fingerprint": "fp", "state": "pending"}
+        cache = IdempotencyCache(store=store, wait_seconds=0.05, poll_interval=0.01)
+
+        async def operation():
+            return 200, {}
+
+        with pytest.raises(IdempotencyInProgressError):
+            await cache.run("k", "fp", operation)
+
+    @pytest.mark.asyncio
+    async def test_waiter_takes_over_a_released_reservation(self):
+        """When the owning worker fails and releases the key, a waiting duplicate runs it."""
+        store = FakeStore()
+        store.docs["k"] = {"fingerprint": "fp", "state": "pending"}
+        cache = IdempotencyCache(store=store, wait_seconds=5, poll_interval=0.01)
+
+        async def operation():
+            return 200, {"ticket_id": "SUP-4"}
+
+        async def owner_fails():
+            await asyncio.sleep(0.03)
+            await store.release_idempotency_key("k")
+
+        (record, replayed), _ = await asyncio.gather(cache.run("k", "fp", operation), owner_fails())
+
+        assert not replayed
+        assert record.body["ticket_id"] == "SUP-4"
+        assert store.docs["k"]["state"] == "completed"
@@ -0,0 +1,131 @@
+"""Tests for the submission outbox and its worker pool."""
+
+import pytest
+
+from api.services.outbox import OutboxStatus, OutboxWorkerPool, SubmissionOutbox
+
+
+class TestSubmissionOutbox:
+    """Tests for the SQLite-backed outbox."""
+
+    def _make_outbox(self, tmp_path, **kwargs) -> SubmissionOutbox:
+        return SubmissionOutbox(tmp_path / "outbox.db", **kwargs)
+
+    @pytest.mark.asyncio
+    async def test_enqueue_and_claim(self, tmp_path):
+        """An enqueued entry is claimed once and leased as processing."""
+        outbox = self._make_outbox(tmp_path)
+        await outbox.enqueue("SUP-1", '{"app_id": "terprint"}')
+
+        entry = await outbox.claim()
+        assert entry.ticket_id == "SUP-1"
+        assert entry.status == OutboxStatus.PROCESSING
+        assert entry.attempts == 1
+
+        # Leased — a second worker gets nothing
+        assert await outbox.claim() is None
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_reclaimed(self, tmp_path):
+        """A processing entry whose lease expired is claimed again."""
+        outbox = self._make_outbox(tmp_path, lease_seconds=0)
+        await outbox.enqueue("SUP-1", "{}")
+        await outbox.claim()
+
+        entry = await outbox.claim()
+        assert entry.ticket_id == "SUP-1"
+        assert entry.attempts == 2
+
+    @pytest.mark.asyncio
+    async def test_entries_survive_reopen(self, tmp_path):
+        """Entries and work item checkpoints are durable across connections."""
+        outbox = self._make_outbox(tmp_path)
+        await outbox.enqueue("SUP-1", "{}")
+        await outbox.record_work_item("SUP-1", {"id": 42, "url": "https://example/42"})
+        outbox.close()
+
+        reopened = self._make_outbox(tmp_path)
+        entry = await reopened.get("SUP-1")
+        assert entry.status == OutboxStatus.QUEUED
+        assert entry.work_item["id"] == 42
+
+    @pytest.mark.asyncio
+    async def test_priority_lane_is_claimed_first(self, tmp_path):
+        """A priority entry queued after standard entries is claimed before them."""
+        outbox = self._make_outbox(tmp_path)
+        await outbox.enqueue("SUP-STD", "{}")
+        await outbox.enqueue("SUP-P1", "{}", lane="priority")
+
+        entry = await outbox.claim()
+        assert entry.ticket_id == "SUP-P1"
+        assert entry.lane == "priority"
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_holder_cannot_overwrite_its_successor(self, tmp_path):
+        """Only the worker that reclaimed an entry may record its outcome."""
+        outbox = self._make_outbox(tmp_path, lease_seconds=0)
+        await outbox.enqueue("SUP-1", "{}")
+        stale = await outbox.claim()
+        current = await outbox.claim()
+
+        assert await outbox.mark_created(stale.ticket_id, stale.lease_owner) is False
+        assert await outbox.mark_retry(current.ticket_id, current.lease_owner, "boom", 60) is True
+        assert await outbox.mark_failed(stale.ticket_id, stale.lease_owner, "late") is False
+
+        entry = await outbox.get("SUP-1")
+        assert entry.status == OutboxStatus.QUEUED
+        assert entry.last_error == "boom"
+
+    @pytest.mark.asyncio
+    async def test_purge_removes_only_old_finished_entries(self, tmp_path):
+        outbox = self._make_outbox(tmp_path)
+        for ticket_id in ("SUP-DONE", "SUP-FAILED", "SUP-QUEUED"):
+            await outbox.enqueue(ticket_id, "{}")
+        done, failed = await outbox.claim(), await outbox.claim()
+        await outbox.mark_created(done.ticket_id, done.lease_owner)
+        await outbox.mark_failed(failed.ticket_id, failed.lease_owner, "gave up")
+
+        assert await outbox.purge(retention_seconds=3600) == 0
+        assert await outbox.purge(retention_seconds=-1) == 2
+        assert await outbox.get("SUP-DONE") is None
+        assert (await outbox.get("SUP-QUEUED")).status == OutboxStatus.QUEUED
+
+
+class TestOutboxWorkerPool:
+    """Tests for outbox draining and retries."""
+
+    @pytest.mark.asyncio
+    async def test_success_marks_created(self, tmp_path):
+        """A handler that succeeds marks the entry created."""
+        outbox = SubmissionOutbox(tmp_path / "outbox.db")
+        handled = []
+
+        async def handler(entry):
+            handled.append(entry.ticket_id)
+
+        pool = OutboxWorkerPool(outbox, handler)
+        await outbox.enqueue("SUP-1", "{}")
+
+        assert await pool.process_one() is True
+        assert handled == ["SUP-1"]
+        assert (await outbox.get("SUP-1")).status == OutboxStatus.CREATED
+        assert await pool.process_one() is False
+
+    @pytest.mark.asyncio
+    async def test_failure_is_retried_then_failed(self, tmp_path):
+        """A failing handler is retried with backoff, then marked failed."""
+        outbox = SubmissionOutbox(tmp_path / "outbox.db")
+
+        async def handler(entry):
+            raise RuntimeError("DevOps unavailable")
+
+        pool = OutboxWorkerPool(outbox, handler, max_attempts=2, base_backoff=0, max_backoff=0)
+        await outbox.enqueue("SUP-1", "{}")
+
+        await pool.process_one()
+        entry = await outbox.get("SUP-1")
+        assert entry.status == OutboxStatus.QUEUED
+        assert "DevOps unavailable" in entry.last_error
+
+        await pool.process_one()
+        assert (await outbox.get("SUP-1")).status == OutboxStatus.FAILED
@@ -0,0 +1,88 @@
+"""Tests for license-tier priority lanes in front of DevOps."""
+
+import asyncio
+
+import pytest
+
+from api.models import LicenseInfo, SupportCategory, SupportSubmitRequest
+from api.services.priority_scheduler import Lane, PriorityScheduler, lane_for
+
+
+def _request(**overrides) -> SupportSubmitRequest:
+    fields = {
+        "app_id": "terprint",
+        "category": SupportCategory.BUG,
+        "subject": "Reports page fails",
+        "description": "Reports never finish loading.",
+    }
+    fields.update(overrides)
+    return SupportSubmitRequest(**fields)
+
+
+class TestLaneFor:
+    """Tests for lane assignment."""
+
+    def test_p1_is_priority(self):
+        assert lane_for(_request(priority=1)) is Lane.PRIORITY
+
+    def test_priority_support_license_is_priority(self):
+        assert lane_for(_request(license_info=LicenseInfo(has_priority_support=True))) is Lane.PRIORITY
+        assert lane_for(_request(license_info=LicenseInfo(support_plan="Premium Support"))) is Lane.PRIORITY
+
+    def test_default_is_standard(self):
+        assert lane_for(_request(license_info=LicenseInfo(is_free_trial=True))) is Lane.STANDARD
+
+
+class TestPriorityScheduler:
+    """Tests for reserved capacity and weighted grants."""
+
+    @pytest.mark.asyncio
+    async def test_standard_lane_cannot_take_reserved_slots(self):
+        """With standard work saturating its share, priority work still starts at once."""
+        scheduler = PriorityScheduler(max_concurrency=4, reserved=1)
+        for _ in range(3):
+            await scheduler.acquire(Lane.STANDARD)
+
+        blocked = asyncio.create_task(scheduler.acquire(Lane.STANDARD))
+        await asyncio.sleep(0)
+        assert not blocked.done()
+
+        await asyncio.wait_for(scheduler.acquire(Lane.PRIORITY), timeout=1)
+        assert scheduler.in_flight(Lane.PRIORITY) == 1
+
+        scheduler.release(Lane.STANDARD)
+        await asyncio.wait_for(blocked, timeout=1)
+        assert scheduler.in_flight(Lane.STANDARD) == 3
+
+    @pytest.mark.asyncio
+    async def test_weighted_grants_when_both_lanes_wait(self):
+        """Freed slots go to priority `weight` times per standard grant."""
+        scheduler = PriorityScheduler(max_concurrency=1, reserved=0, weight=3)
+        await scheduler.acquire(Lane.STANDARD)
+        order: list[Lane] = []
+
+        async def worker(lane: Lane) -> None:
+            async with scheduler.slot(lane):
+                order.append(lane)
+
+        tasks = [asyncio.create_task(worker(Lane.STANDARD)) for _ in range(4)]
+        tasks += [asyncio.create_task(worker(Lane.PRIORITY)) for _ in range(6)]
+        await asyncio.sleep(0)
+        scheduler.release(Lane.STANDARD)
+        await asyncio.gather(*tasks)
+
+        assert order[:8] == [Lane.PRIORITY] * 3 + [Lane.STANDARD] + [Lane.PRIORITY] * 3 + [Lane.STANDARD]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_leak_a_slot(self):
+        scheduler = PriorityScheduler(max_concurrency=1, reserved=0)
+        await scheduler.acquire(Lane.PRIORITY)
+        waiter = asyncio.create_task(scheduler.acquire(Lane.STANDARD))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+        scheduler.release(Lane.PRIORITY)
+        assert scheduler.in_flight(Lane.STANDARD) == 0
+        assert scheduler.queued(Lane.STANDARD) == 0
+        await asyncio.wait_for(scheduler.acquire(Lane.STANDARD), timeout=1)
@@ -0,0 +1,105 @@
+"""Tests for the retry policy, token bucket and circuit breaker."""
+
+import pytest
+
+from api.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    RetryPolicy,
+    TokenBucket,
+    parse_retry_after,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class TestRetryPolicy:
+    """Tests for jittered backoff."""
+
+    def test_backoff_is_capped(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+        assert all(0 <= policy.backoff(attempt) <= 4.0 for attempt in range(1, 20))
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after("7") == 7.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+
+class TestTokenBucket:
+    """Tests for the pre-throttle."""
+
+    @pytest.mark.asyncio
+    async def test_burst_then_rate(self):
+        clock = _Clock()
+        bucket = TokenBucket(rate=10, burst=5, clock=clock, sleep=clock.sleep)
+        for _ in range(5):
+            await bucket.acquire()
+        assert clock.now == 0.0
+
+        await bucket.acquire()
+        assert clock.now == pytest.approx(0.1)
+
+    @pytest.mark.asyncio
+    async def test_pause_holds_back_callers(self):
+        clock = _Clock()
+        bucket = TokenBucket(rate=10, burst=5, clock=clock, sleep=clock.sleep)
+        bucket.pause(3.0)
+        await bucket.acquire()
+        assert clock.now >= 3.0
+
+
+class TestCircuitBreaker:
+    """Tests for open / half-open / closed transitions."""
+
+    def test_opens_after_consecutive_failures(self):
+        clock = _Clock()
+        breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state is CircuitState.CLOSED
+
+        breaker.record_failure()
+        assert breaker.state is CircuitState.OPEN
+        clock.now = 10
+        with pytest.raises(CircuitOpenError) as exc_info:
+            breaker.before_call()
+        assert exc_info.value.retry_after == 20
+
+    def test_half_open_allows_one_probe(self):
+        clock = _Clock()
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        clock.now = 30
+
+        breaker.before_call()
+        assert breaker.state is CircuitState.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_success()
+        assert breaker.state is CircuitState.CLOSED
+        breaker.before_call()
+
+    def test_failed_probe_reopens(self):
+        clock = _Clock()
+        breaker = CircuitBreaker("test", failure_threshold=5, reset_timeout=30, clock=clock)
+        for _ in range(5):
+            breaker.record_failure()
+        clock.now = 31
+        breaker.before_call()
+        breaker.record_failure()
+        assert breaker.state is CircuitState.OPEN
@@ -4,6 +4,7 @@ import pytest
 from pathlib import Path
 from unittest.mock import patch
 
+from api.models import SupportCategory
 from api.services.routing_service import RoutingService
 
 
@@ -110,3 +111,86 @@ class TestRoutingService:
             assert "devops_project" in route, f"{app_id} missing devops_project"
             assert "area_path" in route, f"{app_id} missing area_path"
             assert "app_name" in route, f"{app_id} missing app_name"
+
+
+ROUTING_YAML = """
+routes:
+  - app_id: terprint
+    app_name: Terprint
+    devops_project: Terprint
+    area_path: "Terprint\\\\Web"
+    categories:
+      feature:
+        work_item_type: User Story
+        area_path: "Terprint\\\\Product"
+        title_prefix: "[Idea]"
+  - app_id: _default
+    app_name: General Support
+    devops_project: Infrastructure
+    area_path: "Infrastructure"
+"""
+
+
+class TestSubmissionPlans:
+    """Tests for the precomputed (app_id, category) submission plans."""
+
+    def _service(self, tmp_path, text: str = ROUTING_YAML) -> RoutingService:
+        path = tmp_path / "support-routing.yaml"
+        path.write_text(text)
+        return RoutingService(path)
+
+    def test_default_plan_for_category(self, tmp_path):
+        """Categories without overrides use the built-in type, tags and title prefix."""
+        plan = self._service(tmp_path).plan("terprint", SupportCategory.BUG)
+
+        assert plan.project == "Terprint"
+        assert plan.area_path == "Terprint\\Web"
+        assert plan.work_item_type == "Bug"
+        assert plan.tags == "support-widget; customer-reported; terprint"
+        assert plan.title_prefix == "[Support]"
+
+    def test_category_override(self, tmp_path):
+        """Per-category overrides in the YAML replace the defaults."""
+        plan = self._service(tmp_path).plan("terprint", SupportCategory.FEATURE)
+
+        assert plan.work_item_type == "User Story"
+        assert plan.area_path == "Terprint\\Product"
+        assert plan.title_prefix == "[Idea]"
+        assert plan.tags == "support-widget; feature-request; terprint"
+
+    def test_unknown_app_uses_default_route_with_its_own_tag(self, tmp_path):
+        """Unrouted apps get the _default plan tagged with their own app_id."""
+        plan = self._service(tmp_path).plan("brand-new-app", SupportCategory.QUESTION)
+
+        assert plan.project == "Infrastructure"
+        assert plan.app_id == "brand-new-app"
+        assert plan.tags.endswith("; brand-new-app")
+
+    def test_plans_are_cached(self, tmp_path):
+        """Repeated lookups return the same precomputed plan object."""
+        svc = self._service(tmp_path)
+        assert svc.plan("terprint", SupportCategory.BUG) is svc.plan("terprint", SupportCategory.BUG)
+
+    def test_fallback_plans_are_cached_per_app(self, tmp_path):
+        """The derived _default plan is built once per unrouted app."""
+        svc = self._service(tmp_path)
+        plan = svc.plan("brand-new-app", SupportCategory.BUG)
+
+        assert svc.plan("brand-new-app", SupportCategory.BUG) is plan
+        assert svc.plan("other-app", SupportCategory.BUG).tags.endswith("; other-app")
+
+    def test_reload_swaps_plans(self, tmp_path):
+        """reload() rebuilds plans from the updated file."""
+        svc = self._service(tmp_path)
+        (tmp_path / "support-routing.yaml").write_text(ROUTING_YAML.replace("[Idea]", "[Wish]"))
+        svc.reload()
+
+        assert svc.plan("terprint", SupportCategory.FEATURE).title_prefix == "[Wish]"
+
+    def test_failed_reload_keeps_current_plans(self, tmp_path):
+        """A YAML error during reload leaves the previous configuration in place."""
+        svc = self._service(tmp_path)
+        (tmp_path / "support-routing.yaml").write_text("routes: [unclosed")
+        svc.reload()
+
+        assert svc.plan("terprint", SupportCategory.FEATURE).title_prefix == "[Idea]"
@@ -0,0 +1,93 @@
+"""Tests for process-pool screenshot normalization."""
+
+import pytest
+
+PIL = pytest.importorskip("PIL")
+from PIL import Image  # noqa: E402
+
+from api.metrics import MetricsRegistry  # noqa: E402
+from api.services.screenshot_processor import ScreenshotProcessor, process_image_file  # noqa: E402
+
+
+def _write_png(path, size=(3000, 2000), mode="RGBA"):
+    image = Image.new(mode, size, (30, 120, 200, 255) if mode == "RGBA" else (30, 120, 200))
+    exif = Image.Exif()
+    exif[0x010F] = "ACME Camera"  # Make
+    image.save(path, format="PNG", exif=exif.tobytes())
+    return path
+
+
+class TestProcessImageFile:
+    """Tests for the worker-side image pipeline."""
+
+    @pytest.mark.parametrize("output_format, content_type", [("webp", "image/webp"), ("jpeg", "image/jpeg")])
+    def test_downscales_reencodes_and_strips_metadata(self, tmp_path, output_format, content_type):
+        source = _write_png(tmp_path / "in.png")
+        result = process_image_file(
+            str(source), max_dimension=1000, thumbnail_dimension=200, output_format=output_format, quality=80
+        )
+
+        assert (result["original_width"], result["original_height"]) == (3000, 2000)
+        assert (result["image"]["width"], result["image"]["height"]) == (1000, 667)
+        assert max(result["thumbnail"]["width"], result["thumbnail"]["height"]) == 200
+        assert result["image"]["content_type"] == content_type
+
+        with Image.open(result["image"]["path"]) as out:
+            assert not out.getexif()
+            assert "exif" not in out.info
+
+    def test_small_images_are_not_upscaled(self, tmp_path):
+        source = _write_png(tmp_path / "in.png", size=(400, 300), mode="RGB")
+        result = process_image_file(
+            str(source), max_dimension=1920, thumbnail_dimension=320, output_format="webp", quality=80
+        )
+        assert (result["image"]["width"], result["image"]["height"]) == (400, 300)
+
+
+class TestScreenshotProcessor:
+    """Tests for running the pipeline in the process pool."""
+
+    @pytest.mark.asyncio
+    async def test_process_in_pool(self, tmp_path):
+        source = _write_png(tmp_path / "in.png")
+        processor = ScreenshotProcessor(max_workers=1, max_dimension=800, thumbnail_dimension=100)
+        try:
+            processed = await processor.process(source)
+        finally:
+            processor.shutdown()
+
+        assert processed.image.width == 800
+        assert processed.image.path.exists() and processed.thumbnail.path.exists()
+        processed.unlink()
+        assert not processed.image.path.exists()
+
+    def test_rejects_unknown_format(self):
+        with pytest.raises(ValueError):
+            ScreenshotProcessor(output_format="bmp")
+
+
+class TestMetricsRegistry:
+    """Tests for the in-process metrics registry."""
+
+    def test_histogram_quantiles_and_snapshot(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.05, 0.5, 5.0):
+            histogram.observe(value)
+
+        assert registry.histogram("latency") is histogram
+        assert histogram.quantile(0.5) == 0.1
+        snapshot = registry.snapshot()["latency"]["values"][""]
+        assert snapshot["count"] == 4
+        assert snapshot["buckets"] == {"0.1": 2, "1.0": 1, "+Inf": 1}
+
+    def test_labelled_counter_and_gauge(self):
+        registry = MetricsRegistry()
+        registry.counter("hits").inc(lane="p1")
+        registry.counter("hits").inc(2, lane="default")
+        gauge = registry.gauge("depth")
+        gauge.inc()
+        gauge.dec()
+
+        assert registry.counter("hits").value(lane="default") == 2
+        assert gauge.value() == 0
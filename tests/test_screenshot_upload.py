@@ -0,0 +1,107 @@
+"""Tests for streaming screenshot uploads."""
+
+import base64
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.models import SupportSubmitRequest
+from api.services.screenshot_upload import (
+    Base64StreamDecoder,
+    ScreenshotTooLargeError,
+    UnsupportedScreenshotError,
+    spool_screenshot,
+)
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 40
+
+
+async def _chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+class TestBase64StreamDecoder:
+    """Tests for incremental base64 decoding."""
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 7, 1024])
+    def test_decodes_across_arbitrary_chunk_boundaries(self, chunk_size):
+        encoded = b"data:image/png;base64," + base64.encodebytes(PNG)  # includes newlines
+        decoder = Base64StreamDecoder()
+        out = b"".join(decoder.feed(encoded[i:i + chunk_size]) for i in range(0, len(encoded), chunk_size))
+        out += decoder.finish()
+        assert out == PNG
+
+    def test_rejects_invalid_base64(self):
+        decoder = Base64StreamDecoder()
+        with pytest.raises(UnsupportedScreenshotError):
+            decoder.feed(b"not*base64!")
+            decoder.finish()
+
+
+class TestSpoolScreenshot:
+    """Tests for spooling uploads to disk."""
+
+    @pytest.mark.asyncio
+    async def test_spools_raw_png(self, tmp_path):
+        spooled = await spool_screenshot(
+            _chunks(PNG, 1000), base64_encoded=False, max_bytes=1_000_000, directory=str(tmp_path)
+        )
+        assert spooled.content_type == "image/png"
+        assert spooled.size == len(PNG)
+        assert spooled.path.read_bytes() == PNG
+        spooled.unlink()
+        assert not spooled.path.exists()
+
+    @pytest.mark.asyncio
+    async def test_spools_base64(self, tmp_path):
+        spooled = await spool_screenshot(
+            _chunks(base64.b64encode(PNG), 333), base64_encoded=True, max_bytes=1_000_000, directory=str(tmp_path)
+        )
+        assert spooled.path.read_bytes() == PNG
+
+    @pytest.mark.asyncio
+    async def test_rejects_oversized_upload_and_cleans_up(self, tmp_path):
+        with pytest.raises(ScreenshotTooLargeError):
+            await spool_screenshot(_chunks(PNG, 1000), base64_encoded=False, max_bytes=100, directory=str(tmp_path))
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_rejects_non_image(self, tmp_path):
+        with pytest.raises(UnsupportedScreenshotError):
+            await spool_screenshot(
+                _chunks(b"<html></html>", 4), base64_encoded=False, max_bytes=1000, directory=str(tmp_path)
+            )
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestScreenshotRequests:
+    """Tests for rejecting screenshots sent the old way or with bad headers."""
+
+    def test_inline_base64_screenshot_is_rejected(self):
+        request = {
+            "app_id": "terprint",
+            "category": "bug",
+            "subject": "Page not loading",
+            "description": "The analytics page fails to load.",
+        }
+        SupportSubmitRequest(**request, screenshot_base64=None)  # null is still accepted
+
+        response = TestClient(app).post("/api/submit", json={**request, "screenshot_base64": "iVBORw0KGgo="})
+
+        assert response.status_code == 422
+
+    def test_malformed_content_length_is_a_bad_request(self):
+        cosmos = MagicMock()
+        cosmos.get_ticket = AsyncMock(return_value={"devops": {"project": "Terprint", "work_item_id": 42}})
+        with patch("api.routes.support._get_cosmos", return_value=cosmos):
+            response = TestClient(app).post(
+                "/api/tickets/SUP-1/screenshot",
+                params={"app_id": "terprint"},
+                content=PNG,
+                headers={"Content-Type": "image/png", "Content-Length": "lots"},
+            )
+
+        assert response.status_code == 400
@@ -0,0 +1,190 @@
+"""Tests for the pluggable ticket store and its SQLite implementation."""
+
+import sqlite3
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.models import TicketDocument
+from api.services.cosmos_service import TICKET_SUMMARY_FIELDS, CosmosService
+from api.services.sqlite_store import SqliteTicketStore
+from api.services.ticket_store import TicketIdConflictError, create_ticket_store
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SqliteTicketStore(tmp_path / "tickets.db")
+
+
+def _ticket(n: int, app_id: str = "terprint", email: str | None = None, work_item_id: int | None = None):
+    return TicketDocument(
+        id=f"SUP-20250302-1000-{n:08d}",
+        app_id=app_id,
+        category="bug",
+        subject=f"Issue {n}",
+        description="The analytics page fails to load.",
+        priority=2,
+        user_email=email,
+        devops={"org": "acidni", "project": "Terprint", "work_item_id": work_item_id, "work_item_url": "u",
+                "work_item_type": "Bug"} if work_item_id else None,
+        created_at=f"2025-03-02T10:00:{n:02d}Z",
+    )
+
+
+class TestTicketStoreSelection:
+    """Tests for choosing the backend from Settings."""
+
+    def test_sqlite_backend(self, tmp_path):
+        settings = MagicMock(ticket_store="sqlite", ticket_store_path=str(tmp_path / "t.db"))
+        assert isinstance(create_ticket_store(settings), SqliteTicketStore)
+
+    def test_cosmos_is_the_default_backend(self):
+        settings = MagicMock(ticket_store="cosmos")
+        with patch("api.services.cosmos_service.get_settings", return_value=MagicMock(ticket_cache_enabled=False)), \
+                patch("api.services.cosmos_service.DefaultAzureCredential"):
+            assert isinstance(create_ticket_store(settings), CosmosService)
+
+    def test_unknown_backend_is_rejected(self):
+        with pytest.raises(ValueError, match="ticket_store"):
+            create_ticket_store(MagicMock(ticket_store="mongo"))
+
+
+class TestSqliteTickets:
+    """Tests for ticket reads, writes and listings."""
+
+    @pytest.mark.asyncio
+    async def test_save_and_get(self, store):
+        await store.save_ticket(_ticket(1))
+
+        ticket = await store.get_ticket(_ticket(1).id, "terprint")
+        assert ticket["subject"] == "Issue 1"
+        assert await store.get_ticket(_ticket(1).id, "cdes") is None
+
+    @pytest.mark.asyncio
+    async def test_ticket_id_is_never_overwritten(self, store):
+        assert (await store.save_ticket(_ticket(1)))["subject"] == "Issue 1"
+        assert (await store.save_ticket(_ticket(1)))["subject"] == "Issue 1"  # retried save
+
+        other = _ticket(2).model_copy(update={"id": _ticket(1).id})
+        with pytest.raises(TicketIdConflictError):
+            await store.save_ticket_with_audit(other, details={})
+
+        assert (await store.get_ticket(_ticket(1).id, "terprint"))["subject"] == "Issue 1"
+        assert await store.list_audit_entries(_ticket(1).id, "terprint") == []
+
+    def test_database_uses_wal(self, store, tmp_path):
+        with sqlite3.connect(tmp_path / "tickets.db") as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    @pytest.mark.asyncio
+    async def test_listing_pages_newest_first(self, store):
+        for n in range(5):
+            await store.save_ticket(_ticket(n))
+        await store.save_ticket(_ticket(9, app_id="cdes"))
+
+        first = await store.list_tickets(app_id="terprint", limit=2)
+        second = await store.list_tickets(app_id="terprint", limit=2, continuation=first.continuation)
+        last = await store.list_tickets(app_id="terprint", limit=2, continuation=second.continuation)
+
+        ids = [t["subject"] for page in (first, second, last) for t in page.items]
+        assert ids == ["Issue 4", "Issue 3", "Issue 2", "Issue 1", "Issue 0"]
+        assert last.continuation is None
+
+    @pytest.mark.asyncio
+    async def test_listing_projects_fields(self, store):
+        await store.save_ticket(_ticket(1, work_item_id=42))
+
+        page = await store.list_tickets(fields=TICKET_SUMMARY_FIELDS)
+
+        assert page.items[0]["devops_work_item_id"] == 42
+        assert "description" not in page.items[0]
+        with pytest.raises(ValueError):
+            await store.list_tickets(fields=["id'); DROP TABLE tickets; --"])
+
+    @pytest.mark.asyncio
+    async def test_email_lookup_is_case_insensitive(self, store):
+        await store.save_ticket(_ticket(1, email="Jane.Doe@Example.com"))
+        await store.save_ticket(_ticket(2, email="someone@example.com"))
+
+        page = await store.list_tickets_by_email(" jane.doe@example.com ")
+
+        assert [t["subject"] for t in page.items] == ["Issue 1"]
+        assert page.items[0]["user_email"] == "jane.doe@example.com"
+
+    @pytest.mark.asyncio
+    async def test_status_patches_and_work_item_lookup(self, store):
+        await store.save_ticket(_ticket(1, work_item_id=42))
+        await store.save_ticket(_ticket(2, work_item_id=43))
+
+        patched = await store.patch_ticket_statuses(
+            "terprint", [(_ticket(1).id, "closed", "2025-03-03T00:00:00Z"), ("SUP-missing", "closed", "t")]
+        )
+
+        assert patched == 1
+        found = await store.find_tickets_by_work_items([42, 99])
+        assert found == [{"id": _ticket(1).id, "app_id": "terprint", "status": "closed", "work_item_id": 42}]
+        assert (await store.get_ticket(_ticket(1).id, "terprint"))["updated_at"] == "2025-03-03T00:00:00Z"
+
+    @pytest.mark.asyncio
+    async def test_scan_resumes_from_continuation(self, store):
+        for n in range(3):
+            await store.save_ticket(_ticket(n, email=f"user{n}@example.com"))
+        await store.save_ticket(_ticket(7))  # no email: not scanned
+
+        pages = [page async for page in store.scan_tickets(page_size=2)]
+        resumed = [page async for page in store.scan_tickets(page_size=2, continuation=pages[0].continuation)]
+
+        assert [len(p.items) for p in pages] == [2, 1]
+        assert pages[-1].continuation is None
+        assert [t["subject"] for p in resumed for t in p.items] == ["Issue 2"]
+
+
+class TestSqliteAuditAndState:
+    """Tests for audit entries, sync checkpoints and idempotency records."""
+
+    @pytest.mark.asyncio
+    async def test_ticket_and_created_entry_are_written_together(self, store):
+        await store.save_ticket_with_audit(_ticket(1), details={"work_item_id": 42})
+        await store.save_ticket_with_audit(_ticket(1), details={"work_item_id": 42})  # retried save
+        await store.save_audit_log(_ticket(1).id, "terprint", "screenshot_attached", {})
+
+        entries = await store.list_audit_entries(_ticket(1).id, "terprint")
+
+        assert [e["action"] for e in entries] == ["created", "screenshot_attached"]
+        assert entries[0]["details"] == {"work_item_id": 42}
+
+    @pytest.mark.asyncio
+    async def test_sync_state_round_trip(self, store):
+        assert await store.get_sync_state("status-sync") is None
+        await store.save_sync_state("status-sync", {"watermark": "2025-03-02T10:00:00Z"})
+        assert (await store.get_sync_state("status-sync"))["watermark"] == "2025-03-02T10:00:00Z"
+
+    @pytest.mark.asyncio
+    async def test_idempotency_reservations(self, store):
+        assert await store.reserve_idempotency_key("k", "fp", ttl_seconds=60) is None
+        assert (await store.reserve_idempotency_key("k", "fp", ttl_seconds=60))["state"] == "pending"
+
+        await store.complete_idempotency_key("k", {"fingerprint": "fp", "status_code": 200, "body": {}}, 60)
+        assert (await store.get_idempotency_record("k"))["state"] == "completed"
+
+        await store.release_idempotency_key("k")
+        assert await store.reserve_idempotency_key("k", "fp", ttl_seconds=0) is None
+        assert await store.reserve_idempotency_key("k", "fp", ttl_seconds=60) is None  # expired reservation
+
+
+class TestSqliteBackedRoutes:
+    """Tests for the ticket routes running on the SQLite store."""
+
+    @pytest.mark.asyncio
+    async def test_ticket_listing(self, store):
+        await store.save_ticket(_ticket(1, email="jane@example.com", work_item_id=42))
+        await store.save_ticket(_ticket(2, email="jane@example.com"))
+
+        with patch("api.routes.support._get_cosmos", return_value=store):
+            response = TestClient(app).get("/api/tickets", params={"email": "jane@example.com", "limit": 1})
+
+        assert response.status_code == 200
+        assert [t["ticket_id"] for t in response.json()] == [_ticket(2).id]
+        assert response.headers["X-Next-Cursor"]
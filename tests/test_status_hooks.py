@@ -0,0 +1,111 @@
+"""Tests for the DevOps service hook receiver and status coalescer."""
+
+import base64
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.routes.hooks import parse_state_change
+from api.services.status_coalescer import StatusUpdateCoalescer
+from api.services.work_item_index import WorkItemTicketIndex
+from benchmarks.fake_devops_hooks import workitem_updated_payload
+
+
+def _cosmos(tickets: list[dict]) -> MagicMock:
+    cosmos = MagicMock()
+    cosmos.find_tickets_by_work_items = AsyncMock(
+        side_effect=lambda ids: [t for t in tickets if t["work_item_id"] in ids]
+    )
+    cosmos.patch_ticket_statuses = AsyncMock(side_effect=lambda app_id, updates: len(updates))
+    return cosmos
+
+
+class TestStatusUpdateCoalescer:
+    """Tests for coalescing bursts of status events."""
+
+    @pytest.mark.asyncio
+    async def test_burst_becomes_one_write_with_latest_revision(self):
+        cosmos = _cosmos([{"id": "SUP-A", "app_id": "terprint", "status": "created", "work_item_id": 10}])
+        coalescer = StatusUpdateCoalescer(cosmos, WorkItemTicketIndex(cosmos), window_seconds=60)
+
+        coalescer.submit(10, "in_progress", 2, "2025-03-02T10:00:00Z")
+        coalescer.submit(10, "closed", 4, "2025-03-02T10:02:00Z")
+        coalescer.submit(10, "resolved", 3, "2025-03-02T10:01:00Z")  # delivered out of order
+        await coalescer.stop()
+
+        cosmos.patch_ticket_statuses.assert_awaited_once_with(
+            "terprint", [("SUP-A", "closed", "2025-03-02T10:02:00Z")]
+        )
+
+    @pytest.mark.asyncio
+    async def test_status_is_patched_even_if_written_before(self):
+        """The sync may have changed the ticket since, so a repeated status is written again."""
+        cosmos = _cosmos([{"id": "SUP-A", "app_id": "terprint", "status": "created", "work_item_id": 10}])
+        closed: list[int] = []
+        coalescer = StatusUpdateCoalescer(cosmos, WorkItemTicketIndex(cosmos), on_closed=closed.append)
+
+        coalescer.submit(10, "closed", 2, "2025-03-02T10:00:00Z")
+        assert await coalescer.flush() == 1
+        coalescer.submit(10, "closed", 3, "2025-03-02T10:05:00Z")
+        assert await coalescer.flush() == 1
+
+        assert cosmos.patch_ticket_statuses.await_count == 2
+        assert cosmos.find_tickets_by_work_items.await_count == 1  # ticket locations stay cached
+        assert closed == [10, 10]
+
+    @pytest.mark.asyncio
+    async def test_index_entries_from_submit_skip_cosmos_lookup(self):
+        cosmos = _cosmos([])
+        index = WorkItemTicketIndex(cosmos)
+        index.add(20, "SUP-B", "cdes")
+        coalescer = StatusUpdateCoalescer(cosmos, index)
+
+        coalescer.submit(20, "in_progress", 2, "2025-03-02T10:00:00Z")
+        coalescer.submit(99, "in_progress", 2, "2025-03-02T10:00:00Z")  # not a support ticket
+        await coalescer.stop()
+
+        cosmos.find_tickets_by_work_items.assert_awaited_once_with([99])
+        cosmos.patch_ticket_statuses.assert_awaited_once_with(
+            "cdes", [("SUP-B", "in_progress", "2025-03-02T10:00:00Z")]
+        )
+
+
+class TestHookReceiver:
+    """Tests for POST /api/hooks/devops."""
+
+    def test_parse_ignores_updates_without_state_change(self):
+        assert parse_state_change(workitem_updated_payload(10, "Active", 3, old_state="Active")) is None
+        assert parse_state_change({"eventType": "workitem.commented"}) is None
+        assert parse_state_change(
+            workitem_updated_payload(10, "Resolved", 3, old_state="Active", changed_date="2025-03-02T10:00:00Z")
+        ) == (10, "Resolved", 3, "2025-03-02T10:00:00Z")
+
+    def test_accepts_state_change_with_basic_auth(self):
+        hooks = MagicMock()
+        credentials = base64.b64encode(b"devops:s3cret").decode()
+        with patch("api.auth.get_settings", return_value=MagicMock(devops_hook_secret="s3cret")), \
+                patch("api.routes.support._get_status_hooks", return_value=hooks):
+            response = TestClient(app).post(
+                "/api/hooks/devops",
+                json=workitem_updated_payload(10, "Active", 2, old_state="New", changed_date="2025-03-02T10:00:00Z"),
+                headers={"Authorization": f"Basic {credentials}"},
+            )
+
+        assert response.status_code == 202
+        assert response.json() == {"status": "accepted"}
+        hooks.submit.assert_called_once_with(10, "in_progress", 2, "2025-03-02T10:00:00Z")
+
+    @pytest.mark.parametrize("secret, header", [("", "s3cret"), ("s3cret", "wrong"), ("s3cret", None)])
+    def test_rejects_bad_or_unconfigured_secret(self, secret, header):
+        hooks = MagicMock()
+        headers = {"X-Hook-Secret": header} if header else {}
+        with patch("api.auth.get_settings", return_value=MagicMock(devops_hook_secret=secret)), \
+                patch("api.routes.support._get_status_hooks", return_value=hooks):
+            response = TestClient(app).post(
+                "/api/hooks/devops", json=workitem_updated_payload(10, "Active", 2), headers=headers
+            )
+
+        assert response.status_code == 401
+        hooks.submit.assert_not_called()
@@ -0,0 +1,93 @@
+"""Tests for the DevOps → Cosmos ticket status synchronizer."""
+
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+
+from api.services.devops_client import DevOpsClient
+from api.services.status_sync import SYNC_STATE_NAME, StatusSynchronizer, ticket_status
+
+
+def _devops(changed: dict[int, tuple[str, str]], calls: list[httpx.Request]) -> DevOpsClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        body = json.loads(request.content)
+        if "/wiql" in request.url.path:
+            return httpx.Response(200, json={"workItems": [{"id": i} for i in changed]})
+        value = [
+            {"id": i, "fields": {"System.State": changed[i][0], "System.ChangedDate": changed[i][1]}}
+            for i in body["ids"]
+        ]
+        return httpx.Response(200, json={"count": len(value), "value": value})
+
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return DevOpsClient(org_url="https://dev.azure.com/acidni", pat="test-pat-value", client=http)
+
+
+def _cosmos(tickets: list[dict], watermark: str | None = "2025-03-01T00:00:00Z") -> MagicMock:
+    cosmos = MagicMock()
+    cosmos.get_sync_state = AsyncMock(return_value={"watermark": watermark} if watermark else None)
+    cosmos.save_sync_state = AsyncMock()
+    cosmos.find_tickets_by_work_items = AsyncMock(return_value=tickets)
+    cosmos.patch_ticket_statuses = AsyncMock(side_effect=lambda app_id, updates: len(updates))
+    return cosmos
+
+
+class TestStatusSynchronizer:
+    """Tests for incremental status sync."""
+
+    def test_state_mapping(self):
+        assert ticket_status("Active") == "in_progress"
+        assert ticket_status("Done") == "closed"
+        assert ticket_status("Awaiting Customer") == "awaiting_customer"
+
+    @pytest.mark.asyncio
+    async def test_reads_changes_in_chunks_of_200(self):
+        calls: list[httpx.Request] = []
+        changed = {i: ("Active", "2025-03-02T10:00:00Z") for i in range(1, 451)}
+        sync = StatusSynchronizer(_devops(changed, calls), _cosmos([]))
+
+        await sync.sync_once()
+
+        batch_sizes = sorted(len(json.loads(c.content)["ids"]) for c in calls if "workitemsbatch" in c.url.path)
+        assert batch_sizes == [50, 200, 200]
+
+    @pytest.mark.asyncio
+    async def test_patches_only_changed_tickets_per_partition(self):
+        changed = {
+            10: ("Active", "2025-03-02T10:00:00Z"),
+            11: ("Closed", "2025-03-02T11:30:00Z"),
+            12: ("New", "2025-03-02T09:00:00Z"),
+        }
+        tickets = [
+            {"id": "SUP-A", "app_id": "terprint", "status": "created", "work_item_id": 10},
+            {"id": "SUP-B", "app_id": "cdes", "status": "created", "work_item_id": 11},
+            {"id": "SUP-C", "app_id": "cdes", "status": "created", "work_item_id": 12},
+        ]
+        cosmos = _cosmos(tickets)
+        closed: list[int] = []
+        sync = StatusSynchronizer(_devops(changed, []), cosmos, on_closed=closed.append)
+
+        patched = await sync.sync_once()
+
+        assert patched == 2
+        calls = {c.args[0]: c.args[1] for c in cosmos.patch_ticket_statuses.await_args_list}
+        assert calls == {
+            "terprint": [("SUP-A", "in_progress", "2025-03-02T10:00:00Z")],
+            "cdes": [("SUP-B", "closed", "2025-03-02T11:30:00Z")],
+        }
+        assert closed == [11]
+        cosmos.save_sync_state.assert_awaited_once_with(SYNC_STATE_NAME, {"watermark": "2025-03-02T11:30:00Z"})
+
+    @pytest.mark.asyncio
+    async def test_query_uses_watermark_with_overlap(self):
+        calls: list[httpx.Request] = []
+        sync = StatusSynchronizer(_devops({}, calls), _cosmos([]), overlap_seconds=60)
+
+        assert await sync.sync_once() == 0
+
+        query = json.loads(calls[0].content)["query"]
+        assert "[System.ChangedDate] >= '2025-02-28T23:59:00.000000Z'" in query
+        assert "CONTAINS 'support-widget'" in query
@@ -0,0 +1,199 @@
+"""Tests for atomic ticket + audit writes and audit history reads."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from azure.cosmos.exceptions import (
+    CosmosBatchOperationError,
+    CosmosResourceExistsError,
+    CosmosResourceNotFoundError,
+)
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.models import SupportSubmitRequest, TicketDocument
+from api.services.cosmos_service import CosmosService
+from api.services.routing_service import SubmissionPlan
+from api.services.submission_service import SubmissionService
+from api.services.ticket_store import TicketIdConflictError
+
+
+def _cosmos(container: MagicMock) -> CosmosService:
+    cosmos = CosmosService.__new__(CosmosService)
+    cosmos._email_index = False
+    cosmos._tickets = None
+    cosmos._legacy_audit_container = ""
+    cosmos._get_container = AsyncMock(return_value=container)
+    return cosmos
+
+
+def _ticket() -> TicketDocument:
+    return TicketDocument(
+        id="SUP-1",
+        app_id="terprint",
+        category="bug",
+        subject="Page not loading",
+        description="The analytics page fails to load.",
+        priority=2,
+        created_at="2025-03-02T10:00:00Z",
+    )
+
+
+class TestAtomicTicketAudit:
+    """Tests for CosmosService.save_ticket_with_audit."""
+
+    @pytest.mark.asyncio
+    async def test_ticket_and_audit_entry_share_one_batch(self):
+        container = MagicMock()
+        container.execute_item_batch = AsyncMock(side_effect=lambda batch_operations, partition_key: [
+            {"statusCode": 200, "resourceBody": args[0]} for _, args in batch_operations
+        ])
+        cosmos = _cosmos(container)
+
+        stored = await cosmos.save_ticket_with_audit(_ticket(), details={"work_item_id": 42})
+        await cosmos.save_ticket_with_audit(_ticket(), details={"work_item_id": 42})  # retried save
+
+        assert stored["id"] == "SUP-1"
+        first, retry = (c.kwargs for c in container.execute_item_batch.await_args_list)
+        assert first["partition_key"] == "terprint"
+        (_, (ticket,)), (_, (entry,)) = first["batch_operations"]
+        assert ticket["_partition_key"] == entry["_partition_key"] == "terprint"
+        assert entry["doc_type"] == "audit"
+        assert entry["action"] == "created"
+        assert entry["details"] == {"work_item_id": 42}
+        assert retry["batch_operations"][1][1][0]["id"] == entry["id"]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_stores_nothing(self):
+        container = MagicMock()
+        container.execute_item_batch = AsyncMock(
+            side_effect=CosmosBatchOperationError(
+                error_index=1, headers={}, status_code=409, message="Conflict", operation_responses=[]
+            )
+        )
+        container.upsert_item = AsyncMock()
+        cosmos = _cosmos(container)
+
+        with pytest.raises(CosmosBatchOperationError):
+            await cosmos.save_ticket_with_audit(_ticket(), details={})
+        container.upsert_item.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_ticket_is_created_not_upserted(self):
+        container = MagicMock()
+        container.execute_item_batch = AsyncMock(return_value=[{"statusCode": 201}, {"statusCode": 201}])
+        await _cosmos(container).save_ticket_with_audit(_ticket(), details={})
+
+        ops = container.execute_item_batch.await_args.kwargs["batch_operations"]
+        assert [op for op, _ in ops] == ["create", "upsert"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("subject, conflict", [("Page not loading", False), ("Another ticket", True)])
+    async def test_existing_ticket_id(self, subject, conflict):
+        """A stored copy of the same ticket makes the save a retry; another ticket is a conflict."""
+        stored = {**_ticket().model_dump(mode="json"), "subject": subject}
+        container = MagicMock()
+        container.execute_item_batch = AsyncMock(side_effect=CosmosBatchOperationError(
+            error_index=0, headers={}, status_code=409, message="Conflict", operation_responses=[]
+        ))
+        container.read_item = AsyncMock(return_value=stored)
+        container.create_item = AsyncMock(side_effect=CosmosResourceExistsError(message="Conflict"))
+        cosmos = _cosmos(container)
+
+        if conflict:
+            with pytest.raises(TicketIdConflictError):
+                await cosmos.save_ticket_with_audit(_ticket(), details={})
+            container.create_item.assert_not_called()
+        else:
+            assert await cosmos.save_ticket_with_audit(_ticket(), details={}) is stored
+
+    @pytest.mark.asyncio
+    async def test_submission_uses_atomic_path_when_auditing(self):
+        cosmos = MagicMock()
+        cosmos.save_ticket_with_audit = AsyncMock()
+        cosmos.save_ticket = AsyncMock()
+        service = SubmissionService(MagicMock(), MagicMock(), cosmos, audit=True)
+        plan = SubmissionPlan(
+            app_id="terprint", category="bug", project="Terprint", area_path="Terprint",
+            work_item_type="Bug", tag_prefix="support-widget", tags="support-widget", title_prefix="[Bug]",
+        )
+        request = SupportSubmitRequest(
+            app_id="terprint", category="bug", subject="Page not loading",
+            description="The analytics page fails to load.",
+        )
+
+        await service.save_ticket("SUP-1", request, plan, {"id": 42, "url": "https://dev.azure.com/x/42"})
+
+        cosmos.save_ticket.assert_not_called()
+        details = cosmos.save_ticket_with_audit.await_args.kwargs["details"]
+        assert details == {"project": "Terprint", "work_item_id": 42, "category": "bug", "priority": request.priority}
+
+
+class TestAuditHistory:
+    """Tests for reading a ticket's audit trail."""
+
+    @pytest.mark.asyncio
+    async def test_history_is_a_single_partition_query(self):
+        container = MagicMock()
+        container.query_items.return_value.__aiter__.return_value = [{"id": "a", "action": "created"}]
+        cosmos = _cosmos(container)
+
+        assert await cosmos.list_audit_entries("SUP-1", "terprint") == [{"id": "a", "action": "created"}]
+
+        kwargs = container.query_items.call_args.kwargs
+        assert kwargs["partition_key"] == "terprint"
+        assert "ORDER BY c.timestamp ASC" in kwargs["query"]
+
+    @pytest.mark.asyncio
+    async def test_history_includes_entries_from_the_old_container(self):
+        tickets, legacy = MagicMock(), MagicMock()
+        tickets.query_items.return_value.__aiter__.return_value = [
+            {"id": "SUP-1-created", "action": "created", "timestamp": "2025-03-02T10:00:00Z"},
+            {"id": "b", "action": "screenshot_attached", "timestamp": "2025-03-04T09:00:00"},
+        ]
+        legacy.query_items.return_value.__aiter__.return_value = [
+            {"id": "SUP-1-linked-2025-03-03T08:00:00", "action": "linked", "timestamp": "2025-03-03T08:00:00"},
+        ]
+        cosmos = _cosmos(MagicMock())
+        cosmos._get_container = AsyncMock(side_effect={"tickets": tickets, "audit_log": legacy}.get)
+        cosmos._legacy_audit_container = "audit_log"
+
+        entries = await cosmos.list_audit_entries("SUP-1", "terprint")
+
+        assert [e["action"] for e in entries] == ["created", "linked", "screenshot_attached"]
+        assert legacy.query_items.call_args.kwargs["partition_key"] == "terprint"
+
+    @pytest.mark.asyncio
+    async def test_missing_old_container_is_ignored(self):
+        container = MagicMock()
+        container.query_items.return_value.__aiter__.return_value = [{"id": "a", "action": "created"}]
+        legacy = MagicMock()
+        legacy.query_items.return_value.__aiter__.side_effect = CosmosResourceNotFoundError(message="Not found")
+        cosmos = _cosmos(container)
+        cosmos._get_container = AsyncMock(side_effect=lambda name: legacy if name == "audit_log" else container)
+        cosmos._legacy_audit_container = "audit_log"
+
+        assert await cosmos.list_audit_entries("SUP-1", "terprint") == [{"id": "a", "action": "created"}]
+
+    @pytest.mark.asyncio
+    async def test_ticket_listing_excludes_audit_entries(self):
+        container = MagicMock()
+        container.query_items.return_value.by_page.return_value.__aiter__.return_value = []
+        cosmos = _cosmos(container)
+
+        await cosmos.list_tickets()
+
+        assert "NOT IS_DEFINED(c.doc_type)" in container.query_items.call_args.kwargs["query"]
+
+    def test_audit_route(self):
+        cosmos = MagicMock()
+        cosmos.list_audit_entries = AsyncMock(return_value=[{
+            "id": "SUP-1-created-2025-03-02T10:00:00Z", "ticket_id": "SUP-1", "app_id": "terprint",
+            "action": "created", "details": {"work_item_id": 42}, "timestamp": "2025-03-02T10:00:00Z",
+        }])
+        with patch("api.routes.support._get_cosmos", return_value=cosmos):
+            response = TestClient(app).get("/api/tickets/SUP-1/audit", params={"app_id": "terprint"})
+
+        assert response.status_code == 200
+        assert [e["action"] for e in response.json()] == ["created"]
+        cosmos.list_audit_entries.assert_awaited_once_with("SUP-1", "terprint")
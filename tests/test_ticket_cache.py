@@ -0,0 +1,105 @@
+"""Tests for the read-through ticket cache."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from azure.cosmos.exceptions import CosmosResourceNotFoundError
+
+from api.metrics import registry
+from api.services.cosmos_service import CosmosService
+from api.services.ticket_cache import TicketCache
+
+
+def _cosmos(container: MagicMock) -> CosmosService:
+    cosmos = CosmosService.__new__(CosmosService)
+    cosmos._email_index = False
+    cosmos._tickets = TicketCache(ttl_seconds=60, negative_ttl_seconds=10)
+    cosmos._get_container = AsyncMock(return_value=container)
+    return cosmos
+
+
+def _reader(docs: dict[str, dict], charge: str = "1.24") -> MagicMock:
+    async def read_item(item, partition_key, response_hook=None):
+        await asyncio.sleep(0.01)
+        if item not in docs:
+            raise CosmosResourceNotFoundError(message="Not found")
+        response_hook({"x-ms-request-charge": charge}, docs[item])
+        return docs[item]
+
+    container = MagicMock()
+    container.read_item = AsyncMock(side_effect=read_item)
+    return container
+
+
+class TestTicketCache:
+    """Tests for CosmosService.get_ticket caching."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_point_read(self):
+        container = _reader({"SUP-1": {"id": "SUP-1", "app_id": "terprint"}})
+        cosmos = _cosmos(container)
+        saved = registry.counter("ticket_cache_ru_saved_total").value()
+
+        results = await asyncio.gather(*(cosmos.get_ticket("SUP-1", "terprint") for _ in range(10)))
+        again = await cosmos.get_ticket("SUP-1", "terprint")
+
+        assert all(r == {"id": "SUP-1", "app_id": "terprint"} for r in [*results, again])
+        assert container.read_item.await_count == 1
+        assert registry.counter("ticket_cache_ru_saved_total").value() - saved == pytest.approx(10 * 1.24)
+
+    @pytest.mark.asyncio
+    async def test_not_found_is_cached_negatively(self):
+        container = _reader({})
+        cosmos = _cosmos(container)
+
+        assert await cosmos.get_ticket("SUP-404", "terprint") is None
+        assert await cosmos.get_ticket("SUP-404", "terprint") is None
+        assert container.read_item.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_other_errors_propagate_and_are_not_cached(self):
+        container = MagicMock()
+        container.read_item = AsyncMock(side_effect=[RuntimeError("throttled"), {"id": "SUP-1", "app_id": "terprint"}])
+        cosmos = _cosmos(container)
+
+        with pytest.raises(RuntimeError):
+            await cosmos.get_ticket("SUP-1", "terprint")
+        assert (await cosmos.get_ticket("SUP-1", "terprint"))["id"] == "SUP-1"
+
+    @pytest.mark.asyncio
+    async def test_save_and_status_patch_write_through(self):
+        container = _reader({})
+        container.create_item = AsyncMock(side_effect=lambda doc: doc)
+        container.execute_item_batch = AsyncMock(return_value=[
+            {"statusCode": 200, "resourceBody": {"id": "SUP-1", "app_id": "terprint", "status": "closed"}},
+        ])
+        cosmos = _cosmos(container)
+        assert await cosmos.get_ticket("SUP-1", "terprint") is None  # cached as missing
+
+        await cosmos.save_ticket(MagicMock(id="SUP-1", app_id="terprint", model_dump=lambda mode: {
+            "id": "SUP-1", "app_id": "terprint", "status": "created",
+        }))
+        assert (await cosmos.get_ticket("SUP-1", "terprint"))["status"] == "created"
+
+        await cosmos.patch_ticket_statuses("terprint", [("SUP-1", "closed", "2025-03-02T10:00:00Z")])
+        assert (await cosmos.get_ticket("SUP-1", "terprint"))["status"] == "closed"
+        assert container.read_item.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_write_during_load_wins(self):
+        cache = TicketCache()
+        release = asyncio.Event()
+
+        async def slow_load():
+            await release.wait()
+            return {"id": "SUP-1", "app_id": "terprint", "status": "created"}, 1.0
+
+        pending = asyncio.create_task(cache.get("terprint", "SUP-1", slow_load))
+        await asyncio.sleep(0)
+        cache.put({"id": "SUP-1", "app_id": "terprint", "status": "closed"})
+        release.set()
+        await pending
+
+        ticket = await cache.get("terprint", "SUP-1", AsyncMock(side_effect=AssertionError))
+        assert ticket["status"] == "closed"
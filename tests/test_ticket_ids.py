@@ -0,0 +1,177 @@
+"""Tests for the ticket ID generator."""
+
+import re
+import subprocess
+import sys
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from api.models import SupportSubmitRequest, TicketDocument
+from api.services.outbox import SubmissionOutbox
+from api.services.routing_service import SubmissionPlan
+from api.services.sqlite_store import SqliteTicketStore
+from api.services.submission_service import SubmissionService
+from api.services.ticket_ids import (
+    MAX_REPLICA_ID,
+    MAX_WORKER_ID,
+    SLOT_BITS,
+    TicketIdGenerator,
+    claim_worker_id,
+    claim_worker_slot,
+    default_replica_id,
+)
+from api.services.ticket_store import TicketIdConflictError
+
+ID_RE = re.compile(r"^SUP-\d{8}-\d{4}-[0-9A-HJKMNP-TV-Z]{12}$")
+
+# 2025-03-14 09:15:30.250 UTC
+T0 = int(datetime(2025, 3, 14, 9, 15, 30, 250000, tzinfo=UTC).timestamp() * 1000)
+
+
+class FakeClock:
+    def __init__(self, ms: int) -> None:
+        self.ms = ms
+
+    def __call__(self) -> int:
+        return self.ms
+
+
+class TestTicketIdGenerator:
+    """Tests for format, uniqueness and ordering of ticket IDs."""
+
+    def test_format_keeps_readable_prefix(self):
+        ticket_id = TicketIdGenerator(worker_id=1, clock_ms=FakeClock(T0)).next_id()
+        assert ID_RE.match(ticket_id)
+        assert ticket_id.startswith("SUP-20250314-0915-")
+
+    def test_same_millisecond_ids_are_unique_and_increasing(self):
+        gen = TicketIdGenerator(worker_id=7, clock_ms=FakeClock(T0))
+        ids = [gen.next_id() for _ in range(50_000)]  # overflows the 14-bit sequence
+        assert len(set(ids)) == len(ids)
+        assert ids == sorted(ids)
+
+    def test_ids_sort_by_time_across_minutes(self):
+        clock = FakeClock(T0)
+        gen = TicketIdGenerator(worker_id=3, clock_ms=clock)
+        ids = []
+        for step in (0, 1, 999, 29_749, 29_750, 60_000 * 60 * 24):
+            clock.ms = T0 + step
+            ids.append(gen.next_id())
+        assert ids == sorted(ids)
+        assert ids[-1].startswith("SUP-20250315-0915-")
+
+    def test_clock_going_backwards_stays_monotonic(self):
+        clock = FakeClock(T0)
+        gen = TicketIdGenerator(worker_id=3, clock_ms=clock)
+        first = gen.next_id()
+        clock.ms = T0 - 5_000
+        assert gen.next_id() > first
+
+    def test_workers_never_collide(self):
+        clock = FakeClock(T0)
+        a = TicketIdGenerator(worker_id=1, clock_ms=clock)
+        b = TicketIdGenerator(worker_id=2, clock_ms=clock)
+        ids = [g.next_id() for _ in range(1000) for g in (a, b)]
+        assert len(set(ids)) == len(ids)
+
+    def test_rejects_out_of_range_worker_id(self):
+        with pytest.raises(ValueError):
+            TicketIdGenerator(worker_id=MAX_WORKER_ID + 1)
+
+
+class TestWorkerIds:
+    """Tests for deriving per-process worker IDs."""
+
+    def test_workers_of_a_replica_lease_distinct_slots(self, tmp_path):
+        first = claim_worker_id(3, tmp_path)
+        second = claim_worker_id(3, tmp_path)
+
+        assert first != second
+        assert first >> SLOT_BITS == second >> SLOT_BITS == 3
+        assert claim_worker_id(4, tmp_path / "other-replica") >> SLOT_BITS == 4
+
+    def test_slot_lock_excludes_other_processes(self, tmp_path):
+        claim_worker_slot(tmp_path)
+        script = (
+            "import fcntl, os, sys; fd = os.open(sys.argv[1], os.O_RDWR)\n"
+            "try: fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)\n"
+            "except BlockingIOError: sys.exit(1)"
+        )
+        held = subprocess.run([sys.executable, "-c", script, str(tmp_path / "slot-0.lock")])
+        assert held.returncode == 1
+
+    def test_rejects_out_of_range_replica_id(self, tmp_path):
+        with pytest.raises(ValueError):
+            claim_worker_id(MAX_REPLICA_ID + 1, tmp_path)
+
+    def test_unconfigured_replicas_draw_random_ids(self, tmp_path):
+        """Replicas share one configuration, so an unset replica ID must not be derived from it."""
+        drawn = {default_replica_id() for _ in range(100)}
+
+        assert len(drawn) > 90
+        assert all(0 <= replica_id <= MAX_REPLICA_ID for replica_id in drawn)
+        assert 0 <= claim_worker_id(None, tmp_path) >> SLOT_BITS <= MAX_REPLICA_ID
+
+
+PLAN = SubmissionPlan(
+    app_id="terprint", category="bug", project="Terprint", area_path="Terprint",
+    work_item_type="Bug", tag_prefix="support-widget", tags="support-widget", title_prefix="[Bug]",
+)
+REQUEST = SupportSubmitRequest(
+    app_id="terprint", category="bug", subject="Page not loading", description="The analytics page fails to load.",
+)
+WORK_ITEM = {"id": 42, "url": "https://dev.azure.com/x/42", "project": "Terprint"}
+
+
+class TestTicketIdConflicts:
+    """Tests for storing a submission whose ticket ID belongs to another ticket."""
+
+    @pytest.fixture
+    async def store(self, tmp_path):
+        store = SqliteTicketStore(tmp_path / "tickets.db")
+        await store.save_ticket(TicketDocument(
+            id="SUP-TAKEN", app_id="terprint", category="bug", subject="Someone else's ticket",
+            description="Another customer's report.", priority=2,
+        ))
+        return store
+
+    def _service(self, store, ids=("SUP-NEW-1", "SUP-NEW-2")) -> SubmissionService:
+        routing = MagicMock()
+        routing.plan.return_value = PLAN
+        devops = MagicMock()
+        devops.create_work_item = AsyncMock(return_value=WORK_ITEM)
+        return SubmissionService(routing, devops, store, new_ticket_id=iter(ids).__next__)
+
+    @pytest.mark.asyncio
+    async def test_submit_reports_the_new_id(self, store):
+        response = await self._service(store).submit(REQUEST, "SUP-TAKEN")
+
+        assert response.ticket_id == "SUP-NEW-1"
+        assert (await store.get_ticket("SUP-NEW-1", "terprint"))["subject"] == "Page not loading"
+        assert (await store.get_ticket("SUP-TAKEN", "terprint"))["subject"] == "Someone else's ticket"
+
+    @pytest.mark.asyncio
+    async def test_submit_fails_rather_than_report_a_taken_id(self, store):
+        service = self._service(store)
+        service._new_ticket_id = None
+
+        with pytest.raises(TicketIdConflictError):
+            await service.submit(REQUEST, "SUP-TAKEN")
+
+    @pytest.mark.asyncio
+    async def test_outbox_checkpoints_the_new_id(self, store, tmp_path):
+        outbox = SubmissionOutbox(tmp_path / "outbox.db")
+        await outbox.enqueue("SUP-TAKEN", REQUEST.model_dump_json())
+        reassigned = []
+
+        async def record(new_id: str) -> None:
+            reassigned.append(new_id)
+            await outbox.record_ticket_id("SUP-TAKEN", new_id)
+
+        stored = await self._service(store).store_ticket("SUP-TAKEN", REQUEST, PLAN, WORK_ITEM, reassigned=record)
+
+        assert stored == reassigned[0] == "SUP-NEW-1"
+        assert (await outbox.get("SUP-TAKEN")).stored_ticket_id == "SUP-NEW-1"
+        outbox.close()
@@ -0,0 +1,188 @@
+"""Tests for partition-scoped ticket listing and cursor pagination."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.models import TicketSummary
+from api.services.cosmos_service import TICKET_SUMMARY_FIELDS, CosmosService, TicketPage, select_list
+from api.services.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+
+class _Pages:
+    """Stand-in for the azure-core async page iterator."""
+
+    def __init__(self, pages: list[list[dict]], token: str | None) -> None:
+        self._pages = iter(pages)
+        self._token = token
+        self.continuation_token: str | None = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            page = next(self._pages)
+        except StopIteration:
+            self.continuation_token = None
+            raise StopAsyncIteration from None
+        self.continuation_token = self._token
+
+        async def items():
+            for item in page:
+                yield item
+
+        return items()
+
+
+class _Items:
+    """Stand-in for the azure-core async item iterator."""
+
+    def __init__(self, items: list[dict]) -> None:
+        self._items = iter(items)
+        self.by_page = MagicMock()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._items)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+
+def _cosmos(pages: list[list[dict]], token: str | None) -> tuple[CosmosService, MagicMock]:
+    container = MagicMock()
+    container.query_items.return_value = _Items([item for page in pages for item in page])
+    container.query_items.return_value.by_page.return_value = _Pages(pages, token)
+    cosmos = CosmosService.__new__(CosmosService)
+    cosmos._get_container = AsyncMock(return_value=container)
+    return cosmos, container
+
+
+class TestListTickets:
+    """Tests for CosmosService.list_tickets."""
+
+    @pytest.mark.asyncio
+    async def test_app_filter_targets_one_partition(self):
+        cosmos, container = _cosmos([[{"id": "SUP-2"}, {"id": "SUP-1"}]], "token-2")
+
+        page = await cosmos.list_tickets(app_id="terprint", limit=2, continuation="token-1")
+
+        assert page == TicketPage([{"id": "SUP-2"}, {"id": "SUP-1"}], "token-2")
+        kwargs = container.query_items.call_args.kwargs
+        assert kwargs["partition_key"] == "terprint"
+        assert kwargs["max_item_count"] == 2
+        assert "TOP" not in kwargs["query"]
+        container.query_items.return_value.by_page.assert_called_once_with("token-1")
+
+    @pytest.mark.asyncio
+    async def test_email_only_fans_out_for_one_page_without_continuation(self):
+        """Cross-partition ORDER BY queries cannot be resumed, so no continuation is returned."""
+        cosmos, container = _cosmos([[], [{"id": "SUP-9"}]], "token-9")
+
+        page = await cosmos.list_tickets(user_email="a@example.com", limit=5)
+
+        assert page == TicketPage([{"id": "SUP-9"}], None)
+        kwargs = container.query_items.call_args.kwargs
+        assert "partition_key" not in kwargs
+        assert kwargs["query"].startswith("SELECT TOP @limit ")
+        assert {"name": "@limit", "value": 5} in kwargs["parameters"]
+        container.query_items.return_value.by_page.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_last_page_has_no_continuation(self):
+        cosmos, _ = _cosmos([[{"id": "SUP-1"}]], None)
+        assert (await cosmos.list_tickets(app_id="terprint")).continuation is None
+
+
+class TestProjection:
+    """Tests for server-side projection of ticket listings."""
+
+    def test_select_list_aliases_nested_paths(self):
+        assert select_list(None) == "*"
+        assert select_list(["id", "devops.work_item_id"]) == "c.id, c.devops.work_item_id AS devops_work_item_id"
+
+    @pytest.mark.parametrize("field", ["id, c.description", "devops..id", "1st", "*"])
+    def test_select_list_rejects_non_paths(self, field):
+        with pytest.raises(ValueError):
+            select_list([field])
+
+    @pytest.mark.asyncio
+    async def test_list_tickets_queries_only_summary_fields(self):
+        cosmos, container = _cosmos([[{"id": "SUP-1"}]], None)
+
+        await cosmos.list_tickets(app_id="terprint", fields=TICKET_SUMMARY_FIELDS)
+
+        query = container.query_items.call_args.kwargs["query"]
+        assert query.startswith("SELECT c.id, c.app_id, c.category, c.subject, c.status, c.priority, c.created_at, ")
+        assert "*" not in query
+
+    def test_summary_from_projected_and_full_documents(self):
+        projected = TicketSummary.from_document({"id": "SUP-1", "status": "closed", "devops_work_item_id": 7})
+        full = TicketSummary.from_document({"id": "SUP-1", "status": "closed", "devops": {"work_item_id": 7}})
+        assert projected == full
+        assert TicketSummary.from_document({"id": "SUP-2"}).status == "created"
+
+
+class TestCursors:
+    """Tests for opaque page cursors."""
+
+    def test_round_trip(self):
+        cursor = encode_cursor('{"token":"+RID:~abc==#RT:1"}', "terprint", None)
+        assert "terprint" not in cursor
+        assert decode_cursor(cursor, "terprint", None) == '{"token":"+RID:~abc==#RT:1"}'
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor("t", "cdes", None)])
+    def test_rejects_garbage_and_other_filters(self, cursor):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor, "terprint", None)
+
+
+class TestTicketsEndpoint:
+    """Tests for GET /api/tickets paging."""
+
+    def test_next_cursor_header_round_trips(self):
+        cosmos = MagicMock()
+        cosmos.list_tickets = AsyncMock(return_value=TicketPage([{"id": "SUP-2", "app_id": "terprint"}], "token-2"))
+        client = TestClient(app)
+
+        with patch("api.routes.support._get_cosmos", return_value=cosmos):
+            first = client.get("/api/tickets", params={"app_id": "terprint", "limit": 1})
+            cosmos.list_tickets.return_value = TicketPage([{"id": "SUP-1", "app_id": "terprint"}], None)
+            second = client.get(
+                "/api/tickets",
+                params={"app_id": "terprint", "limit": 1, "cursor": first.headers["X-Next-Cursor"]},
+            )
+
+        assert [t["ticket_id"] for t in first.json()] == ["SUP-2"]
+        assert [t["ticket_id"] for t in second.json()] == ["SUP-1"]
+        assert "X-Next-Cursor" not in second.headers
+        assert cosmos.list_tickets.await_args.kwargs["continuation"] == "token-2"
+
+    def test_email_only_listing_has_no_cursor(self):
+        cosmos, container = _cosmos([[{"id": "SUP-9", "app_id": "terprint"}]], "token-9")
+        settings = MagicMock(email_index_reads_enabled=False)
+
+        with patch("api.routes.support._get_cosmos", return_value=cosmos), \
+                patch("api.routes.support.get_settings", return_value=settings):
+            response = TestClient(app).get("/api/tickets", params={"email": "a@example.com", "limit": 1})
+
+        assert response.status_code == 200
+        assert [t["ticket_id"] for t in response.json()] == ["SUP-9"]
+        assert "X-Next-Cursor" not in response.headers
+
+    def test_cursor_from_other_query_is_rejected(self):
+        cosmos = MagicMock()
+        cosmos.list_tickets = AsyncMock()
+        with patch("api.routes.support._get_cosmos", return_value=cosmos):
+            response = TestClient(app).get(
+                "/api/tickets", params={"app_id": "terprint", "cursor": encode_cursor("t", "cdes", None)}
+            )
+
+        assert response.status_code == 400
+        assert response.json()["code"] == "INVALID_CURSOR"
+        cosmos.list_tickets.assert_not_called()